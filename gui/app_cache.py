@@ -0,0 +1,224 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from utils import chars_to_16bit
+from main import encrypt, decrypt
+from trace_log import TRACE_OFF
+from trace_records import mode_trace
+from block_modes import ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, ctr_encrypt, ctr_decrypt
+from avalanche import full_avalanche_analysis, sac_analysis
+from codebook import KeyedMiniAES
+from key_expansion import get_round_keys_nested
+from file_handler import decrypt_file_content
+
+# Lapisan cache untuk aplikasi Streamlit. Streamlit menjalankan ulang seluruh
+# script pada setiap interaksi widget, jadi hasil yang mahal disimpan di sini:
+# - st.cache_resource: objek per key yang dipakai bersama (codebook, key schedule)
+# - st.cache_data: hasil per (hash input, key, mode), dibatasi max_entries + TTL
+# Streamlit tidak mengekspos statistik hit, jadi dihitung sendiri oleh CacheStats.
+
+MAX_CODEBOOKS = 32       # +-256 KB per key (tabel enkripsi + dekripsi)
+MAX_SCHEDULES = 1024
+MAX_RESULTS = 256
+MAX_ANALYSES = 64
+RESULT_TTL = 60 * 60     # detik
+
+CACHE_LIMITS = {
+    "codebook": MAX_CODEBOOKS,
+    "key_schedule": MAX_SCHEDULES,
+    "single_block": MAX_RESULTS,
+    "block_mode": MAX_RESULTS,
+    "file_decrypt": MAX_RESULTS,
+    "avalanche": MAX_ANALYSES,
+    "sac": MAX_ANALYSES,
+}
+
+def content_hash(data):
+    """SHA-256 of text or bytes, used as the cache key instead of the full input."""
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return hashlib.sha256(data).hexdigest()
+
+
+class CacheStats:
+    """Per-cache call/miss counters and an estimate of the memory held.
+
+    Sizes are tracked for the most recent `max_entries` misses, mirroring the
+    bound Streamlit applies, so the memory figure is an estimate.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._misses = {}
+        self._sizes = {}
+
+    def call(self, name):
+        with self._lock:
+            self._calls[name] = self._calls.get(name, 0) + 1
+
+    def miss(self, name, entry_key, size):
+        with self._lock:
+            self._misses[name] = self._misses.get(name, 0) + 1
+            sizes = self._sizes.setdefault(name, OrderedDict())
+            sizes[entry_key] = size
+            sizes.move_to_end(entry_key)
+            while len(sizes) > CACHE_LIMITS.get(name, MAX_RESULTS):
+                sizes.popitem(last=False)
+
+    def clear_sizes(self):
+        with self._lock:
+            self._sizes.clear()
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._misses.clear()
+            self._sizes.clear()
+
+    def rows(self):
+        """One dict per cache: calls, hits, misses, hit rate, entries and estimated memory."""
+        with self._lock:
+            rows = []
+            for name, limit in CACHE_LIMITS.items():
+                calls = self._calls.get(name, 0)
+                misses = min(self._misses.get(name, 0), calls)
+                sizes = self._sizes.get(name, {})
+                rows.append({
+                    "cache": name,
+                    "calls": calls,
+                    "hits": calls - misses,
+                    "misses": misses,
+                    "hit_rate": (calls - misses) / calls if calls else 0.0,
+                    "entries": len(sizes),
+                    "max_entries": limit,
+                    "memory_kb": sum(sizes.values()) / 1024,
+                })
+            return rows
+
+
+@st.cache_resource
+def cache_stats():
+    """Process-wide statistics shared by every session."""
+    return CacheStats()
+
+def _record_miss(name, entry_key, value):
+    try:
+        size = len(pickle.dumps(value))
+    except Exception:
+        size = 0
+    cache_stats().miss(name, entry_key, size)
+    return value
+
+
+# === Resource per key ===
+
+@st.cache_resource(max_entries=MAX_CODEBOOKS, show_spinner=False)
+def _codebook(key_16bit):
+    cipher = KeyedMiniAES(key_16bit)
+    size = cipher.encrypt_table.itemsize * (len(cipher.encrypt_table) + len(cipher.decrypt_table))
+    cache_stats().miss("codebook", key_16bit, size)
+    return cipher
+
+def keyed_cipher(key_16bit):
+    """Shared KeyedMiniAES (full codebooks) for a key."""
+    cache_stats().call("codebook")
+    return _codebook(key_16bit)
+
+@st.cache_resource(max_entries=MAX_SCHEDULES, show_spinner=False)
+def _key_schedule(key_16bit):
+    return _record_miss("key_schedule", key_16bit, get_round_keys_nested(key_16bit))
+
+def key_schedule(key_16bit):
+    """Round keys K0, K1, K2 (nested) for a key, shared across sessions."""
+    cache_stats().call("key_schedule")
+    return _key_schedule(key_16bit)
+
+
+# === Hasil per input ===
+
+@st.cache_data(max_entries=MAX_RESULTS, ttl=RESULT_TTL, show_spinner=False)
+def _single_block(action, input_16bit, key_16bit):
+    fn = encrypt if action == "encrypt" else decrypt
+    output = fn(input_16bit, key_16bit, TRACE_OFF)[0]
+    # Trace terstruktur (record 3 byte per tahap), bukan list baris log
+    trace = mode_trace(np.array([input_16bit & 0xFFFF], dtype=np.uint16), key_16bit, "ECB", action)
+    return _record_miss("single_block", (action, input_16bit, key_16bit), (output, trace))
+
+def single_block(action, input_16bit, key_16bit):
+    """Cached main.encrypt/decrypt; returns (output, trace_records.RoundTrace of every round state)."""
+    cache_stats().call("single_block")
+    return _single_block(action, input_16bit, key_16bit)
+
+def _run_block_mode(text, key, mode, action, trace, iv):
+    cipher = keyed_cipher(chars_to_16bit(key[:2])) if trace != "full" and mode in ("ECB", "CBC") else None
+    if action == "encrypt":
+        if mode == "ECB":
+            return ecb_encrypt(text, key, cipher=cipher, trace=trace)
+        if mode == "CBC":
+            return cbc_encrypt(text, key, iv, cipher=cipher, trace=trace)
+        return ctr_encrypt(text, key, iv, trace=trace)
+    if mode == "ECB":
+        return ecb_decrypt(text, key, cipher=cipher, trace=trace)
+    if mode == "CBC":
+        return cbc_decrypt(text, key, cipher=cipher, trace=trace)
+    return ctr_decrypt(text, key, trace=trace)
+
+@st.cache_data(max_entries=MAX_RESULTS, ttl=RESULT_TTL, show_spinner=False)
+def _block_mode(input_hash, _text, key, mode, action, trace, iv):
+    output, logs = _run_block_mode(_text, key, mode, action, trace, iv)
+    return _record_miss("block_mode", (input_hash, key, mode, action, trace, iv), (output, list(logs)))
+
+def block_mode(text, key, mode, action, trace, iv=None):
+    """Cached block-mode encryption/decryption keyed by (input hash, key, mode, action, trace, IV).
+
+    `mode` is "ECB", "CBC" or "CTR". Encryption with a random IV/nonce
+    (iv=None) is never cached, so every run still gets a fresh IV.
+    """
+    if action == "encrypt" and mode != "ECB" and not iv:
+        output, logs = _run_block_mode(text, key, mode, action, trace, None)
+        return output, list(logs)
+    cache_stats().call("block_mode")
+    return _block_mode(content_hash(text), text, key, mode, action, trace, iv)
+
+@st.cache_data(max_entries=MAX_RESULTS, ttl=RESULT_TTL, show_spinner=False)
+def _file_decrypt(input_hash, _content, key, mode, trace):
+    result = decrypt_file_content(_content, key, mode, trace=trace)
+    result["logs"] = list(result["logs"])
+    return _record_miss("file_decrypt", (input_hash, key, mode, trace), result)
+
+def file_decrypt(file_content, key, mode, trace):
+    """Cached decrypt_file_content keyed by (content hash, key, mode, trace)."""
+    cache_stats().call("file_decrypt")
+    return _file_decrypt(content_hash(file_content), file_content, key, mode, trace)
+
+@st.cache_data(max_entries=MAX_ANALYSES, ttl=RESULT_TTL, show_spinner=False)
+def _avalanche(plaintext, key):
+    return _record_miss("avalanche", (plaintext, key), full_avalanche_analysis(plaintext, key))
+
+def avalanche_summary(plaintext, key):
+    """Cached full_avalanche_analysis."""
+    cache_stats().call("avalanche")
+    return _avalanche(plaintext, key)
+
+@st.cache_data(max_entries=MAX_ANALYSES, ttl=RESULT_TTL, show_spinner=False)
+def _sac(key_16bit):
+    return _record_miss("sac", key_16bit, sac_analysis(key_16bit, keyed_cipher(key_16bit).encrypt_table))
+
+def sac(key_16bit):
+    """Cached sac_analysis, reusing the shared codebook of the key."""
+    cache_stats().call("sac")
+    return _sac(key_16bit)
+
+
+def clear_all():
+    """Empty every Streamlit cache of this app and the size estimates."""
+    st.cache_data.clear()
+    _codebook.clear()
+    _key_schedule.clear()
+    cache_stats().clear_sizes()
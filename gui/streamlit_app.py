@@ -2,16 +2,42 @@ import streamlit as st
 import sys
 import os
 import pandas as pd
+import numpy as np
 import tempfile
+import time
 
 # Pastikan src folder bisa diimport
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..\src')))
 
-from utils import chars_to_16bit, bit16_to_chars, bit16_to_hex, bit16_to_binary, bit16_to_decimal
-from main import encrypt, decrypt
-from block_modes import ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, generate_iv
-from avalanche import analyze_plaintext_avalanche, analyze_key_avalanche, full_avalanche_analysis
-from file_handler import save_to_txt, save_to_csv, load_from_file, parse_input_file, decrypt_file_content, detect_file_encryption_mode
+from utils import chars_to_16bit, bit16_to_chars, bit16_to_hex, bit16_to_binary, bit16_to_decimal, state_to_text
+from avalanche import analyze_plaintext_avalanche, analyze_key_avalanche
+from key_sensitivity import key_avalanche_sweep, save_key_avalanche, load_key_avalanche, DEFAULT_RESULT_PATH
+from cryptanalysis import cached_tables, cached_characteristics, DIFFERENTIAL, LINEAR
+from differential_attack import last_round_attack
+from app_cache import (single_block, block_mode as cached_block_mode, file_decrypt, avalanche_summary,
+                       sac as cached_sac, key_schedule, cache_stats, clear_all as clear_app_cache)
+from jobs import JobRunner, start_text_job, start_file_decrypt_job, DONE as JOB_DONE, CANCELLED as JOB_CANCELLED
+from profiler import profile_stages, StageProfiler, TOTAL
+from key_expansion import key_schedule_cache, key_cache_info, set_key_cache_size
+from file_handler import (save_to_txt, save_to_csv, export_results, load_from_file, parse_input_file,
+                          decode_file_content)
+from log_viewer import BlockTrace, DEFAULT_SEARCH_LIMIT
+from container import encrypt_container, is_container, parse_header as parse_container_header
+
+# Input lebih besar dari ini (atau tanpa log) diproses sebagai background job
+JOB_THRESHOLD_BYTES = 64 * 1024
+JOB_POLL_SECONDS = 0.25
+JOB_POLL_KEY = "_job_poll"
+
+# Log viewer: jumlah blok per halaman dan batas hasil pencarian
+LOG_PAGE_SIZES = [5, 10, 25, 50]
+LOG_SEARCH_LIMIT = DEFAULT_SEARCH_LIMIT
+
+# Ekstensi file container biner (container.py)
+CONTAINER_SUFFIX = ".maes"
+
+# Pilihan detail log proses (trace mode)
+TRACE_OPTIONS = {"Lengkap": "full", "Ringkas": "summary", "Tanpa log": "off"}
 
 # Daftar Test Cases
 TEST_CASES = [
@@ -30,7 +56,7 @@ def run_test_case(test_case):
     pt = chars_to_16bit(plaintext)
     k = chars_to_16bit(key)
 
-    ct, logs = encrypt(pt, k)
+    ct, trace = single_block("encrypt", pt, k)
     result_hex = bit16_to_hex(ct)
 
     passed = (result_hex == expected_hex)
@@ -39,9 +65,322 @@ def run_test_case(test_case):
         "passed": passed,
         "actual_hex": result_hex,
         "actual_value": ct,
-        "logs": logs
+        "trace": trace
     }
 
+KEYSPACE_ANALYSIS = "Sensitivitas key (seluruh keyspace)"
+
+def render_key_sensitivity():
+    """Key avalanche over all 65,536 keys; stored results are loaded without recomputing."""
+    st.write("### Sensitivitas Key di Seluruh Keyspace")
+    st.caption("Flip setiap bit key untuk seluruh 65.536 key pada 16 plaintext sampel.")
+    
+    processes = st.number_input("Jumlah proses:", min_value=1, max_value=os.cpu_count() or 1, value=1, key="key_sweep_processes")
+    if st.button("Hitung ulang untuk 65.536 key", key="key_sweep_run"):
+        progress_bar = st.progress(0.0)
+        result = key_avalanche_sweep(
+            processes=int(processes),
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total} key"),
+        )
+        save_key_avalanche(result)
+        st.success(f"Selesai dalam {result['elapsed_seconds']:.2f} detik, disimpan ke {DEFAULT_RESULT_PATH}")
+    
+    if not os.path.exists(DEFAULT_RESULT_PATH):
+        st.info("Belum ada hasil tersimpan. Klik tombol di atas untuk menghitung.")
+        return
+    
+    result = load_key_avalanche()
+    st.metric("Rata-rata bit ciphertext yang berubah", f"{result['mean_bits_changed'].mean():.2f} dari 16")
+    st.write("#### Rata-rata bit berubah per bit key:")
+    st.bar_chart(pd.DataFrame({"Bits Changed": result["mean_bits_changed"]}), use_container_width=True)
+    
+    st.write("#### Distribusi rata-rata per key:")
+    counts, edges = np.histogram(result["per_key_mean_bits"], bins=32)
+    st.bar_chart(pd.DataFrame({"Jumlah key": counts}, index=[f"{edge:.2f}" for edge in edges[:-1]]), use_container_width=True)
+    
+    with st.expander("Histogram jumlah bit berubah per bit key (baris = bit key)"):
+        st.dataframe(pd.DataFrame(result["flip_histogram"]), use_container_width=True)
+
+def render_cryptanalysis():
+    """DDT/LAT of the S-Box and the best 2-round characteristics (cached on disk)."""
+    st.title("🔎 Kriptanalisis Diferensial & Linear")
+    tables = cached_tables()
+    labels = [f"{v:X}" for v in range(16)]
+    
+    table_option = st.radio("Tabel S-Box:", ["DDT (Difference Distribution)", "LAT (Linear Approximation)"], horizontal=True)
+    table = tables["ddt"] if table_option.startswith("DDT") else tables["lat"]
+    st.caption("Baris = selisih/mask input, kolom = selisih/mask output (hex).")
+    st.dataframe(pd.DataFrame(table, index=labels, columns=labels), use_container_width=True)
+    
+    st.write("### Karakteristik 2-Round Terbaik")
+    col1, col2 = st.columns(2)
+    with col1:
+        kind = st.radio("Jenis:", [DIFFERENTIAL, LINEAR], format_func=lambda k: k.capitalize(), horizontal=True)
+    with col2:
+        top = st.number_input("Jumlah karakteristik:", min_value=1, max_value=100, value=10)
+    
+    with st.spinner("Mencari karakteristik (branch-and-bound)..."):
+        characteristics = cached_characteristics(kind, int(top))
+    weight_label = "Probabilitas" if kind == DIFFERENTIAL else "|Korelasi|"
+    st.dataframe(pd.DataFrame([{
+        "Input": f"0x{item['input']:04X}",
+        "Output": f"0x{item['output']:04X}",
+        "Jalur": " → ".join(f"{value:04X}" for value in item["path"]),
+        weight_label: item["weight"],
+        "log2": round(item["log2_weight"], 2),
+        "S-Box aktif": item["active_sboxes"],
+    } for item in characteristics]), use_container_width=True)
+    
+    st.write("### Serangan Diferensial Round Terakhir")
+    st.caption("Chosen-plaintext: pasangan dengan selisih input karakteristik terbaik, lalu tebak nibble K2.")
+    col1, col2 = st.columns(2)
+    with col1:
+        attack_key = st.text_input("Key rahasia (2 karakter):", value="01", max_chars=2, key="attack_key")
+    with col2:
+        attack_pairs = st.select_slider("Jumlah pasangan:", options=[2 ** e for e in range(8, 21)], value=2 ** 16)
+    if st.button("Jalankan serangan", key="attack_run"):
+        if len(attack_key) != 2:
+            st.error("Key harus tepat 2 karakter.")
+            return
+        with st.spinner("Menghitung..."):
+            attack = last_round_attack(attack_key, n_pairs=attack_pairs)
+        st.success(f"Subkey K2 asli (nibble target): 0x{attack['true_subkey']:04X} — peringkat {attack['true_rank']} "
+                   f"dari {len(attack['guesses'])} tebakan ({attack['elapsed_seconds']:.2f} detik)")
+        st.dataframe(pd.DataFrame(attack["ranked"])[["subkey_hex", "count"]], use_container_width=True)
+        st.write("#### Tradeoff data / waktu:")
+        tradeoff_df = pd.DataFrame(attack["tradeoff"]).set_index("pairs")
+        st.line_chart(tradeoff_df[["true_rank"]], use_container_width=True)
+        st.dataframe(tradeoff_df[["filtered_pairs", "elapsed_seconds", "true_rank"]], use_container_width=True)
+
+STAGE_COLORS = {
+    "AddRoundKey": "#f4a261", "SubNibbles": "#e76f51", "ShiftRows": "#2a9d8f", "MixColumns": "#264653",
+    "InvSubNibbles": "#e76f51", "InvShiftRows": "#2a9d8f", "InvMixColumns": "#264653",
+    "KeySchedule": "#e9c46a", "PackedRounds": "#8ab17d", "BatchEngine": "#6d597a",
+}
+
+@st.cache_resource
+def job_runner():
+    """Background job pool shared by all sessions."""
+    return JobRunner()
+
+def _format_eta(seconds):
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def _rerun():
+    (getattr(st, "rerun", None) or st.experimental_rerun)()
+
+def _job_status(state_key, file_name, polling=False):
+    """One render of the job's progress or result (never waits for the job)."""
+    job = job_runner().get(st.session_state.get(state_key))
+    if job is None:
+        return None
+    if polling and job.finished:
+        _rerun()  # job selesai: render ulang seluruh halaman tanpa polling
+    st.write(f"**Job #{job.id}:** {job.description}")
+    if not job.finished:
+        if st.button("⛔ Batalkan", key=f"{state_key}_cancel"):
+            job.cancel()
+        st.progress(job.progress)
+        st.caption(f"{job.done:,}/{job.total:,} blok · {job.rate:,.0f} blok/s · ETA {_format_eta(job.eta)}")
+    elif job.status == JOB_DONE:
+        st.success(f"Selesai dalam {job.elapsed:.2f} detik.")
+        with open(job.result_path, 'rb') as result_file:
+            st.download_button("Download hasil", data=result_file, file_name=file_name,
+                               mime="text/plain", key=f"{state_key}_download")
+        with open(job.result_path, 'r', encoding='utf-8', errors='replace') as result_file:
+            preview = result_file.read(1000)
+        st.text_area("Preview (1000 karakter pertama):", value=preview, height=200, key=f"{state_key}_preview")
+    elif job.status == JOB_CANCELLED:
+        st.warning("Job dibatalkan.")
+    else:
+        st.error(f"Job gagal: {job.error}")
+    return job
+
+def render_job(state_key, file_name):
+    """Progress (blocks/s, ETA), cancel button and download of the background job stored in session_state.
+
+    The script is never blocked: a running job is refreshed every
+    JOB_POLL_SECONDS by an auto-rerunning fragment, or on Streamlit versions
+    without st.fragment by one rerun at the end of the script (poll_jobs).
+    """
+    job = job_runner().get(st.session_state.get(state_key))
+    if job is None:
+        return
+    if job.finished:
+        _job_status(state_key, file_name)
+    elif hasattr(st, "fragment"):
+        st.fragment(run_every=JOB_POLL_SECONDS)(_job_status)(state_key, file_name, polling=True)
+    else:
+        _job_status(state_key, file_name)
+        st.session_state[JOB_POLL_KEY] = True
+
+def poll_jobs():
+    """Called last in main(): rerun shortly if a job shown in this run is still running."""
+    if st.session_state.pop(JOB_POLL_KEY, False):
+        time.sleep(JOB_POLL_SECONDS)
+        _rerun()
+
+def _set_log_start(state_key, value):
+    st.session_state[f"{state_key}_start"] = value
+
+def render_log_viewer(state_key, title):
+    """Paginated round-log viewer for the BlockTrace stored in session_state.
+
+    Only the blocks of the current page are traced, as compact RoundTrace
+    records rendered to text or a table, so the cost does not depend on the
+    input length.
+    """
+    source = st.session_state.get(state_key)
+    if source is None:
+        return
+    with st.expander(title):
+        total = source.block_count
+        if not total:
+            st.caption("Tidak ada blok.")
+            return
+        start_key = f"{state_key}_start"
+        if st.session_state.setdefault(start_key, 1) > total:
+            st.session_state[start_key] = 1
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            page_blocks = st.selectbox("Blok per halaman", LOG_PAGE_SIZES, key=f"{state_key}_size")
+        with col2:
+            start = st.number_input("Lompat ke blok", min_value=1, max_value=total, key=start_key)
+        with col3:
+            query = st.text_input("Cari teks atau nilai hex (0x1A2B)", key=f"{state_key}_query")
+            if query:
+                matches = source.find(query)
+                if matches:
+                    choice = st.selectbox(f"{len(matches)} blok cocok" + (" (dibatasi)" if len(matches) >= LOG_SEARCH_LIMIT else ""),
+                                          [i + 1 for i in matches], key=f"{state_key}_match")
+                    st.button("Tampilkan blok", key=f"{state_key}_goto",
+                              on_click=_set_log_start, args=(state_key, choice))
+                else:
+                    st.caption("Tidak ditemukan.")
+
+        first = int(start) - 1
+        last = min(first + page_blocks, total)
+        nav1, nav2, nav3 = st.columns([1, 3, 1])
+        with nav1:
+            st.button("◀ Sebelumnya", key=f"{state_key}_prev", disabled=first == 0,
+                      on_click=_set_log_start, args=(state_key, max(first - page_blocks, 0) + 1))
+        with nav2:
+            st.caption(f"Blok {first + 1}-{last} dari {total:,} · halaman {first // page_blocks + 1} "
+                       f"dari {(total + page_blocks - 1) // page_blocks}")
+        with nav3:
+            st.button("Berikutnya ▶", key=f"{state_key}_next", disabled=last >= total,
+                      on_click=_set_log_start, args=(state_key, last + 1))
+
+        _render_trace_download(state_key, source)
+        # Halaman dirender dari record terstruktur (3 byte per tahap) untuk blok di halaman ini saja
+        records = _trace_records(source, first, page_blocks)
+        view = st.radio("Tampilan", ["Log", "Tabel state"], horizontal=True, key=f"{state_key}_view")
+        if view == "Tabel state":
+            st.caption(f"{len(records)} record · {records.nbytes} byte")
+            st.dataframe(records.to_dataframe(), use_container_width=True, hide_index=True)
+        else:
+            header = "\n".join(source.header_lines()) if first == 0 else ""
+            st.code((header + records.to_text()).lstrip("\n"), language="text")
+
+def _trace_records(source, start=0, count=None):
+    """RoundTrace of a BlockTrace page; "summary" keeps only each block's input and output."""
+    records = source.records(start, count)
+    return records.summary() if source.trace == "summary" else records
+
+def _trace_file(source, fmt):
+    """The whole trace of a BlockTrace as TXT or CSV bytes, rendered chunk by chunk from the records."""
+    parts = [] if fmt == "CSV" else ["\n".join(source.header_lines())]
+    for i, records in enumerate(source.iter_records()):
+        if source.trace == "summary":
+            records = records.summary()
+        parts.append(records.to_csv(header=i == 0) if fmt == "CSV" else records.to_text())
+    return "".join(parts).lstrip("\n").encode("utf-8")
+
+def _prepare_trace_download(state_key, fmt):
+    source = st.session_state.get(state_key)
+    st.session_state[f"{state_key}_download"] = (source, fmt, _trace_file(source, fmt))
+
+def _render_trace_download(state_key, source):
+    """Download of the whole trace; built on request so reruns do not re-render it."""
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox("Format trace", ["TXT", "CSV"], key=f"{state_key}_download_format")
+    prepared = st.session_state.get(f"{state_key}_download")
+    with col2:
+        if prepared is None or prepared[0] is not source or prepared[1] != fmt:
+            st.button("Siapkan download trace", key=f"{state_key}_download_prepare",
+                      on_click=_prepare_trace_download, args=(state_key, fmt))
+        else:
+            st.download_button(f"Download trace ({fmt})", data=prepared[2],
+                               file_name=f"mini_aes_trace.{fmt.lower()}",
+                               mime="text/csv" if fmt == "CSV" else "text/plain",
+                               key=f"{state_key}_download_button")
+
+def render_round_trace(trace, state_key):
+    """Round states of a small RoundTrace as text, with TXT/CSV downloads."""
+    st.code(trace.to_text().strip(), language="text")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download trace (TXT)", data=trace.to_text().strip(), file_name="mini_aes_trace.txt",
+                           mime="text/plain", key=f"{state_key}_txt")
+    with col2:
+        st.download_button("Download trace (CSV)", data=trace.to_csv(), file_name="mini_aes_trace.csv",
+                           mime="text/csv", key=f"{state_key}_csv")
+
+def render_cache_admin():
+    """Admin panel: hit rate and estimated memory of every app cache, shared by all sessions."""
+    rows = cache_stats().rows()
+    calls = sum(row["calls"] for row in rows)
+    hits = sum(row["hits"] for row in rows)
+    st.metric("Hit rate keseluruhan", f"{hits / calls * 100 if calls else 0:.1f}%")
+    st.caption(f"Perkiraan memori: {sum(row['memory_kb'] for row in rows):.1f} KB")
+    with st.expander("Detail per cache"):
+        cache_df = pd.DataFrame(rows).set_index("cache")
+        cache_df["hit_rate"] = (cache_df["hit_rate"] * 100).round(1)
+        st.dataframe(cache_df, use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Kosongkan cache"):
+            clear_app_cache()
+    with col2:
+        if st.button("Reset statistik"):
+            cache_stats().reset()
+
+def session_profiler():
+    """StageProfiler of this browser session (stats are not shared between sessions)."""
+    if "stage_profiler" not in st.session_state:
+        st.session_state.stage_profiler = StageProfiler()
+    return st.session_state.stage_profiler
+
+def render_stage_profile():
+    """Flame-style breakdown: one bar per block mode, split into its stages by cumulative time."""
+    profile = session_profiler().snapshot()
+    if not profile:
+        st.caption("Belum ada data. Jalankan enkripsi/dekripsi dengan profiling aktif.")
+        return
+    rows = []
+    for mode, stages in profile.items():
+        parts = {name: stat for name, stat in stages.items() if name not in (TOTAL, "KeyExpansion")}
+        total_ns = stages[TOTAL]["total_ns"] if TOTAL in stages else sum(stat["total_ns"] for stat in parts.values())
+        bars = "".join(
+            f'<div title="{name}: {stat["total_ns"] / 1e6:.3f} ms, {stat["calls"]} calls" '
+            f'style="width:{100 * stat["total_ns"] / max(total_ns, 1):.1f}%;background:{STAGE_COLORS.get(name, "#999")};'
+            f'color:white;font-size:10px;overflow:hidden;white-space:nowrap">{name}</div>'
+            for name, stat in sorted(parts.items(), key=lambda item: -item[1]["total_ns"])
+        )
+        st.markdown(
+            f'<div style="background:#ddd;font-size:12px;padding:1px 4px">{mode} — {total_ns / 1e6:.3f} ms</div>'
+            f'<div style="display:flex;margin-bottom:6px">{bars}</div>',
+            unsafe_allow_html=True,
+        )
+        rows += [{"Mode": mode, "Tahap": name, "Calls": stat["calls"], "Total (ms)": stat["total_ns"] / 1e6,
+                  "Rata-rata (ns)": stat["mean_ns"]} for name, stat in stages.items()]
+    with st.expander("Tabel profiling"):
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
 def main():
     st.set_page_config(page_title="Mini-AES 16-bit Cipher", layout="centered")
     
@@ -50,7 +389,7 @@ def main():
         st.session_state.file_upload_key = 0
     
     # Tabs
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Enkripsi & Dekripsi", "Mode Operasi Blok", "File Decryption", "Analisis Avalanche", "Test Cases"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Enkripsi & Dekripsi", "Mode Operasi Blok", "File Decryption", "Analisis Avalanche", "Test Cases", "Kriptanalisis"])
 
     with tab1:
         st.title("🔒 Mini-AES 16-bit Encryptor & Decryptor")
@@ -159,10 +498,7 @@ def main():
                         st.write(f"Key: '{key_short}' → {key_16bit} (0x{key_16bit:04X})")
 
                     # Proses
-                    if mode == "Enkripsi":
-                        output_16bit, logs = encrypt(input_16bit, key_16bit)
-                    else:
-                        output_16bit, logs = decrypt(input_16bit, key_16bit)
+                    output_16bit, trace = single_block("encrypt" if mode == "Enkripsi" else "decrypt", input_16bit, key_16bit)
 
                     st.write(f"### Output {'Ciphertext' if mode == 'Enkripsi' else 'Plaintext'}:")
 
@@ -182,8 +518,10 @@ def main():
                             st.metric(label=format_name, value=value)
 
                     with st.expander(f"🔍 Lihat Proses {'Enkripsi' if mode == 'Enkripsi' else 'Dekripsi'}"):
-                        for line in logs:
-                            st.text(line)
+                        round_keys = key_schedule(key_16bit)
+                        st.caption("Round keys: " + ", ".join(
+                            f"K{i} = 0x{state_to_text(round_key):04X}" for i, round_key in enumerate(round_keys)))
+                        render_round_trace(trace, "single_trace")
                             
                     # Export functionality
                     if export_format != "Tidak":
@@ -195,7 +533,7 @@ def main():
                             "output_decimal": bit16_to_decimal(output_16bit),
                             "output_hex": bit16_to_hex(output_16bit),
                             "output_binary": bit16_to_binary(output_16bit),
-                            "logs": logs
+                            "trace": trace
                         }
                         
                         if export_format == "TXT":
@@ -210,9 +548,9 @@ def main():
 
     with tab2:
         st.title("🧩 Mode Operasi Blok")
-        st.markdown("### ECB dan CBC untuk data panjang")
+        st.markdown("### ECB, CBC dan CTR untuk data panjang")
         
-        block_mode = st.radio("Pilih Mode Operasi Blok:", ["ECB (Electronic Codebook)", "CBC (Cipher Block Chaining)"], horizontal=True)
+        block_mode = st.radio("Pilih Mode Operasi Blok:", ["ECB (Electronic Codebook)", "CBC (Cipher Block Chaining)", "CTR (Counter)"], horizontal=True)
         mode_action = st.radio("Pilih Aksi:", ["Enkripsi", "Dekripsi"], horizontal=True)
         
         st.write("### Input:")
@@ -222,31 +560,48 @@ def main():
             block_input = st.text_area(f"{'Plaintext' if mode_action == 'Enkripsi' else 'Ciphertext'} (teks panjang):", 
                                        height=100, 
                                        key="block_input",
-                                       help="Untuk mode CBC dekripsi, pastikan IV termasuk dalam 2 karakter pertama")
+                                       help="Untuk mode CBC/CTR dekripsi, pastikan IV/nonce termasuk dalam 2 karakter pertama")
         
         with col2:
             block_key = st.text_input("Key (2 karakter):", max_chars=2, key="block_key_text")
             
-            if block_mode == "CBC (Cipher Block Chaining)" and mode_action == "Enkripsi":
-                use_custom_iv = st.checkbox("Custom IV")
+            if block_mode != "ECB (Electronic Codebook)" and mode_action == "Enkripsi":
+                iv_label = "Nonce" if block_mode == "CTR (Counter)" else "IV"
+                use_custom_iv = st.checkbox(f"Custom {iv_label}")
                 if use_custom_iv:
-                    iv_value = st.text_input("IV (2 karakter):", max_chars=2, key="iv_text")
+                    iv_value = st.text_input(f"{iv_label} (2 karakter):", max_chars=2, key="iv_text")
                 else:
                     iv_value = None
         
+        block_trace = TRACE_OPTIONS[st.radio("Detail log proses:", list(TRACE_OPTIONS), horizontal=True, key="block_trace")]
+        
         if st.button(f"{'🔒 Enkripsi' if mode_action == 'Enkripsi' else '🔓 Dekripsi'} dengan {block_mode.split(' ')[0]}", type="primary"):
             if not block_input or len(block_key) != 2:
                 st.error("Input dan Key (2 karakter) diperlukan.")
+            elif 'iv_value' in locals() and iv_value and max(map(ord, iv_value)) > 0xFF:
+                # IV/nonce disimpan sebagai u16 di header container: tiap karakter harus <= U+00FF
+                st.error("IV/Nonce harus 2 karakter Latin-1 (kode karakter <= 255).")
+            elif len(block_input.encode("utf-8")) > JOB_THRESHOLD_BYTES:
+                # Input besar: diproses bertahap di background job, tanpa log
+                iv_to_use = iv_value if 'iv_value' in locals() and iv_value else None
+                job = start_text_job(job_runner(), block_input, block_key, block_mode.split(" ")[0],
+                                     "encrypt" if mode_action == "Enkripsi" else "decrypt", iv_to_use)
+                st.session_state.block_job = job.id
+                st.session_state.pop("block_log", None)
             else:
+                st.session_state.pop("block_job", None)
                 try:
+                    iv_used = None
                     if mode_action == "Enkripsi":
                         if block_mode == "ECB (Electronic Codebook)":
-                            output, logs = ecb_encrypt(block_input, block_key)
-                            iv_used = None
-                        else:  # CBC
+                            output, logs = cached_block_mode(block_input, block_key, "ECB", "encrypt", "off")
+                        else:  # CBC / CTR
                             iv_to_use = iv_value if 'iv_value' in locals() and iv_value else None
-                            output, logs = cbc_encrypt(block_input, block_key, iv_to_use)
-                            iv_used = output[:2]  # First 2 chars are the IV
+                            if block_mode == "CTR (Counter)":
+                                output, logs = cached_block_mode(block_input, block_key, "CTR", "encrypt", "off", iv_to_use)
+                            else:
+                                output, logs = cached_block_mode(block_input, block_key, "CBC", "encrypt", "off", iv_to_use)
+                            iv_used = output[:2]  # First 2 chars are the IV / nonce
                             
                         st.success("Enkripsi Berhasil!")
                         
@@ -256,20 +611,36 @@ def main():
                             
                             if block_mode == "CBC (Cipher Block Chaining)":
                                 st.info(f"IV: '{iv_used}' (disertakan pada 2 karakter pertama hasil)")
+                            elif block_mode == "CTR (Counter)":
+                                st.info(f"Nonce: '{iv_used}' (disertakan pada 2 karakter pertama hasil)")
                             
                             st.code(output, language="text")
                             
                             if len(output) > 50:
                                 st.caption(f"Total panjang output: {len(output)} karakter")
+                            
+                            # Container biner (plaintext UTF-8): mode/IV tersimpan di header
+                            st.download_button(
+                                "Download sebagai container biner (.maes)",
+                                data=encrypt_container(block_input.encode('utf-8'), block_key, block_mode.split(" ")[0], iv_used),
+                                file_name=f"mini_aes_output{CONTAINER_SUFFIX}",
+                                mime="application/octet-stream",
+                                key="block_container_download"
+                            )
                     else:
                         # Decryption
                         if block_mode == "ECB (Electronic Codebook)":
-                            output, logs = ecb_decrypt(block_input, block_key)
+                            output, logs = cached_block_mode(block_input, block_key, "ECB", "decrypt", "off")
+                        elif block_mode == "CTR (Counter)":
+                            if len(block_input) < 2:
+                                st.error("Untuk CTR, ciphertext harus menyertakan nonce (minimal 2 karakter)")
+                                st.stop()
+                            output, logs = cached_block_mode(block_input, block_key, "CTR", "decrypt", "off")
                         else:  # CBC
                             if len(block_input) < 2:
                                 st.error("Untuk CBC, ciphertext harus menyertakan IV (minimal 2 karakter)")
                                 st.stop()
-                            output, logs = cbc_decrypt(block_input, block_key)
+                            output, logs = cached_block_mode(block_input, block_key, "CBC", "decrypt", "off")
                             
                         st.success("Dekripsi Berhasil!")
                         
@@ -280,41 +651,48 @@ def main():
                             if len(output) > 50:
                                 st.caption(f"Total panjang output: {len(output)} karakter")
                     
-                    # Show logs in expander
-                    with st.expander(f"🔍 Lihat Proses {block_mode}"):
-                        for log in logs:
-                            st.text(log)
+                    # Log per blok dibuat ulang per halaman oleh log viewer
+                    st.session_state.pop("block_log_start", None)
+                    st.session_state.block_log = None
+                    if block_trace != "off":
+                        st.session_state.block_log = BlockTrace(block_input, block_key, block_mode.split(" ")[0],
+                                                                "encrypt" if mode_action == "Enkripsi" else "decrypt",
+                                                                output, block_trace)
                     
-                    # Export functionality
+                    # Export functionality (streaming, trace ditulis per chunk)
                     export_format = st.radio(
                         "Simpan hasil ke file:", 
-                        ["Tidak", "TXT", "CSV"], 
+                        ["Tidak", "TXT", "CSV", "JSONL"], 
                         horizontal=True,
                         key="block_export"
                     )
+                    export_gzip = st.checkbox("Kompres (gzip)", key="block_export_gzip")
                     
                     if export_format != "Tidak":
                         export_data = {
                             "mode": mode_action,
-                            "block_mode": block_mode.split(" ")[0],  # ECB or CBC
+                            "block_mode": block_mode.split(" ")[0],  # ECB, CBC or CTR
                             "input": block_input,
                             "key": block_key,
                             "output": output,
-                            "logs": logs
+                            "trace": st.session_state.block_log.iter_records() if st.session_state.block_log else None
                         }
                         
-                        if block_mode == "CBC (Cipher Block Chaining)" and iv_used:
+                        if iv_used:
                             export_data["iv"] = iv_used
                         
-                        if export_format == "TXT":
-                            file_path = save_to_txt(export_data)
-                            st.success(f"Hasil berhasil disimpan ke file TXT: {file_path}")
-                        else:  # CSV
-                            file_path = save_to_csv(export_data)
-                            st.success(f"Hasil berhasil disimpan ke file CSV: {file_path}")
+                        export_status = st.empty()
+                        file_path = export_results(
+                            export_data, fmt=export_format.lower(), compression="gzip" if export_gzip else None,
+                            progress=lambda done, total: export_status.caption(f"{done:,} baris/record ditulis..."),
+                        )
+                        st.success(f"Hasil berhasil disimpan ke file {export_format}: {file_path}")
                 
                 except Exception as e:
                     st.error(f"Proses Gagal: {str(e)}")
+        
+        render_log_viewer("block_log", f"🔍 Lihat Proses {block_mode}")
+        render_job("block_job", "mini_aes_output.txt")
 
     with tab3:
         st.title("📄 File Decryption")
@@ -330,15 +708,61 @@ def main():
         with col1:
             decrypt_key = st.text_input("Decryption Key (2 characters):", max_chars=2, key="file_decrypt_key")
         
+        # Container biner: mode dan IV dibaca dari header (tanpa menebak / decode seluruh file)
+        container_header = None
+        if uploaded_file is not None:
+            # Hanya 34 byte header yang dibaca (ukuran upload lewat seek), bukan salinan seluruh upload
+            try:
+                if is_container(uploaded_file):
+                    container_header = parse_container_header(uploaded_file)
+            except ValueError as e:
+                st.error(f"Header container tidak valid: {e}")
+            finally:
+                uploaded_file.seek(0)
+        
         with col2:
-            block_mode = st.radio("Block Mode:", ["ECB", "CBC"], horizontal=True)
+            if container_header:
+                block_mode = container_header["mode"]
+                st.info(f"Container Mini-AES: mode {block_mode} (dari header)")
+            else:
+                block_mode = st.radio("Block Mode:", ["ECB", "CBC", "CTR"], horizontal=True)
+        
+        file_trace = "off" if container_header else TRACE_OPTIONS[
+            st.radio("Decryption log:", list(TRACE_OPTIONS), horizontal=True, key="file_trace")]
             
-        if uploaded_file is not None:
+        if uploaded_file is not None and container_header:
+            st.success(f"File uploaded: {uploaded_file.name}")
+            st.write(f"File size: {uploaded_file.size} bytes")
+            with st.expander("Container Header"):
+                st.json({**container_header, "iv": f"0x{container_header['iv']:04X}" if container_header["iv"] is not None else None})
+            
+            if st.button("🔓 Decrypt File", key="decrypt_container_button"):
+                if not decrypt_key or len(decrypt_key) != 2:
+                    st.error("Please enter a valid 2-character decryption key.")
+                else:
+                    st.session_state.pop("file_job", None)
+                    st.session_state.pop("file_log", None)
+                    try:
+                        with st.spinner("Decrypting container..."):
+                            result = file_decrypt(uploaded_file.getvalue(), decrypt_key, block_mode, "off")
+                        st.write("### Decryption Result")
+                        st.download_button(
+                            label="Download Decrypted Content",
+                            data=result["plaintext_bytes"],
+                            file_name=f"decrypted_{uploaded_file.name.removesuffix(CONTAINER_SUFFIX)}",
+                            mime="application/octet-stream"
+                        )
+                        plaintext = result["plaintext"]
+                        st.text_area("Preview (truncated):" if len(plaintext) > 1000 else "Content:",
+                                     value=plaintext[:1000], height=250)
+                    except ValueError as e:
+                        st.error(f"Error processing file: {str(e)}")
+        elif uploaded_file is not None:
             st.success(f"File uploaded: {uploaded_file.name}")
             
             try:
                 # Read file content
-                file_content = uploaded_file.read()
+                file_content = uploaded_file.getvalue()
                 file_size = len(file_content)
                 
                 # Display file info
@@ -359,10 +783,23 @@ def main():
                 if st.button("🔓 Decrypt File", key="decrypt_file_button"):
                     if not decrypt_key or len(decrypt_key) != 2:
                         st.error("Please enter a valid 2-character decryption key.")
+                    elif file_trace == "off" or file_size > JOB_THRESHOLD_BYTES:
+                        # File besar / tanpa log: dekripsi bertahap di background job
+                        job = start_file_decrypt_job(job_runner(), file_content, decrypt_key, block_mode)
+                        st.session_state.file_job = job.id
+                        st.session_state.pop("file_log_start", None)
+                        # Log dekripsi tidak butuh plaintext, jadi tetap bisa dilihat per halaman
+                        st.session_state.file_log = (BlockTrace(decode_file_content(file_content), decrypt_key, block_mode,
+                                                                "decrypt", trace=file_trace)
+                                                     if file_trace != "off" else None)
                     else:
+                        st.session_state.pop("file_job", None)
+                        st.session_state.pop("file_log_start", None)
                         with st.spinner("Decrypting file..."):
-                            # Call the decrypt function
-                            result = decrypt_file_content(file_content, decrypt_key, block_mode)
+                            # Call the decrypt function (log per blok dibuat ulang oleh log viewer)
+                            result = file_decrypt(file_content, decrypt_key, block_mode, "off")
+                            st.session_state.file_log = BlockTrace(decode_file_content(file_content), decrypt_key,
+                                                                   block_mode, "decrypt", result["plaintext"], file_trace)
                             
                             # Display results
                             st.write("### Decryption Result")
@@ -385,11 +822,9 @@ def main():
                                            height=250)
                             else:
                                 st.text_area("Content:", value=plaintext, height=250)
-                            
-                            # Show decryption logs
-                            with st.expander("📋 Decryption Details"):
-                                for log in result["logs"]:
-                                    st.text(log)
+                
+                render_log_viewer("file_log", "📋 Decryption Details")
+                render_job("file_job", f"decrypted_{uploaded_file.name}")
                 
             except Exception as e:
                 st.error(f"Error processing file: {str(e)}")
@@ -409,15 +844,35 @@ def main():
         
         analysis_type = st.radio(
             "Pilih jenis analisis:", 
-            ["Flip bit tertentu pada plaintext", "Flip bit tertentu pada key", "Analisis lengkap"],
+            ["Flip bit tertentu pada plaintext", "Flip bit tertentu pada key", "Analisis lengkap", "Matriks SAC (semua plaintext)", KEYSPACE_ANALYSIS],
             horizontal=True
         )
         
-        if analysis_type != "Analisis lengkap":
+        if analysis_type in ("Flip bit tertentu pada plaintext", "Flip bit tertentu pada key"):
             bit_position = st.slider("Pilih posisi bit yang akan diubah (0-15):", 0, 15, 0)
         
-        if st.button("Analisis Avalanche Effect", type="primary"):
-            if len(avalanche_plaintext) != 2 or len(avalanche_key) != 2:
+        if analysis_type == KEYSPACE_ANALYSIS:
+            render_key_sensitivity()
+        elif st.button("Analisis Avalanche Effect", type="primary"):
+            if analysis_type == "Matriks SAC (semua plaintext)":
+                # SAC hanya butuh key: seluruh 65.536 plaintext diuji
+                if len(avalanche_key) != 2:
+                    st.error("Key harus terdiri dari 2 karakter.")
+                else:
+                    with st.spinner("Menghitung matriks SAC untuk 65.536 plaintext..."):
+                        sac = cached_sac(chars_to_16bit(avalanche_key))
+                    
+                    st.write("### Strict Avalanche Criterion (SAC)")
+                    st.caption("Baris = bit input yang di-flip, kolom = bit output. Nilai ideal 0.5.")
+                    st.metric("Deviasi maksimum dari 0.5", f"{sac['max_sac_deviation']:.3f}")
+                    st.dataframe(pd.DataFrame(sac["sac_matrix"]).style.format("{:.3f}"), use_container_width=True)
+                    
+                    st.write("### Rata-rata bit output yang berubah per bit input:")
+                    st.bar_chart(pd.DataFrame({"Bits Changed": sac["mean_bits_changed"]}), use_container_width=True)
+                    
+                    with st.expander("Distribusi jumlah bit yang berubah"):
+                        st.dataframe(pd.DataFrame(sac["flip_histogram"]), use_container_width=True)
+            elif len(avalanche_plaintext) != 2 or len(avalanche_key) != 2:
                 st.error("Plaintext dan Key harus terdiri dari 2 karakter.")
             else:
                 try:
@@ -504,7 +959,7 @@ def main():
                         
                     else:  # Full analysis
                         with st.spinner("Melakukan analisis lengkap..."):
-                            summary = full_avalanche_analysis(avalanche_plaintext, avalanche_key)
+                            summary = avalanche_summary(avalanche_plaintext, avalanche_key)
                         
                         # Display summary
                         st.write("### Ringkasan Analisis Avalanche Effect:")
@@ -634,8 +1089,7 @@ def main():
                         st.write(f"Ciphertext (Chars): '{bit16_to_chars(result['actual_value'])}'")
 
                         st.write("**Proses Enkripsi:**")
-                        for line in result["logs"]:
-                            st.text(line)
+                        st.text(result["trace"].to_text().strip())
 
             with col2b:
                 if st.button("▶️ Run All Tests"):
@@ -663,6 +1117,33 @@ def main():
                     results_df = pd.DataFrame(results)
                     st.dataframe(results_df, use_container_width=True)
 
+    with tab6:
+        render_cryptanalysis()
+
+    # Statistik key schedule cache (dirender terakhir agar mencakup proses run ini)
+    with st.sidebar:
+        st.header("⚙️ Key Schedule Cache")
+        cache_size = st.number_input("Ukuran cache (jumlah key):", min_value=1,
+                                     value=key_schedule_cache.maxsize, step=256, key="key_cache_size")
+        if cache_size != key_schedule_cache.maxsize:
+            set_key_cache_size(int(cache_size))
+        cache_info = key_cache_info()
+        st.metric("Hit rate", f"{cache_info['hit_rate'] * 100:.1f}%")
+        st.caption(f"Hits: {cache_info['hits']} | Misses: {cache_info['misses']} | "
+                   f"Evictions: {cache_info['evictions']} | Terisi: {cache_info['size']}/{cache_info['maxsize']}")
+
+        st.header("🗄️ Cache Aplikasi")
+        render_cache_admin()
+
+        st.header("⏱️ Profiling per Tahap")
+        st.checkbox("Aktifkan profiling", key="stage_profiling",
+                    help="Mencatat waktu AddRoundKey/SubNibbles/ShiftRows/MixColumns/key expansion per mode.")
+        st.caption("Rincian per operasi hanya untuk log Lengkap/Ringkas; tanpa log (jalur packed/batch) "
+                   "tercatat sebagai satu tahap PackedRounds/BatchEngine.")
+        if st.button("Reset profiling"):
+            session_profiler().reset()
+        render_stage_profile()
+
     # Informasi Anggota
     st.markdown("---")
     st.caption("""
@@ -675,5 +1156,12 @@ def main():
     - Ricko Mianto Jaya Saputra / 031
     """)
 
+    poll_jobs()
+
 if __name__ == "__main__":
-    main()
+    # Profiling hanya untuk run sesi ini (dan job yang dimulainya) jika diaktifkan di sidebar
+    if st.session_state.get("stage_profiling"):
+        with profile_stages(session_profiler()):
+            main()
+    else:
+        main()
@@ -1,23 +1,27 @@
+from multiprocessing import Pool
+
+import numpy as np
+
 from utils import text_to_state, state_to_text, chars_to_16bit, bit16_to_chars, bit16_to_hex, bit16_to_binary
 from main import encrypt
+from trace_log import TRACE_OFF
+from batch_engine import codebook_arrays
 
 def count_bit_differences(a, b):
     """Count how many bits differ between two 16-bit values."""
-    xor_result = a ^ b
-    binary = bin(xor_result)[2:].zfill(16)
-    return binary.count('1')
+    return bin(a ^ b).count('1')
 
 def analyze_plaintext_avalanche(plaintext, key, bit_position):
     """Analyze avalanche effect by flipping a single bit in plaintext."""
     # Original encryption
     plaintext_16bit = chars_to_16bit(plaintext)
     key_16bit = chars_to_16bit(key)
-    original_cipher, _ = encrypt(plaintext_16bit, key_16bit)
+    original_cipher, _ = encrypt(plaintext_16bit, key_16bit, TRACE_OFF)
     
     # Flip the specified bit
     modified_16bit = plaintext_16bit ^ (1 << bit_position)
     modified_plaintext = bit16_to_chars(modified_16bit)
-    modified_cipher, _ = encrypt(modified_16bit, key_16bit)
+    modified_cipher, _ = encrypt(modified_16bit, key_16bit, TRACE_OFF)
     
     # Calculate bit differences
     bits_changed = count_bit_differences(original_cipher, modified_cipher)
@@ -46,12 +50,12 @@ def analyze_key_avalanche(plaintext, key, bit_position):
     # Original encryption
     plaintext_16bit = chars_to_16bit(plaintext)
     key_16bit = chars_to_16bit(key)
-    original_cipher, _ = encrypt(plaintext_16bit, key_16bit)
+    original_cipher, _ = encrypt(plaintext_16bit, key_16bit, TRACE_OFF)
     
     # Flip the specified bit
     modified_key_16bit = key_16bit ^ (1 << bit_position)
     modified_key = bit16_to_chars(modified_key_16bit)
-    modified_cipher, _ = encrypt(plaintext_16bit, modified_key_16bit)
+    modified_cipher, _ = encrypt(plaintext_16bit, modified_key_16bit, TRACE_OFF)
     
     # Calculate bit differences
     bits_changed = count_bit_differences(original_cipher, modified_cipher)
@@ -105,4 +109,58 @@ def full_avalanche_analysis(plaintext, key):
         "key_results": key_results
     }
     
-    return summary
\ No newline at end of file
+    return summary
+
+
+# === Strict Avalanche Criterion (SAC) atas seluruh ruang plaintext ===
+
+# Popcount 8-bit untuk menghitung bit yang berubah secara vektor
+_POPCOUNT_8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+_BIT_SHIFTS = np.arange(16, dtype=np.uint16)
+
+def popcount16(values):
+    """Vectorized popcount of a uint16 array."""
+    values = np.asarray(values, dtype=np.uint16)
+    return _POPCOUNT_8[values & 0xFF] + _POPCOUNT_8[values >> 8]
+
+def sac_analysis(key_16bit, codebook=None):
+    """Exhaustive SAC analysis of one key over all 65,536 plaintexts.
+
+    Returns a dict of NumPy arrays:
+    - "sac_matrix" (16x16): P(output bit j flips | input bit i flipped), row i, column j
+    - "flip_histogram" (16x17): per input bit, how many plaintexts flip 0..16 output bits
+    - "mean_bits_changed" (16,): average number of output bits flipped per input bit
+    plus "max_sac_deviation", the largest |P - 0.5| in the matrix.
+    The baseline codebook is computed once and shared by all 16 input bits.
+    """
+    forward = codebook_arrays(key_16bit)[0] if codebook is None else np.asarray(codebook, dtype=np.uint16)
+    everything = np.arange(1 << 16, dtype=np.uint16)
+
+    sac_matrix = np.empty((16, 16), dtype=np.float64)
+    flip_histogram = np.empty((16, 17), dtype=np.int64)
+    for bit in range(16):
+        diff = forward ^ forward[everything ^ np.uint16(1 << bit)]
+        sac_matrix[bit] = ((diff[:, None] >> _BIT_SHIFTS) & 1).mean(axis=0)
+        flip_histogram[bit] = np.bincount(popcount16(diff), minlength=17)
+
+    return {
+        "key": key_16bit,
+        "sac_matrix": sac_matrix,
+        "flip_histogram": flip_histogram,
+        "mean_bits_changed": sac_matrix.sum(axis=1),
+        "max_sac_deviation": float(np.abs(sac_matrix - 0.5).max()),
+    }
+
+def sac_matrix(key_16bit):
+    """Just the 16x16 SAC matrix of a key (see sac_analysis)."""
+    return sac_analysis(key_16bit)["sac_matrix"]
+
+def sac_matrices(keys, processes=None):
+    """SAC matrices for many keys as an (n, 16, 16) array, optionally over a process pool."""
+    keys = list(keys)
+    if processes and processes > 1 and len(keys) > 1:
+        with Pool(processes) as pool:
+            matrices = pool.map(sac_matrix, keys)
+    else:
+        matrices = [sac_matrix(key) for key in keys]
+    return np.stack(matrices) if matrices else np.empty((0, 16, 16))
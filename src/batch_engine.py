@@ -0,0 +1,97 @@
+import numpy as np
+
+from key_expansion import get_round_keys
+from packed_core import SUB_BYTE, T_HIGH, T_LOW, F_HIGH, F_LOW, INV_T_HIGH, INV_T_LOW, INV_F_HIGH, INV_F_LOW
+
+# Backend batch: seluruh array blok uint16 diproses dengan beberapa gather
+# T-table dan XOR NumPy, tanpa loop Python per blok.
+
+_SUB_BYTE = np.array(SUB_BYTE, dtype=np.uint16)
+_T_HIGH = np.array(T_HIGH, dtype=np.uint16)
+_T_LOW = np.array(T_LOW, dtype=np.uint16)
+_F_HIGH = np.array(F_HIGH, dtype=np.uint16)
+_F_LOW = np.array(F_LOW, dtype=np.uint16)
+_INV_T_HIGH = np.array(INV_T_HIGH, dtype=np.uint16)
+_INV_T_LOW = np.array(INV_T_LOW, dtype=np.uint16)
+_INV_F_HIGH = np.array(INV_F_HIGH, dtype=np.uint16)
+_INV_F_LOW = np.array(INV_F_LOW, dtype=np.uint16)
+
+
+def encrypt_with_schedule(blocks, k0, k1, k2):
+    """Encrypt blocks with packed round keys; keys may be scalars or arrays (one schedule per block)."""
+    x = np.asarray(blocks, dtype=np.uint16) ^ k0
+    x = _T_HIGH[x >> 8] ^ _T_LOW[x & 0xFF] ^ k1
+    return _F_HIGH[x >> 8] ^ _F_LOW[x & 0xFF] ^ k2
+
+def decrypt_with_schedule(blocks, k0, k1, k2):
+    """Decrypt blocks with packed round keys; keys may be scalars or arrays."""
+    x = np.asarray(blocks, dtype=np.uint16) ^ k2
+    x = _INV_F_HIGH[x >> 8] ^ _INV_F_LOW[x & 0xFF] ^ k1
+    return _INV_T_HIGH[x >> 8] ^ _INV_T_LOW[x & 0xFF] ^ k0
+
+def encrypt_array(blocks, key_16bit):
+    """Encrypt a uint16 array of blocks under one key."""
+    return encrypt_with_schedule(blocks, *(np.uint16(k) for k in get_round_keys(key_16bit)))
+
+def decrypt_array(blocks, key_16bit):
+    """Decrypt a uint16 array of blocks under one key."""
+    return decrypt_with_schedule(blocks, *(np.uint16(k) for k in get_round_keys(key_16bit)))
+
+def expand_keys_array(keys):
+    """Vectorized key_expansion: packed round keys (k0, k1, k2) as uint16 arrays, one per key."""
+    keys = np.asarray(keys, dtype=np.uint16)
+    w0 = keys >> 8
+    w1 = keys & 0xFF
+    # sub_word pada word 8-bit sama dengan SubNibbles pada satu byte
+    w2 = w0 ^ 0x80 ^ _SUB_BYTE[w1]
+    w3 = w2 ^ w1
+    w4 = w2 ^ 0x30 ^ _SUB_BYTE[w3]
+    w5 = w4 ^ w3
+
+    def pack(upper, lower):
+        return ((upper >> 4) << 12) | ((lower >> 4) << 8) | ((upper & 0xF) << 4) | (lower & 0xF)
+
+    return pack(w0, w1), pack(w2, w3), pack(w4, w5)
+
+def ecb_encrypt_array(blocks, key_16bit):
+    """ECB encryption of a whole uint16 block array."""
+    return encrypt_array(blocks, key_16bit)
+
+def ecb_decrypt_array(blocks, key_16bit):
+    """ECB decryption of a whole uint16 block array."""
+    return decrypt_array(blocks, key_16bit)
+
+def cbc_decrypt_array(blocks, key_16bit, iv_16bit):
+    """CBC decryption of a uint16 block array (IV not included).
+
+    P[i] = D(C[i]) ^ C[i-1], so every block only depends on two ciphertext
+    blocks and the whole array can be decrypted at once.
+    """
+    blocks = np.asarray(blocks, dtype=np.uint16)
+    previous = np.empty_like(blocks)
+    if len(blocks):
+        previous[0] = iv_16bit
+        previous[1:] = blocks[:-1]
+    return decrypt_array(blocks, key_16bit) ^ previous
+
+
+# Konversi antara teks (1 karakter = 8 bit) dan array blok 16-bit big-endian
+def text_to_blocks(text):
+    """Convert an even-length Latin-1 string into a uint16 block array, or None if not Latin-1."""
+    try:
+        raw = text.encode('latin-1')
+    except UnicodeEncodeError:
+        return None
+    return np.frombuffer(raw, dtype='>u2').astype(np.uint16)
+
+def blocks_to_text(blocks):
+    """Convert a uint16 block array back into a string of 2 characters per block."""
+    return np.asarray(blocks, dtype='>u2').tobytes().decode('latin-1')
+
+def codebook_arrays(key_16bit):
+    """Build the full forward and inverse codebooks of a key as uint16 arrays."""
+    everything = np.arange(1 << 16, dtype=np.uint16)
+    forward = encrypt_array(everything, key_16bit)
+    inverse = np.empty_like(forward)
+    inverse[forward] = everything
+    return forward, inverse
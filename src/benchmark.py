@@ -0,0 +1,333 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from main import encrypt, decrypt
+from key_expansion import key_expansion, get_round_keys, clear_key_cache
+from trace_log import TRACE_OFF, TRACE_SUMMARY, TRACE_FULL
+from block_modes import (ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, ctr_encrypt, ctr_decrypt,
+                         encrypt_bytes, decrypt_bytes)
+from avalanche import analyze_plaintext_avalanche, analyze_key_avalanche, full_avalanche_analysis, sac_analysis
+from file_handler import save_to_txt, save_to_csv, load_from_file
+
+# Benchmark suite: throughput (blok/s, MB/s), latency p50/p99 dan peak memory
+# untuk setiap operasi, disimpan sebagai baseline JSON dan dibandingkan antar run.
+#
+#   python src/benchmark.py --save benchmark_baseline.json
+#   python src/benchmark.py --baseline benchmark_baseline.json --threshold 0.25
+
+# 100 MB tidak termasuk default (pass tracemalloc butuh memori besar); pakai --sizes ...,100M
+DEFAULT_SIZES = (16, 1024, 64 * 1024, 1024 * 1024)
+DEFAULT_MAX_TRACED_BYTES = 4 * 1024
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+MIN_SAMPLE_SECONDS = 0.002
+DEFAULT_LATENCY_SAMPLES = 100
+LATENCY_BATCH_SECONDS = 0.00005
+KEY = "01"
+KEY_16BIT = 0x3031
+MODES = ("ECB", "CBC", "CTR")
+_TEXT_APIS = {
+    "ECB": (ecb_encrypt, ecb_decrypt),
+    "CBC": (cbc_encrypt, cbc_decrypt),
+    "CTR": (ctr_encrypt, ctr_decrypt),
+}
+
+def parse_size(text):
+    """Parse a payload size such as "16", "64K", "1M" or "100MB" into bytes."""
+    text = text.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def format_size(size):
+    for unit, factor in (("MB", 1024 ** 2), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+def _rate(amount, seconds):
+    if amount is None:
+        return None
+    return amount / seconds if seconds > 0 else float("inf")
+
+def _percentile(samples, q):
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+def measure(fn, repeats=DEFAULT_REPEATS, nbytes=2, track_memory=True, blocks=None,
+            samples=DEFAULT_LATENCY_SAMPLES):
+    """Run fn() after one warm-up and return latency/throughput/memory stats.
+
+    `blocks` is the number of 16-bit blocks one call processes and `nbytes`
+    its payload size; either may be None when the figure does not apply, and
+    the matching throughput is then None.
+
+    p50/p99 come from `samples` latency samples, each a single call or, for
+    calls faster than LATENCY_BATCH_SECONDS, a small batch of calls.
+    Throughput uses the mean of `repeats` samples in which fast calls are
+    looped for at least MIN_SAMPLE_SECONDS. Peak memory is measured with
+    tracemalloc on a separate run so it does not distort the timings.
+    """
+    started = time.perf_counter()
+    fn()
+    call = max(time.perf_counter() - started, 1e-9)
+
+    # Latensi: sampel per panggilan (atau batch kecil untuk operasi sub-mikrodetik)
+    batch = max(1, int(LATENCY_BATCH_SECONDS / call))
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        latencies.append((time.perf_counter() - started) / batch)
+
+    # Throughput: operasi cepat diulang beberapa kali per sampel agar timer cukup akurat
+    loops = max(1, int(MIN_SAMPLE_SECONDS / call))
+    if loops == 1:
+        # Panggilan lambat: sampel latensi sudah per panggilan, tidak perlu diulang
+        throughput = latencies
+    else:
+        throughput = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            throughput.append((time.perf_counter() - started) / loops)
+
+    peak = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    mean = float(np.mean(throughput))
+    return {
+        "repeats": repeats,
+        "latency_samples": len(latencies),
+        "latency_batch": batch,
+        "bytes": nbytes,
+        "blocks": blocks,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": mean * 1000,
+        "blocks_per_second": _rate(blocks, mean),
+        "mb_per_second": _rate(nbytes / (1024 * 1024) if nbytes is not None else None, mean),
+        "peak_memory_kb": peak / 1024 if peak is not None else None,
+    }
+
+
+# === Daftar kasus benchmark ===
+
+def _payload(size):
+    return np.random.default_rng(size).integers(0, 256, size, dtype=np.uint8).tobytes()
+
+def _text(size):
+    return "".join(chr(0x20 + b % 95) for b in _payload(size))
+
+def _ready(fn):
+    """Setup for a case that needs no preparation."""
+    return lambda: fn
+
+def _core_cases():
+    cases = []
+    for trace in (TRACE_FULL, TRACE_SUMMARY, TRACE_OFF):
+        cases.append((f"main.encrypt/trace={trace}", _ready(lambda t=trace: encrypt(0x6869, KEY_16BIT, t)), 2, 1))
+        cases.append((f"main.decrypt/trace={trace}", _ready(lambda t=trace: decrypt(0x82C4, KEY_16BIT, t)), 2, 1))
+
+    def uncached_expansion():
+        clear_key_cache()
+        get_round_keys(KEY_16BIT)
+
+    cases.append(("key_expansion", _ready(lambda: key_expansion(KEY_16BIT)), None, None))
+    cases.append(("key_expansion/cache_miss", _ready(uncached_expansion), None, None))
+    cases.append(("key_expansion/cache_hit", _ready(lambda: get_round_keys(KEY_16BIT)), None, None))
+    return cases
+
+def _bytes_case(mode, size, decrypting):
+    """Setup for a bytes-API case; the payload is only built when the case runs."""
+    def setup():
+        data = _payload(size)
+        if not decrypting:
+            return lambda: encrypt_bytes(data, KEY, mode)
+        ciphertext = encrypt_bytes(data, KEY, mode)
+        return lambda: decrypt_bytes(ciphertext, KEY, mode)
+    return setup
+
+def _text_case(mode, size, trace, decrypting):
+    def setup():
+        encrypt_fn, decrypt_fn = _TEXT_APIS[mode]
+        text = _text(size)
+        if not decrypting:
+            return lambda: encrypt_fn(text, KEY, trace=trace)
+        ciphertext = encrypt_fn(text, KEY, trace=trace)[0]
+        return lambda: decrypt_fn(ciphertext, KEY, trace=trace)
+    return setup
+
+def _mode_cases(sizes, max_traced_bytes):
+    cases = []
+    for size in sizes:
+        label = format_size(size)
+        for mode in MODES:
+            for action in ("encrypt", "decrypt"):
+                # pad_bytes selalu menambah 1-2 byte pada ECB/CBC; CTR tanpa padding
+                blocks = (size + 1) // 2 if mode == "CTR" else size // 2 + 1
+                cases.append((f"bytes/{mode}/{action}/{label}", _bytes_case(mode, size, action == "decrypt"),
+                              size, blocks))
+        if size > max_traced_bytes:
+            continue
+        for mode in MODES:
+            for trace in (TRACE_FULL, TRACE_OFF):
+                for action in ("encrypt", "decrypt"):
+                    cases.append((f"text/{mode}/{action}/trace={trace}/{label}",
+                                  _text_case(mode, size, trace, action == "decrypt"), size, (size + 1) // 2))
+    return cases
+
+def _avalanche_cases():
+    # blocks = jumlah enkripsi blok per panggilan (sac_analysis: satu codebook penuh)
+    return [
+        ("avalanche/plaintext_bit", _ready(lambda: analyze_plaintext_avalanche("hi", KEY, 0)), None, 2),
+        ("avalanche/key_bit", _ready(lambda: analyze_key_avalanche("hi", KEY, 0)), None, 2),
+        ("avalanche/full", _ready(lambda: full_avalanche_analysis("hi", KEY)), None, 64),
+        ("avalanche/sac_analysis", _ready(lambda: sac_analysis(KEY_16BIT)), None, 65536),
+    ]
+
+def _file_cases(directory):
+    ciphertext, logs = ecb_encrypt(_text(1024), KEY, trace=TRACE_FULL)
+    data = {"mode": "Encryption", "block_mode": "ECB", "input": _text(1024), "key": KEY,
+            "output": ciphertext, "logs": list(logs)}
+    txt_path = os.path.join(directory, "bench.txt")
+    csv_path = os.path.join(directory, "bench.csv")
+    save_to_txt(data, txt_path)
+    size = os.path.getsize(txt_path)
+    # Ukuran = laporan TXT yang ditulis/dibaca; tidak ada blok yang dienkripsi
+    return [
+        ("file_handler/save_to_txt", _ready(lambda: save_to_txt(data, txt_path)), size, None),
+        ("file_handler/save_to_csv", _ready(lambda: save_to_csv(data, csv_path)), size, None),
+        ("file_handler/load_from_file", _ready(lambda: load_from_file(txt_path)), size, None),
+    ]
+
+def build_cases(sizes=DEFAULT_SIZES, max_traced_bytes=DEFAULT_MAX_TRACED_BYTES, directory=None):
+    """All benchmark cases as (name, setup, bytes, blocks) per call (None = not applicable); setup() returns the timed fn."""
+    cases = _core_cases() + _mode_cases(sizes, max_traced_bytes) + _avalanche_cases()
+    if directory is not None:
+        cases += _file_cases(directory)
+    return cases
+
+def _repeats_for(nbytes, repeats):
+    # Payload besar cukup diulang sedikit agar suite tetap selesai dalam waktu wajar
+    return max(2, min(repeats, repeats * (8 * 1024 * 1024) // max(nbytes or 0, 1)))
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS, only=None,
+                   max_traced_bytes=DEFAULT_MAX_TRACED_BYTES, track_memory=True, progress=None,
+                   samples=DEFAULT_LATENCY_SAMPLES):
+    """Run the suite and return {"meta": ..., "results": {case name: stats}}.
+
+    `only` keeps the cases whose name contains that substring.
+    `progress(name, stats)` is called after each case.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, setup, nbytes, blocks in build_cases(sizes, max_traced_bytes, directory):
+            if only and only not in name:
+                continue
+            stats = measure(setup(), _repeats_for(nbytes, repeats), nbytes, track_memory, blocks, samples)
+            results[name] = stats
+            if progress is not None:
+                progress(name, stats)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+# === Baseline & regression gating ===
+
+def save_baseline(report, path=DEFAULT_BASELINE_PATH):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    return path
+
+def load_baseline(path=DEFAULT_BASELINE_PATH):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Cases whose p50 latency grew by more than `threshold` (0.25 = 25%) over the baseline."""
+    regressions = []
+    for name, stats in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or old["p50_ms"] <= 0:
+            continue
+        ratio = stats["p50_ms"] / old["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append({"name": name, "baseline_p50_ms": old["p50_ms"],
+                                "p50_ms": stats["p50_ms"], "ratio": ratio})
+    return regressions
+
+def _print_row(name, stats):
+    def column(value, width, spec):
+        return f"{value:{width}{spec}}" if value is not None else f"{'-':>{width}}"
+    print(f"{name:<48} {stats['p50_ms']:10.3f} {stats['p99_ms']:10.3f} "
+          f"{column(stats['blocks_per_second'], 14, '.0f')} {column(stats['mb_per_second'], 9, '.2f')} "
+          f"{column(stats['peak_memory_kb'], 10, '.1f')}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mini-AES benchmark suite")
+    parser.add_argument("--sizes", default=",".join(format_size(s) for s in DEFAULT_SIZES),
+                        help="payload sizes, e.g. 16,1K,1M,100M")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="loop-averaged samples for the throughput figures")
+    parser.add_argument("--samples", type=int, default=DEFAULT_LATENCY_SAMPLES,
+                        help="latency samples for p50/p99 (default: %(default)s)")
+    parser.add_argument("--only", help="only run cases whose name contains this text")
+    parser.add_argument("--max-traced", default=format_size(DEFAULT_MAX_TRACED_BYTES),
+                        help="largest payload for the text (traced) APIs")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed p50 slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<48} {'p50 ms':>10} {'p99 ms':>10} {'blocks/s':>14} {'MB/s':>9} {'peak KB':>10}")
+    report = run_benchmarks(
+        sizes=[parse_size(s) for s in args.sizes.split(",") if s.strip()],
+        repeats=args.repeats,
+        only=args.only,
+        max_traced_bytes=parse_size(args.max_traced),
+        track_memory=not args.no_memory,
+        progress=_print_row,
+        samples=args.samples,
+    )
+    if args.save:
+        print(f"Baseline disimpan ke {save_baseline(report, args.save)}")
+    if args.baseline:
+        regressions = compare(report, load_baseline(args.baseline), args.threshold)
+        for item in regressions:
+            print(f"REGRESI {item['name']}: {item['baseline_p50_ms']:.3f} ms -> {item['p50_ms']:.3f} ms "
+                  f"(x{item['ratio']:.2f})")
+        if regressions:
+            return 1
+        print("Tidak ada regresi.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+from functools import reduce
+
+import numpy as np
+
+from utils import s_box, inv_s_box
+from main import encrypt
+from trace_log import TRACE_OFF
+from key_expansion import get_round_keys
+import packed_core
+
+# Backend bitsliced: 16 bit-plane (satu per bit state packed, bit 0 = LSB),
+# masing-masing array uint64 yang menyimpan bit yang sama dari 64 blok per word.
+# SubNibbles menjadi sirkuit AND/XOR (ANF S-Box), ShiftRows/MixColumns menjadi
+# XOR antar plane, dan AddRoundKey membalik plane yang bit key-nya 1.
+
+PLANE_BITS = 64
+
+def _anf(table):
+    """Algebraic normal form of each output bit of a 4-bit S-Box: monomial masks per bit."""
+    outputs = []
+    for bit in range(4):
+        coefficients = [(table[x] >> bit) & 1 for x in range(16)]
+        for i in range(4):  # transformasi Mobius
+            for x in range(16):
+                if x & (1 << i):
+                    coefficients[x] ^= coefficients[x ^ (1 << i)]
+        outputs.append([monomial for monomial in range(16) if coefficients[monomial]])
+    return outputs
+
+def _linear_circuit(layer):
+    """For a GF(2)-linear packed layer, the input bits XORed into each output bit."""
+    images = [layer(1 << i) for i in range(16)]
+    return [[i for i in range(16) if (images[i] >> j) & 1] for j in range(16)]
+
+SBOX_ANF = _anf(s_box)
+INV_SBOX_ANF = _anf(inv_s_box)
+SHIFT_ROWS_CIRCUIT = _linear_circuit(packed_core.shift_rows)
+MIX_COLUMNS_CIRCUIT = _linear_circuit(packed_core.mix_columns)
+INV_MIX_COLUMNS_CIRCUIT = _linear_circuit(packed_core.inv_mix_columns)
+
+
+# === Transpose blok <-> bit-plane ===
+
+def bitslice(blocks):
+    """Transpose a uint16 block array into 16 uint64 bit-planes (padded to 64 blocks)."""
+    blocks = np.asarray(blocks, dtype=np.uint16)
+    padded = np.zeros(-(-len(blocks) // PLANE_BITS) * PLANE_BITS, dtype=np.uint16)
+    padded[:len(blocks)] = blocks
+    # Kolom i dari `bits` = bit i setiap blok; dipack ulang per kolom menjadi plane
+    bits = np.unpackbits(padded.astype('<u2').view(np.uint8).reshape(-1, 2), axis=1, bitorder='little')
+    packed = np.ascontiguousarray(np.packbits(bits, axis=0, bitorder='little').T)
+    return list(packed.view(np.uint64))
+
+def unbitslice(planes, count):
+    """Inverse of bitslice: the first `count` blocks as a uint16 array."""
+    blocks = np.zeros(count, dtype=np.uint16)
+    for i, plane in enumerate(planes):
+        bits = np.unpackbits(plane.view(np.uint8), bitorder='little')[:count]
+        blocks |= bits.astype(np.uint16) << np.uint16(i)
+    return blocks
+
+
+# === Operasi per tahap pada bit-plane ===
+
+def _xor_all(planes):
+    return reduce(np.bitwise_xor, planes)
+
+def _apply_sbox(planes, anf):
+    result = list(planes)
+    for base in range(0, 16, 4):
+        x = planes[base:base + 4]
+        monomials = [np.full_like(x[0], np.uint64(0xFFFFFFFFFFFFFFFF))]
+        for m in range(1, 16):
+            low = (m & -m).bit_length() - 1
+            monomials.append(monomials[m & (m - 1)] & x[low])
+        for bit, terms in enumerate(anf):
+            result[base + bit] = _xor_all([monomials[m] for m in terms])
+    return result
+
+def _apply_linear(planes, circuit):
+    return [_xor_all([planes[i] for i in inputs]) for inputs in circuit]
+
+def sub_nibbles(planes):
+    return _apply_sbox(planes, SBOX_ANF)
+
+def inv_sub_nibbles(planes):
+    return _apply_sbox(planes, INV_SBOX_ANF)
+
+def shift_rows(planes):
+    return _apply_linear(planes, SHIFT_ROWS_CIRCUIT)
+
+inv_shift_rows = shift_rows
+
+def mix_columns(planes):
+    return _apply_linear(planes, MIX_COLUMNS_CIRCUIT)
+
+def inv_mix_columns(planes):
+    return _apply_linear(planes, INV_MIX_COLUMNS_CIRCUIT)
+
+def add_round_key(planes, key):
+    """XOR a packed 16-bit round key into every block: planes with a 1 key bit are inverted."""
+    return [~plane if (key >> i) & 1 else plane for i, plane in enumerate(planes)]
+
+def encrypt_planes(planes, k0, k1, k2):
+    planes = add_round_key(planes, k0)
+    planes = add_round_key(mix_columns(shift_rows(sub_nibbles(planes))), k1)
+    return add_round_key(shift_rows(sub_nibbles(planes)), k2)
+
+def decrypt_planes(planes, k0, k1, k2):
+    planes = inv_sub_nibbles(inv_shift_rows(add_round_key(planes, k2)))
+    planes = inv_sub_nibbles(inv_shift_rows(inv_mix_columns(add_round_key(planes, k1))))
+    return add_round_key(planes, k0)
+
+def encrypt_blocks(blocks, key_16bit):
+    """Encrypt a uint16 block array under one key with the bitsliced circuit."""
+    blocks = np.asarray(blocks, dtype=np.uint16)
+    return unbitslice(encrypt_planes(bitslice(blocks), *get_round_keys(key_16bit)), len(blocks))
+
+def decrypt_blocks(blocks, key_16bit):
+    """Decrypt a uint16 block array under one key with the bitsliced circuit."""
+    blocks = np.asarray(blocks, dtype=np.uint16)
+    return unbitslice(decrypt_planes(bitslice(blocks), *get_round_keys(key_16bit)), len(blocks))
+
+def self_test(key_16bit, samples=64):
+    """Check the bitsliced circuit against main.encrypt on `samples` spread-out blocks."""
+    blocks = (np.arange(samples, dtype=np.uint32) * 0x9E37 & 0xFFFF).astype(np.uint16)
+    expected = [encrypt(int(block), key_16bit, TRACE_OFF)[0] for block in blocks]
+    ciphertext = encrypt_blocks(blocks, key_16bit)
+    if ciphertext.tolist() != expected or decrypt_blocks(ciphertext, key_16bit).tolist() != blocks.tolist():
+        raise ValueError("Backend bitsliced tidak cocok dengan main.encrypt")
+
+
+class BitslicedBackend:
+    """Bitsliced ECB/CBC-decrypt backend bound to one key.
+
+    Has the same interface as parallel.ShardedExecutor, so it can be passed
+    as `executor` to the block_modes ECB/CBC/CTR functions. The circuit is
+    checked against main.encrypt when the backend is created.
+    """
+
+    def __init__(self, key_16bit, verify=True):
+        self.key = key_16bit
+        self._round_keys = get_round_keys(key_16bit)
+        if verify:
+            self_test(key_16bit)
+
+    def check_key(self, key_16bit):
+        if key_16bit != self.key:
+            raise ValueError("Backend dibuat untuk key yang berbeda.")
+
+    def ecb_encrypt(self, words):
+        words = np.asarray(words, dtype=np.uint16)
+        return unbitslice(encrypt_planes(bitslice(words), *self._round_keys), len(words))
+
+    def ecb_decrypt(self, words):
+        words = np.asarray(words, dtype=np.uint16)
+        return unbitslice(decrypt_planes(bitslice(words), *self._round_keys), len(words))
+
+    def cbc_decrypt(self, words, iv_16bit):
+        """CBC-decrypt a uint16 word array (IV excluded): P[i] = D(C[i]) ^ C[i-1]."""
+        words = np.asarray(words, dtype=np.uint16)
+        previous = np.empty_like(words)
+        if len(words):
+            previous[0] = iv_16bit
+            previous[1:] = words[:-1]
+        return self.ecb_decrypt(words) ^ previous
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
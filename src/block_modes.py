@@ -1,6 +1,25 @@
 from utils import text_to_state, state_to_text, chars_to_16bit, bit16_to_chars
 from main import encrypt, decrypt
+from key_expansion import get_round_keys
+from packed_core import encrypt_block as packed_encrypt_block, decrypt_block as packed_decrypt_block
+from trace_log import TraceLog, NO_LOGS, TRACE_OFF, TRACE_SUMMARY, TRACE_FULL, check_trace_mode
+from batch_engine import (ecb_encrypt_array, ecb_decrypt_array, cbc_decrypt_array, text_to_blocks, blocks_to_text,
+                          codebook_arrays)
 import random
+import numpy as np
+
+# Minimal jumlah blok agar ECB / CBC-decrypt tanpa trace memakai backend NumPy
+BATCH_THRESHOLD = 256
+
+# Template baris log mode blok (dipakai juga oleh log_viewer untuk satu blok)
+BLOCK_HEADER = "\n=== Processing Block {0}: '{1}' ==="
+BLOCK_SUMMARY = "Block {0}: 0x{1:04X} -> 0x{2:04X}"
+IV_HEADER = "\n=== Using IV: '{0}' (0x{1:04X}) ==="
+CHAIN_XOR = "XOR with previous: {0} ^ {1} = {2}"
+NONCE_HEADER = "\n=== Using Nonce: '{0}' (0x{1:04X}) ==="
+COUNTER_LINE = "Counter: 0x{0:04X}"
+KEYSTREAM_XOR = "XOR with keystream 0x{0:04X}: '{1}' -> '{2}'"
+COUNTER_SUMMARY = "Block {0}: counter 0x{1:04X}, keystream 0x{2:04X}"
 
 def pad_text(text):
     """Pad the text to ensure it's a multiple of 2 characters (16-bit blocks)."""
@@ -20,49 +39,154 @@ def split_to_blocks(text):
     
     return blocks
 
-def ecb_encrypt(plaintext, key):
-    """ECB mode encryption: each block is encrypted independently."""
+def _resolve_key(key, cipher):
+    """Return the 16-bit key, taken from the keyed cipher when one is given."""
+    if cipher is not None:
+        return cipher.key
+    return chars_to_16bit(key[:2])  # Use first 2 chars as key
+
+def _batch_blocks(text, trace, executor=None):
+    """Return `text` as a uint16 block array if the NumPy batch path applies, else None.
+
+    An `executor` only runs on this path; combining it with tracing or
+    non-Latin-1 text raises ValueError instead of silently running serially.
+    """
+    if check_trace_mode(trace) != TRACE_OFF:
+        if executor is not None:
+            raise ValueError("executor hanya berlaku untuk trace='off'; run dengan log selalu serial per blok")
+        return None
+    if executor is None and len(text) < 2 * BATCH_THRESHOLD:
+        return None
+    blocks = text_to_blocks(pad_text(text))
+    if blocks is None and executor is not None:
+        raise ValueError("executor butuh teks Latin-1 (karakter <= U+00FF); pakai API bytes untuk teks lain")
+    return blocks
+
+def _ecb_words(words, key_16bit, decrypting, executor=None):
+    """ECB over a uint16 array, run by `executor` if given.
+
+    `executor` is a parallel.ShardedExecutor (process shards) or a
+    bitslice.BitslicedBackend (bitsliced circuit); both are bound to one key.
+    """
+    if executor is not None:
+        executor.check_key(key_16bit)
+        return executor.ecb_decrypt(words) if decrypting else executor.ecb_encrypt(words)
+    return ecb_decrypt_array(words, key_16bit) if decrypting else ecb_encrypt_array(words, key_16bit)
+
+def _cbc_decrypt_words(words, key_16bit, iv_16bit, executor=None):
+    """CBC decryption over a uint16 array, run by `executor` if given."""
+    if executor is not None:
+        executor.check_key(key_16bit)
+        return executor.cbc_decrypt(words, iv_16bit)
+    return cbc_decrypt_array(words, key_16bit, iv_16bit)
+
+def _new_log(trace):
+    """Return a fresh TraceLog, or None when tracing is off."""
+    return None if check_trace_mode(trace) == TRACE_OFF else TraceLog()
+
+def _encrypt_block(block_16bit, key_16bit, round_keys, cipher, trace, log):
+    """Encrypt one block with the codebook or the rounds, tracing into `log`.
+
+    `round_keys` is the packed schedule, fetched once per call from the key cache.
+    """
+    if cipher is not None:
+        # Karakter di atas U+00FF menghasilkan nilai > 16 bit; ambil 16 bit bawah
+        # seperti text_to_state pada jalur per round
+        cipher_16bit = cipher.encrypt_block(block_16bit & 0xFFFF)
+        if trace == TRACE_FULL:
+            log.add("Codebook lookup: 0x{0:04X} -> 0x{1:04X}", block_16bit, cipher_16bit)
+        return cipher_16bit
+    if trace == TRACE_FULL:
+        return encrypt(block_16bit, key_16bit, TRACE_FULL, log)[0]
+    return packed_encrypt_block(block_16bit & 0xFFFF, *round_keys)
+
+def _decrypt_block(block_16bit, key_16bit, round_keys, cipher, trace, log):
+    """Decrypt one block with the codebook or the rounds, tracing into `log`."""
+    if cipher is not None:
+        plain_16bit = cipher.decrypt_block(block_16bit & 0xFFFF)
+        if trace == TRACE_FULL:
+            log.add("Codebook lookup: 0x{0:04X} -> 0x{1:04X}", block_16bit, plain_16bit)
+        return plain_16bit
+    if trace == TRACE_FULL:
+        return decrypt(block_16bit, key_16bit, TRACE_FULL, log)[0]
+    return packed_decrypt_block(block_16bit & 0xFFFF, *round_keys)
+
+def _finish_log(log):
+    return NO_LOGS if log is None else log
+
+def ecb_encrypt(plaintext, key, cipher=None, trace=TRACE_FULL, executor=None):
+    """ECB mode encryption: each block is encrypted independently.
+
+    If `cipher` (a KeyedMiniAES) is given, blocks are encrypted with its
+    codebook instead of running the rounds. `trace` is "full", "summary"
+    (one line per block) or "off" (no logs); lines are formatted lazily.
+    Large untraced inputs are encrypted in one pass by the NumPy batch engine,
+    or by `executor` (a parallel.ShardedExecutor or bitslice.BitslicedBackend).
+    `executor` needs trace "off" and Latin-1 text; otherwise ValueError is raised.
+    """
+    key_16bit = _resolve_key(key, cipher)
+    batch = _batch_blocks(plaintext, trace, executor)
+    if batch is not None:
+        return blocks_to_text(_ecb_words(batch, key_16bit, False, executor)), NO_LOGS
+    
     blocks = split_to_blocks(plaintext)
-    key_16bit = chars_to_16bit(key[:2])  # Use first 2 chars as key
+    round_keys = get_round_keys(key_16bit)
+    log = _new_log(trace)
+    trace = trace.lower()
     
     ciphertext_blocks = []
-    logs = []
     
     for i, block in enumerate(blocks):
-        logs.append(f"\n=== Processing Block {i+1}: '{block}' ===")
         block_16bit = chars_to_16bit(block)
-        cipher_16bit, block_logs = encrypt(block_16bit, key_16bit)
-        logs.extend(block_logs)
+        if trace == TRACE_FULL:
+            log.add(BLOCK_HEADER, i + 1, block)
+        cipher_16bit = _encrypt_block(block_16bit, key_16bit, round_keys, cipher, trace, log)
+        if trace == TRACE_SUMMARY:
+            log.add(BLOCK_SUMMARY, i + 1, block_16bit, cipher_16bit)
         ciphertext_blocks.append(bit16_to_chars(cipher_16bit))
     
-    return ''.join(ciphertext_blocks), logs
+    return ''.join(ciphertext_blocks), _finish_log(log)
+
+def ecb_decrypt(ciphertext, key, cipher=None, trace=TRACE_FULL, executor=None):
+    """ECB mode decryption: each block is decrypted independently.
 
-def ecb_decrypt(ciphertext, key):
-    """ECB mode decryption: each block is decrypted independently."""
+    `executor` works as in ecb_encrypt (trace "off" and Latin-1 text only).
+    """
+    key_16bit = _resolve_key(key, cipher)
+    batch = _batch_blocks(ciphertext, trace, executor)
+    if batch is not None:
+        return blocks_to_text(_ecb_words(batch, key_16bit, True, executor)), NO_LOGS
+    
     blocks = split_to_blocks(ciphertext)
-    key_16bit = chars_to_16bit(key[:2])  # Use first 2 chars as key
+    round_keys = get_round_keys(key_16bit)
+    log = _new_log(trace)
+    trace = trace.lower()
     
     plaintext_blocks = []
-    logs = []
     
     for i, block in enumerate(blocks):
-        logs.append(f"\n=== Processing Block {i+1}: '{block}' ===")
         block_16bit = chars_to_16bit(block)
-        plain_16bit, block_logs = decrypt(block_16bit, key_16bit)
-        logs.extend(block_logs)
+        if trace == TRACE_FULL:
+            log.add(BLOCK_HEADER, i + 1, block)
+        plain_16bit = _decrypt_block(block_16bit, key_16bit, round_keys, cipher, trace, log)
+        if trace == TRACE_SUMMARY:
+            log.add(BLOCK_SUMMARY, i + 1, block_16bit, plain_16bit)
         plaintext_blocks.append(bit16_to_chars(plain_16bit))
     
-    return ''.join(plaintext_blocks), logs
+    return ''.join(plaintext_blocks), _finish_log(log)
 
 def generate_iv():
     """Generate a random 16-bit IV and return as 2 characters."""
     iv_value = random.randint(0, 65535)  # 0 to 2^16-1
     return bit16_to_chars(iv_value)
 
-def cbc_encrypt(plaintext, key, iv=None):
+def cbc_encrypt(plaintext, key, iv=None, cipher=None, trace=TRACE_FULL):
     """CBC mode encryption: each block is XORed with previous ciphertext before encryption."""
     blocks = split_to_blocks(plaintext)
-    key_16bit = chars_to_16bit(key[:2])  # Use first 2 chars as key
+    key_16bit = _resolve_key(key, cipher)
+    round_keys = get_round_keys(key_16bit)
+    log = _new_log(trace)
+    trace = trace.lower()
     
     # Generate IV if not provided
     if iv is None:
@@ -72,28 +196,33 @@ def cbc_encrypt(plaintext, key, iv=None):
     previous_block = iv_16bit
     
     ciphertext_blocks = []
-    logs = []
-    logs.append(f"\n=== Using IV: '{iv}' (0x{iv_16bit:04X}) ===")
+    if log is not None:
+        log.add(IV_HEADER, iv, iv_16bit)
     
     for i, block in enumerate(blocks):
-        logs.append(f"\n=== Processing Block {i+1}: '{block}' ===")
         block_16bit = chars_to_16bit(block)
         
         # XOR with previous ciphertext/IV
         xored_block = block_16bit ^ previous_block
-        logs.append(f"XOR with previous: {block_16bit} ^ {previous_block} = {xored_block}")
+        if trace == TRACE_FULL:
+            log.add(BLOCK_HEADER, i + 1, block)
+            log.add(CHAIN_XOR, block_16bit, previous_block, xored_block)
         
-        cipher_16bit, block_logs = encrypt(xored_block, key_16bit)
-        logs.extend(block_logs)
+        cipher_16bit = _encrypt_block(xored_block, key_16bit, round_keys, cipher, trace, log)
+        if trace == TRACE_SUMMARY:
+            log.add(BLOCK_SUMMARY, i + 1, block_16bit, cipher_16bit)
         
         ciphertext_blocks.append(bit16_to_chars(cipher_16bit))
         previous_block = cipher_16bit
     
     # Return ciphertext with IV prepended
-    return iv + ''.join(ciphertext_blocks), logs
+    return iv + ''.join(ciphertext_blocks), _finish_log(log)
+
+def cbc_decrypt(ciphertext, key, cipher=None, trace=TRACE_FULL, executor=None):
+    """CBC mode decryption: each decrypted block is XORed with previous ciphertext.
 
-def cbc_decrypt(ciphertext, key):
-    """CBC mode decryption: each decrypted block is XORed with previous ciphertext."""
+    `executor` works as in ecb_encrypt (trace "off" and Latin-1 text only).
+    """
     if len(ciphertext) < 2:
         raise ValueError("CBC ciphertext must include IV (at least 2 characters)")
     
@@ -101,29 +230,328 @@ def cbc_decrypt(ciphertext, key):
     iv = ciphertext[:2]
     actual_ciphertext = ciphertext[2:]
     
+    key_16bit = _resolve_key(key, cipher)
+    batch = _batch_blocks(actual_ciphertext, trace, executor)
+    if batch is not None:
+        return blocks_to_text(_cbc_decrypt_words(batch, key_16bit, chars_to_16bit(iv), executor)), NO_LOGS
+    
     blocks = split_to_blocks(actual_ciphertext)
-    key_16bit = chars_to_16bit(key[:2])  # Use first 2 chars as key
+    round_keys = get_round_keys(key_16bit)
+    log = _new_log(trace)
+    trace = trace.lower()
     
     iv_16bit = chars_to_16bit(iv)
     previous_block = iv_16bit
     
     plaintext_blocks = []
-    logs = []
-    logs.append(f"\n=== Using IV: '{iv}' (0x{iv_16bit:04X}) ===")
+    if log is not None:
+        log.add(IV_HEADER, iv, iv_16bit)
     
     for i, block in enumerate(blocks):
-        logs.append(f"\n=== Processing Block {i+1}: '{block}' ===")
         block_16bit = chars_to_16bit(block)
+        if trace == TRACE_FULL:
+            log.add(BLOCK_HEADER, i + 1, block)
         
         # Decrypt block
-        decrypted_16bit, block_logs = decrypt(block_16bit, key_16bit)
-        logs.extend(block_logs)
+        decrypted_16bit = _decrypt_block(block_16bit, key_16bit, round_keys, cipher, trace, log)
         
         # XOR with previous ciphertext/IV
         plaintext_16bit = decrypted_16bit ^ previous_block
-        logs.append(f"XOR with previous: {decrypted_16bit} ^ {previous_block} = {plaintext_16bit}")
+        if trace == TRACE_FULL:
+            log.add(CHAIN_XOR, decrypted_16bit, previous_block, plaintext_16bit)
+        elif trace == TRACE_SUMMARY:
+            log.add(BLOCK_SUMMARY, i + 1, block_16bit, plaintext_16bit)
         
         plaintext_blocks.append(bit16_to_chars(plaintext_16bit))
         previous_block = block_16bit
     
-    return ''.join(plaintext_blocks), logs
\ No newline at end of file
+    return ''.join(plaintext_blocks), _finish_log(log)
+
+def _ctr_xor_block(block, keystream_16bit):
+    """XOR a 1- or 2-character block with a keystream block (characters above U+00FF keep their high bits)."""
+    out = chr(ord(block[0]) ^ (keystream_16bit >> 8))
+    if len(block) == 2:
+        out += chr(ord(block[1]) ^ (keystream_16bit & 0xFF))
+    return out
+
+def _ctr_crypt(text, key_16bit, nonce, trace):
+    """Shared CTR body for text: encryption and decryption are the same XOR with E(nonce + i)."""
+    log = _new_log(trace)
+    trace = trace.lower()
+    nonce_16bit = chars_to_16bit(nonce)
+
+    if log is None:
+        try:
+            raw = text.encode('latin-1')
+        except UnicodeEncodeError:
+            raw = None  # karakter di atas U+00FF: pakai loop per blok
+        if raw is not None:
+            return ctr_xor_bytes(raw, key_16bit, nonce_16bit).decode('latin-1'), NO_LOGS
+
+    round_keys = get_round_keys(key_16bit)
+    out_blocks = []
+    if log is not None:
+        log.add(NONCE_HEADER, nonce, nonce_16bit)
+
+    for i in range(0, len(text), 2):
+        block = text[i:i+2]
+        counter = (nonce_16bit + i // 2) & 0xFFFF
+        if trace == TRACE_FULL:
+            log.add(BLOCK_HEADER, i // 2 + 1, block)
+            log.add(COUNTER_LINE, counter)
+        keystream = _encrypt_block(counter, key_16bit, round_keys, None, trace, log)
+        out_block = _ctr_xor_block(block, keystream)
+        if trace == TRACE_FULL:
+            log.add(KEYSTREAM_XOR, keystream, block, out_block)
+        elif trace == TRACE_SUMMARY:
+            log.add(COUNTER_SUMMARY, i // 2 + 1, counter, keystream)
+        out_blocks.append(out_block)
+
+    return ''.join(out_blocks), _finish_log(log)
+
+def ctr_encrypt(plaintext, key, nonce=None, trace=TRACE_FULL):
+    """CTR mode encryption: XOR with E(nonce + block index); output keeps the input length.
+
+    The 2-character nonce is prepended to the result, like the IV in CBC.
+    """
+    if nonce is None:
+        nonce = generate_iv()
+    output, logs = _ctr_crypt(plaintext, chars_to_16bit(key[:2]), nonce, trace)
+    return nonce + output, logs
+
+def ctr_decrypt(ciphertext, key, trace=TRACE_FULL):
+    """CTR mode decryption: regenerates the same keystream from the leading nonce."""
+    if len(ciphertext) < 2:
+        raise ValueError("CTR ciphertext must include nonce (at least 2 characters)")
+    return _ctr_crypt(ciphertext[2:], chars_to_16bit(key[:2]), ciphertext[:2], trace)
+
+
+DEFAULT_CHUNK_BLOCKS = 32 * 1024
+
+def iter_text_chunks(text, key, mode="ECB", action="encrypt", iv=None, chunk_blocks=DEFAULT_CHUNK_BLOCKS):
+    """Encrypt or decrypt text piece by piece, without trace logs.
+
+    Yields (blocks_done, output_piece); the pieces joined together equal the
+    output of the one-shot ecb_/cbc_/ctr_ function for the same input (for
+    CBC/CTR encryption the IV/nonce comes first, as a piece of its own).
+    CBC continues from the last ciphertext block and CTR from the counter
+    of the chunk, so every chunk is independent of how the text was split.
+    """
+    mode = mode.upper()
+    if mode not in ("ECB", "CBC", "CTR"):
+        raise ValueError(f"Unsupported block mode: {mode}")
+    if action not in ("encrypt", "decrypt"):
+        raise ValueError(f"Unknown action: {action}")
+    encrypting = action == "encrypt"
+    key_16bit = chars_to_16bit(key[:2])
+
+    header, body = '', text
+    if mode != "ECB":
+        if encrypting:
+            header = iv if iv else generate_iv()
+            yield 0, header
+        else:
+            if len(text) < 2:
+                raise ValueError(f"{mode} ciphertext must include IV/nonce (at least 2 characters)")
+            header, body = text[:2], text[2:]
+
+    step = 2 * chunk_blocks
+    previous = header  # CBC: blok ciphertext terakhir (awalnya IV)
+    for start in range(0, len(body), step):
+        piece = body[start:start + step]
+        if mode == "ECB":
+            output = (ecb_encrypt if encrypting else ecb_decrypt)(piece, key, trace=TRACE_OFF)[0]
+        elif mode == "CBC":
+            if encrypting:
+                output = cbc_encrypt(piece, key, previous, trace=TRACE_OFF)[0][2:]
+                previous = output[-2:]
+            else:
+                output = cbc_decrypt(previous + piece, key, trace=TRACE_OFF)[0]
+                previous = piece[-2:]
+        else:
+            nonce = header if start == 0 else bit16_to_chars((chars_to_16bit(header) + start // 2) & 0xFFFF)
+            output = _ctr_crypt(piece, key_16bit, nonce, TRACE_OFF)[0]
+        yield (start + len(piece) + 1) // 2, output
+
+
+# === API biner: bytes / bytearray / memoryview ===
+
+BLOCK_BYTES = 2
+
+def pad_bytes(data):
+    """Pad data to whole 16-bit blocks; every pad byte holds the pad length (1 or 2)."""
+    pad_len = BLOCK_BYTES - len(data) % BLOCK_BYTES
+    return bytes(data) + bytes([pad_len]) * pad_len
+
+def unpad_bytes(data):
+    """Remove padding added by pad_bytes, validating it."""
+    if not data or len(data) % BLOCK_BYTES:
+        raise ValueError("Padded data must be a non-empty multiple of 2 bytes")
+    pad_len = data[-1]
+    if pad_len not in (1, 2) or any(b != pad_len for b in data[-pad_len:]):
+        raise ValueError("Invalid padding (wrong key or corrupted ciphertext?)")
+    return bytes(data[:-pad_len])
+
+def key_to_16bit(key):
+    """Accept a key as 16-bit int, 2+ bytes, or 2+ characters."""
+    if isinstance(key, int):
+        if not 0 <= key <= 0xFFFF:
+            raise ValueError("Key harus bernilai 16-bit.")
+        return key
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        key = bytes(key[:2])
+        if len(key) != 2:
+            raise ValueError("Key harus 2 byte.")
+        return int.from_bytes(key, 'big')
+    return chars_to_16bit(key[:2])
+
+def iv_to_16bit(iv):
+    """Parse an IV like a key, generating a random one when it is None."""
+    if iv is None:
+        return random.randint(0, 65535)
+    iv_16bit = key_to_16bit(iv)
+    if iv_16bit > 0xFFFF:
+        raise ValueError("IV harus bernilai 16-bit (karakter <= U+00FF).")
+    return iv_16bit
+
+def bytes_to_words(data):
+    """View an even-length buffer as big-endian 16-bit words (uint16 array), without copying per block."""
+    if len(data) % BLOCK_BYTES:
+        raise ValueError("Data length must be a multiple of 2 bytes")
+    return np.frombuffer(data, dtype='>u2').astype(np.uint16)
+
+def words_to_bytes(words):
+    """Serialize 16-bit words back to big-endian bytes."""
+    return np.asarray(words, dtype='>u2').tobytes()
+
+# Mulai ukuran ini codebook 65.536 entri lebih murah daripada encrypt_block per blok
+CBC_CODEBOOK_BLOCKS = 16 * 1024
+
+def cbc_encrypt_words(words, key_16bit, iv_16bit, chunk_blocks=DEFAULT_CHUNK_BLOCKS):
+    """CBC-encrypt a uint16 word array (serial); returns (cipher words, last cipher block).
+
+    The chain runs over bounded chunks written into a preallocated array, so
+    the Python-int overhead is limited to `chunk_blocks` blocks at a time.
+    """
+    words = np.asarray(words, dtype=np.uint16)
+    out = np.empty_like(words)
+    previous = iv_16bit
+    if len(words) >= CBC_CODEBOOK_BLOCKS:
+        table = codebook_arrays(key_16bit)[0].tolist()
+        for start in range(0, len(words), chunk_blocks):
+            cipher = []
+            append = cipher.append
+            for block in words[start:start + chunk_blocks].tolist():
+                previous = table[block ^ previous]
+                append(previous)
+            out[start:start + len(cipher)] = cipher
+    else:
+        k0, k1, k2 = get_round_keys(key_16bit)
+        for i, block in enumerate(words.tolist()):
+            previous = packed_encrypt_block(block ^ previous, k0, k1, k2)
+            out[i] = previous
+    return out, previous
+
+def ecb_encrypt_bytes(data, key, executor=None):
+    """ECB-encrypt a byte buffer; returns padded ciphertext bytes."""
+    return words_to_bytes(_ecb_words(bytes_to_words(pad_bytes(data)), key_to_16bit(key), False, executor))
+
+def ecb_decrypt_bytes(data, key, executor=None):
+    """ECB-decrypt a byte buffer produced by ecb_encrypt_bytes and strip the padding."""
+    return unpad_bytes(words_to_bytes(_ecb_words(bytes_to_words(data), key_to_16bit(key), True, executor)))
+
+def cbc_encrypt_bytes(data, key, iv=None):
+    """CBC-encrypt a byte buffer; returns the 2-byte IV followed by the ciphertext."""
+    iv_16bit = iv_to_16bit(iv)
+    cipher_words, _ = cbc_encrypt_words(bytes_to_words(pad_bytes(data)), key_to_16bit(key), iv_16bit)
+    return iv_16bit.to_bytes(2, 'big') + words_to_bytes(cipher_words)
+
+def cbc_decrypt_bytes(data, key, executor=None):
+    """CBC-decrypt a buffer of IV + ciphertext and strip the padding."""
+    if len(data) < 2 * BLOCK_BYTES:
+        raise ValueError("CBC ciphertext must include IV and at least one block")
+    iv_16bit = int.from_bytes(bytes(data[:2]), 'big')
+    words = bytes_to_words(memoryview(data)[2:])
+    return unpad_bytes(words_to_bytes(_cbc_decrypt_words(words, key_to_16bit(key), iv_16bit, executor)))
+
+def ctr_keystream(key_16bit, nonce_16bit, start_block, count, executor=None):
+    """Keystream blocks E(nonce + i) for i in [start_block, start_block + count) as a uint16 array.
+
+    Any range can be generated independently, in one batch or sharded across `executor`.
+    """
+    counters = ((np.arange(start_block, start_block + count, dtype=np.uint64) + nonce_16bit) & 0xFFFF).astype(np.uint16)
+    return _ecb_words(counters, key_16bit, False, executor)
+
+def ctr_xor_bytes(data, key_16bit, nonce_16bit, start_block=0, executor=None):
+    """XOR `data` with the CTR keystream that starts at block `start_block`."""
+    data = np.frombuffer(data, dtype=np.uint8)
+    keystream = ctr_keystream(key_16bit, nonce_16bit, start_block, (len(data) + 1) // 2, executor)
+    keystream = np.frombuffer(words_to_bytes(keystream), dtype=np.uint8)[:len(data)]
+    return (data ^ keystream).tobytes()
+
+def ctr_encrypt_bytes(data, key, nonce=None, executor=None):
+    """CTR-encrypt a byte buffer; returns the 2-byte nonce followed by same-length ciphertext."""
+    nonce_16bit = iv_to_16bit(nonce)
+    return nonce_16bit.to_bytes(2, 'big') + ctr_xor_bytes(data, key_to_16bit(key), nonce_16bit, 0, executor)
+
+def ctr_decrypt_bytes(data, key, executor=None):
+    """CTR-decrypt a buffer of nonce + ciphertext."""
+    if len(data) < 2:
+        raise ValueError("CTR ciphertext must include nonce (at least 2 bytes)")
+    nonce_16bit = int.from_bytes(bytes(data[:2]), 'big')
+    return ctr_xor_bytes(memoryview(data)[2:], key_to_16bit(key), nonce_16bit, 0, executor)
+
+def ctr_decrypt_range(source, key, offset, length, executor=None):
+    """Decrypt `length` plaintext bytes starting at `offset` from a CTR ciphertext.
+
+    `source` is the nonce + ciphertext, as a buffer or a seekable binary file;
+    only the nonce and the blocks covering the range are read.
+    """
+    if offset < 0 or length < 0:
+        raise ValueError("offset and length must be non-negative")
+    first_block = offset // BLOCK_BYTES
+    end_block = (offset + length + BLOCK_BYTES - 1) // BLOCK_BYTES
+    start = 2 + first_block * BLOCK_BYTES
+    size = (end_block - first_block) * BLOCK_BYTES
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+        header = source.read(2)
+        source.seek(start)
+        chunk = source.read(size)
+    else:
+        header = bytes(source[:2])
+        chunk = bytes(source[start:start + size])
+    if len(header) < 2:
+        raise ValueError("CTR ciphertext must include nonce (at least 2 bytes)")
+
+    plain = ctr_xor_bytes(chunk, key_to_16bit(key), int.from_bytes(header, 'big'), first_block, executor)
+    skip = offset - first_block * BLOCK_BYTES
+    return plain[skip:skip + length]
+
+def encrypt_bytes(data, key, mode="ECB", iv=None, executor=None):
+    """Encrypt bytes with the given block mode ("ECB", "CBC" or "CTR").
+
+    `executor` (parallel.ShardedExecutor or bitslice.BitslicedBackend) runs
+    the ECB and CTR work; CBC encryption is inherently serial and ignores it. For CTR,
+    `iv` is the nonce.
+    """
+    mode = mode.upper()
+    if mode == "ECB":
+        return ecb_encrypt_bytes(data, key, executor)
+    if mode == "CBC":
+        return cbc_encrypt_bytes(data, key, iv)
+    if mode == "CTR":
+        return ctr_encrypt_bytes(data, key, iv, executor)
+    raise ValueError(f"Unsupported block mode: {mode}")
+
+def decrypt_bytes(data, key, mode="ECB", executor=None):
+    """Decrypt bytes produced by encrypt_bytes with the same block mode."""
+    mode = mode.upper()
+    if mode == "ECB":
+        return ecb_decrypt_bytes(data, key, executor)
+    if mode == "CBC":
+        return cbc_decrypt_bytes(data, key, executor)
+    if mode == "CTR":
+        return ctr_decrypt_bytes(data, key, executor)
+    raise ValueError(f"Unsupported block mode: {mode}")
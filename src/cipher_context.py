@@ -0,0 +1,142 @@
+from batch_engine import ecb_encrypt_array, ecb_decrypt_array, cbc_decrypt_array
+from block_modes import (BLOCK_BYTES, bytes_to_words, words_to_bytes, cbc_encrypt_words, ctr_xor_bytes,
+                         pad_bytes, unpad_bytes, key_to_16bit, iv_to_16bit)
+
+SUPPORTED_MODES = ("ECB", "CBC", "CTR")
+
+
+class _CipherContext:
+    """Shared state for incremental (hashlib-style) Mini-AES contexts."""
+
+    def __init__(self, key, mode):
+        mode = mode.upper()
+        if mode not in SUPPORTED_MODES:
+            raise ValueError(f"Unsupported block mode: {mode}")
+        self.mode = mode
+        self.key = key_to_16bit(key)
+        self._buffer = b''
+        self._finalized = False
+        self._ctr_position = 0
+
+    def _check_open(self):
+        if self._finalized:
+            raise ValueError("Context sudah di-finalize.")
+
+    def _take_blocks(self, data, keep=0):
+        """Append data to the buffer and return as many whole blocks as possible,
+        holding back at least `keep` bytes."""
+        data = self._buffer + bytes(data)
+        cut = len(data) - keep
+        cut = max(cut - cut % BLOCK_BYTES, 0)
+        self._buffer = data[cut:]
+        return data[:cut]
+
+    def _ctr_crypt(self, data):
+        """XOR data with the CTR keystream at the current stream position (no buffering)."""
+        position = self._ctr_position
+        first_block = position // BLOCK_BYTES
+        skip = position - first_block * BLOCK_BYTES
+        self._ctr_position += len(data)
+        return ctr_xor_bytes(bytes(skip) + bytes(data), self.key, self.iv, first_block)[skip:]
+
+
+class Encryptor(_CipherContext):
+    """Incremental encryptor: update(data) returns ciphertext at once, finalize() pads.
+
+    Output matches block_modes.encrypt_bytes for the same key, mode and IV/nonce;
+    for CBC and CTR the 2-byte IV/nonce comes first.
+    """
+
+    def __init__(self, key, mode="ECB", iv=None):
+        super().__init__(key, mode)
+        self.iv = iv_to_16bit(iv) if self.mode != "ECB" else None
+        self._previous = self.iv
+        self._header = self.iv.to_bytes(2, 'big') if self.iv is not None else b''
+
+    def _emit(self, body):
+        header, self._header = self._header, b''
+        return header + body
+
+    def _encrypt_blocks(self, data):
+        if not data:
+            return b''
+        words = bytes_to_words(data)
+        if self.mode == "ECB":
+            return words_to_bytes(ecb_encrypt_array(words, self.key))
+        cipher_words, self._previous = cbc_encrypt_words(words, self.key, self._previous)
+        return words_to_bytes(cipher_words)
+
+    def update(self, data):
+        """Encrypt the next piece of data and return the ciphertext that is ready."""
+        self._check_open()
+        if self.mode == "CTR":
+            return self._emit(self._ctr_crypt(data))
+        return self._emit(self._encrypt_blocks(self._take_blocks(data)))
+
+    def finalize(self):
+        """Pad and encrypt the trailing partial block (ECB/CBC) and close the context."""
+        self._check_open()
+        self._finalized = True
+        if self.mode == "CTR":
+            return self._emit(b'')
+        tail, self._buffer = self._buffer, b''
+        return self._emit(self._encrypt_blocks(pad_bytes(tail)))
+
+
+class Decryptor(_CipherContext):
+    """Incremental decryptor: update(data) returns plaintext at once, finalize() unpads.
+
+    For ECB and CBC the last block is held back until finalize() so the
+    padding can be checked and removed.
+    """
+
+    def __init__(self, key, mode="ECB"):
+        super().__init__(key, mode)
+        self.iv = None
+        self._previous = None
+
+    def _read_header(self, data):
+        """Consume the 2-byte IV/nonce from the front of the stream; returns the rest."""
+        if self.mode == "ECB" or self.iv is not None:
+            return data
+        data = self._buffer + bytes(data)
+        if len(data) < 2:
+            self._buffer = data
+            return None
+        self._buffer = b''
+        self.iv = self._previous = int.from_bytes(data[:2], 'big')
+        return data[2:]
+
+    def _decrypt_blocks(self, data):
+        if not data:
+            return b''
+        words = bytes_to_words(data)
+        if self.mode == "ECB":
+            return words_to_bytes(ecb_decrypt_array(words, self.key))
+        plain = cbc_decrypt_array(words, self.key, self._previous)
+        self._previous = int(words[-1])
+        return words_to_bytes(plain)
+
+    def update(self, data):
+        """Decrypt the next piece of data and return the plaintext that is ready."""
+        self._check_open()
+        data = self._read_header(data)
+        if data is None:
+            return b''
+        if self.mode == "CTR":
+            return self._ctr_crypt(data)
+        # Simpan minimal 1 blok untuk dibuang padding-nya saat finalize()
+        return self._decrypt_blocks(self._take_blocks(data, keep=BLOCK_BYTES))
+
+    def finalize(self):
+        """Decrypt the held-back block, verify and strip padding, and close the context."""
+        self._check_open()
+        self._finalized = True
+        if self.mode != "ECB" and self.iv is None:
+            raise ValueError(f"{self.mode} ciphertext must include IV/nonce (at least 2 bytes)")
+        if self.mode == "CTR":
+            return b''
+        tail, self._buffer = self._buffer, b''
+        if len(tail) != BLOCK_BYTES:
+            raise ValueError("Ciphertext length is not a whole number of blocks (truncated data?)")
+        return unpad_bytes(self._decrypt_blocks(tail))
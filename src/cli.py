@@ -0,0 +1,315 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils import bit16_to_chars, bit16_to_hex
+from block_modes import key_to_16bit
+from file_handler import DEFAULT_CHUNK_SIZE, encrypt_stream, decrypt_stream
+from container import MAGIC, DEFAULT_CONTAINER_CHUNK, encrypt_stream_container, decrypt_stream_container
+from benchmark import parse_size
+
+# CLI non-interaktif untuk skrip shell / cron:
+#
+#   python src/cli.py encrypt --key Ab --mode CBC a.txt "logs/*.txt" -o out/
+#   cat data.bin | python src/cli.py encrypt --key 0x4162 --mode CTR > data.enc
+#   python src/cli.py decrypt --key Ab "out/*.enc" --workers 8
+#   python src/cli.py bench --sizes 1K,1M
+#   python src/cli.py analyze sac --key Ab
+#
+# Tanpa path (atau path "-") data dibaca dari stdin dan ditulis ke stdout
+# per chunk, jadi memori tetap konstan. Banyak file diproses paralel oleh
+# process pool; statistik per file (byte, detik, MB/s) ditulis ke stderr
+# supaya stdout tetap bersih untuk data.
+
+MODES = ("ECB", "CBC", "CTR")
+KEY_ENV = "MINI_AES_KEY"
+STDIO = "-"
+ENCRYPTED_SUFFIX = ".enc"
+CONTAINER_SUFFIX = ".maes"
+DECRYPTED_SUFFIX = ".dec"
+
+
+def parse_key(value):
+    """Key from the command line: 2 characters, or a 16-bit hex value such as 0x4162."""
+    if value[:2].lower() == "0x" and 3 <= len(value) <= 6:
+        try:
+            return int(value[2:], 16)
+        except ValueError:
+            pass
+    if len(value) < 2:
+        raise ValueError("Key harus 2 karakter atau nilai hex 16-bit (0x....).")
+    return key_to_16bit(value)
+
+def parse_chunk_size(value):
+    """argparse type for --chunk-size: a positive size such as 4096 or 64K."""
+    try:
+        size = parse_size(value)
+    except ValueError:
+        size = None
+    if size is None or size <= 0:
+        raise argparse.ArgumentTypeError(f"chunk size harus lebih dari 0 byte: {value}")
+    return size
+
+def expand_paths(patterns):
+    """Expand file paths and glob patterns in order, without duplicates; "-" is kept for stdin."""
+    paths, seen = [], set()
+    for pattern in patterns:
+        if pattern == STDIO:
+            matches = [STDIO]
+        elif glob.has_magic(pattern):
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+            if not matches:
+                raise ValueError(f"Tidak ada file yang cocok dengan pola: {pattern}")
+        else:
+            if not os.path.isfile(pattern):
+                raise ValueError(f"File tidak ditemukan: {pattern}")
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+def output_path(path, action, suffix=None, output_dir=None, container=False):
+    """Output file for `path`: encrypt appends .enc/.maes, decrypt strips it (or appends .dec)."""
+    directory, name = os.path.split(path)
+    if suffix is not None:
+        name += suffix
+    elif action == "encrypt":
+        name += CONTAINER_SUFFIX if container else ENCRYPTED_SUFFIX
+    else:
+        stem, extension = os.path.splitext(name)
+        name = stem if extension in (ENCRYPTED_SUFFIX, CONTAINER_SUFFIX) and stem else name + DECRYPTED_SUFFIX
+    return os.path.join(output_dir if output_dir is not None else directory, name)
+
+
+# === Enkripsi / dekripsi stream ===
+
+def _peek(source, size):
+    # Lihat byte awal tanpa mengonsumsinya (file seekable atau BufferedReader seperti stdin)
+    if source.seekable():
+        position = source.tell()
+        head = source.read(size)
+        source.seek(position)
+        return head
+    return source.peek(size)[:size]
+
+def crypt_stream(source, destination, key, action, mode="ECB", iv=None, container=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encrypt or decrypt one binary stream; decryption detects containers from the magic bytes."""
+    if action == "encrypt":
+        if not container:
+            return encrypt_stream(source, destination, key, mode, iv, chunk_size)
+        container_chunk = chunk_size - chunk_size % 2 or DEFAULT_CONTAINER_CHUNK
+        if destination.seekable():
+            return encrypt_stream_container(source, destination, key, mode, iv, container_chunk)
+        # Header container di-patch di akhir, jadi output non-seekable (pipe) ditampung dulu
+        with tempfile.TemporaryFile() as spool:
+            result = encrypt_stream_container(source, spool, key, mode, iv, container_chunk)
+            spool.seek(0)
+            shutil.copyfileobj(spool, destination, chunk_size)
+        return result
+    if _peek(source, len(MAGIC)) == MAGIC:
+        return decrypt_stream_container(source, destination, key)
+    return decrypt_stream(source, destination, key, mode, chunk_size)
+
+def process_file(task):
+    """Worker: encrypt/decrypt one file and return its statistics (errors are returned, not raised)."""
+    path, destination, key, action, mode, iv, container, chunk_size = task
+    start = time.perf_counter()
+    size = os.path.getsize(path)
+    try:
+        with open(path, 'rb') as source, open(destination, 'wb') as output:
+            result = crypt_stream(source, output, key, action, mode, iv, container, chunk_size)
+    except (ValueError, OSError) as e:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return {"path": path, "output_path": destination, "ok": False, "error": str(e)}
+    return _stats(path, destination, result["block_mode"], size, os.path.getsize(destination),
+                  time.perf_counter() - start)
+
+def _stats(path, destination, mode, bytes_read, bytes_written, seconds):
+    return {
+        "path": path,
+        "output_path": destination,
+        "ok": True,
+        "block_mode": mode,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "seconds": seconds,
+        "mb_per_s": bytes_read / seconds / 1e6 if seconds > 0 else 0.0,
+    }
+
+def _report(stats, as_json):
+    stream = sys.stderr
+    if as_json:
+        print(json.dumps(stats), file=stream)
+    elif stats["ok"]:
+        print(f"{stats['path']} -> {stats['output_path']} [{stats['block_mode']}] "
+              f"{stats['bytes_read']} B in {stats['seconds']:.3f} s ({stats['mb_per_s']:.2f} MB/s)", file=stream)
+    else:
+        print(f"GAGAL {stats['path']}: {stats['error']}", file=stream)
+
+def run_files(paths, args, key, action):
+    """Process many files on a worker pool; returns the list of per-file stats."""
+    tasks = []
+    for path in paths:
+        destination = output_path(path, action, args.suffix, args.output_dir, args.container)
+        if os.path.abspath(destination) == os.path.abspath(path):
+            raise ValueError(f"Output sama dengan input: {path}")
+        if os.path.exists(destination) and not args.force:
+            raise ValueError(f"Output sudah ada (pakai --force untuk menimpa): {destination}")
+        tasks.append((path, destination, key, action, args.mode, args.iv,
+                      args.container, args.chunk_size))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    results = []
+    workers = min(args.workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        for task in tasks:
+            results.append(process_file(task))
+            _report(results[-1], args.json)
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(process_file, task) for task in tasks]):
+            results.append(future.result())
+            _report(results[-1], args.json)
+    return results
+
+def run_stdio(args, key, action):
+    """Stream stdin to stdout chunk by chunk."""
+    start = time.perf_counter()
+    source, destination = sys.stdin.buffer, sys.stdout.buffer
+    result = crypt_stream(source, destination, key, action, args.mode, args.iv,
+                          args.container, args.chunk_size)
+    destination.flush()
+    seconds = time.perf_counter() - start
+    return _stats(STDIO, STDIO, result["block_mode"], result["bytes_read"], result["bytes_written"], seconds)
+
+def cmd_crypt(args):
+    action = args.command
+    key = parse_key(args.key or os.environ.get(KEY_ENV, ""))
+    if args.iv is not None:
+        args.iv = parse_key(args.iv)
+    paths = expand_paths(args.paths or [STDIO])
+    if STDIO in paths:
+        if len(paths) > 1:
+            raise ValueError("stdin (-) tidak bisa digabung dengan file lain.")
+        stats = run_stdio(args, key, action)
+        if not args.quiet:
+            _report(stats, args.json)
+        return 0
+
+    start = time.perf_counter()
+    results = run_files(paths, args, key, action)
+    done = [r for r in results if r["ok"]]
+    if not args.quiet and not args.json:
+        seconds = time.perf_counter() - start
+        total = sum(r["bytes_read"] for r in done)
+        print(f"{len(done)}/{len(results)} file, {total} B in {seconds:.3f} s "
+              f"({total / seconds / 1e6 if seconds > 0 else 0.0:.2f} MB/s)", file=sys.stderr)
+    return 0 if len(done) == len(results) else 1
+
+
+# === Analisis ===
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tidak bisa diserialisasi: {type(value).__name__}")
+
+def cmd_analyze(args):
+    if args.analysis == "avalanche":
+        from avalanche import full_avalanche_analysis
+        key = bit16_to_chars(parse_key(args.key or os.environ.get(KEY_ENV, "")))
+        plaintext = bit16_to_chars(parse_key(args.plaintext))
+        result = full_avalanche_analysis(plaintext, key)
+        summary = [f"Plaintext bit flip: {result['plaintext_avg_bits_changed']:.2f} bit "
+                   f"({result['plaintext_avg_percentage']:.1f}%)",
+                   f"Key bit flip: {result['key_avg_bits_changed']:.2f} bit ({result['key_avg_percentage']:.1f}%)"]
+    elif args.analysis == "sac":
+        from avalanche import sac_analysis
+        key_16bit = parse_key(args.key or os.environ.get(KEY_ENV, ""))
+        result = sac_analysis(key_16bit)
+        summary = [f"Key: 0x{bit16_to_hex(key_16bit)}",
+                   "Mean bits changed per input bit: "
+                   + " ".join(f"{value:.2f}" for value in result["mean_bits_changed"]),
+                   f"Max SAC deviation: {result['max_sac_deviation']:.4f}"]
+    else:
+        from cryptanalysis import cached_characteristics
+        result = cached_characteristics(args.kind, args.top)
+        summary = [f"{i + 1:>3}. 0x{c['input']:04X} -> 0x{c['output']:04X}  weight {c['weight']:.6f} "
+                   f"(2^{c['log2_weight']:.2f}), {c['active_sboxes']} S-box aktif"
+                   for i, c in enumerate(result)]
+    if args.json:
+        print(json.dumps(result, default=_json_default))
+    else:
+        print("\n".join(summary))
+    return 0
+
+
+# === Parser ===
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="mini-aes", description="Mini-AES 16-bit command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for action in ("encrypt", "decrypt"):
+        sub = commands.add_parser(action, help=f"{action} files or stdin")
+        sub.add_argument("paths", nargs="*", help="files or glob patterns; none or '-' = stdin to stdout")
+        sub.add_argument("-k", "--key", help=f"2 characters or 0x hex (default: ${KEY_ENV})")
+        sub.add_argument("-m", "--mode", type=str.upper, choices=MODES, default="ECB",
+                         help="block mode (decrypt: ignored for .maes containers)")
+        if action == "encrypt":
+            sub.add_argument("--iv", help="IV/nonce for CBC/CTR, 2 characters or 0x hex (default: random)")
+            sub.add_argument("--container", action="store_true", help="write the self-describing .maes container")
+        else:
+            sub.set_defaults(iv=None, container=False)
+        sub.add_argument("-o", "--output-dir", help="directory for output files (default: next to the input)")
+        sub.add_argument("--suffix", help="suffix appended to output file names")
+        sub.add_argument("-f", "--force", action="store_true", help="overwrite existing output files")
+        sub.add_argument("-j", "--workers", type=int, default=None, help="parallel worker processes (default: CPU count)")
+        sub.add_argument("--chunk-size", type=parse_chunk_size, default=DEFAULT_CHUNK_SIZE, help="read chunk size, e.g. 64K")
+        sub.add_argument("--json", action="store_true", help="per-file stats as JSON lines")
+        sub.add_argument("-q", "--quiet", action="store_true", help="no summary line (and no stats for stdin)")
+        sub.set_defaults(handler=cmd_crypt)
+
+    commands.add_parser("bench", help="run the benchmark suite (options as in benchmark.py)", add_help=False)
+
+    analyze = commands.add_parser("analyze", help="avalanche / SAC / characteristic analysis")
+    analyze.add_argument("analysis", choices=("avalanche", "sac", "characteristics"))
+    analyze.add_argument("-k", "--key", help=f"2 characters or 0x hex (default: ${KEY_ENV})")
+    analyze.add_argument("--plaintext", default="hi", help="plaintext for avalanche (2 characters or 0x hex)")
+    analyze.add_argument("--kind", choices=("differential", "linear"), default="differential",
+                         help="characteristic type")
+    analyze.add_argument("--top", type=int, default=10, help="number of characteristics")
+    analyze.add_argument("--json", action="store_true", help="print the full result as JSON")
+    analyze.set_defaults(handler=cmd_analyze)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "bench":
+        from benchmark import main as benchmark_main
+        return benchmark_main(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
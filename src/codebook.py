@@ -0,0 +1,56 @@
+from array import array
+
+from utils import chars_to_16bit
+from key_expansion import get_round_keys
+from packed_core import encrypt_block
+
+# Mini-AES bekerja pada blok 16-bit, jadi untuk satu key cipher ini hanyalah
+# permutasi dari 65.536 nilai. Tabel penuh cukup dibangun sekali per key.
+BLOCK_SPACE = 1 << 16
+
+
+def build_codebooks(key_16bit):
+    """Build the forward and inverse codebooks (array('H') of 65,536 entries) for a key."""
+    k0, k1, k2 = get_round_keys(key_16bit)
+    forward = array('H', bytes(2 * BLOCK_SPACE))
+    inverse = array('H', bytes(2 * BLOCK_SPACE))
+
+    for plaintext in range(BLOCK_SPACE):
+        ciphertext = encrypt_block(plaintext, k0, k1, k2)
+        forward[plaintext] = ciphertext
+        inverse[ciphertext] = plaintext
+
+    return forward, inverse
+
+
+class KeyedMiniAES:
+    """Mini-AES bound to a single key, backed by full encrypt/decrypt codebooks."""
+
+    def __init__(self, key):
+        if isinstance(key, str):
+            key = chars_to_16bit(key[:2])
+        if not 0 <= key < BLOCK_SPACE:
+            raise ValueError("Key harus bernilai 16-bit.")
+        self.key = key
+        self.encrypt_table, self.decrypt_table = build_codebooks(key)
+
+    def encrypt_block(self, block_16bit):
+        """Encrypt one 16-bit block with a single table lookup."""
+        return self.encrypt_table[block_16bit]
+
+    def decrypt_block(self, block_16bit):
+        """Decrypt one 16-bit block with a single table lookup."""
+        return self.decrypt_table[block_16bit]
+
+    def encrypt_blocks(self, blocks):
+        """Encrypt an iterable of 16-bit blocks, returning an array('H')."""
+        table = self.encrypt_table
+        return array('H', [table[block] for block in blocks])
+
+    def decrypt_blocks(self, blocks):
+        """Decrypt an iterable of 16-bit blocks, returning an array('H')."""
+        table = self.decrypt_table
+        return array('H', [table[block] for block in blocks])
+
+    def __repr__(self):
+        return f"KeyedMiniAES(key=0x{self.key:04X})"
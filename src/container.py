@@ -0,0 +1,297 @@
+import struct
+import zlib
+
+from block_modes import (BLOCK_BYTES, encrypt_bytes, decrypt_bytes, ctr_xor_bytes,
+                         bytes_to_words, words_to_bytes, key_to_16bit, iv_to_16bit)
+from batch_engine import ecb_decrypt_array, cbc_decrypt_array
+
+# Container biner ciphertext yang menjelaskan dirinya sendiri. Header tetap
+# 34 byte (big-endian):
+#
+#   magic "MAES" | versi u8 | mode u8 | flags u8 | panjang header u8 |
+#   IV/nonce u16 | panjang plaintext u64 | chunk size u32 | jumlah chunk u32 |
+#   offset index u64
+#
+# lalu payload (ciphertext tanpa IV; ECB/CBC memakai padding pad_bytes) dan,
+# jika flag FLAG_INDEX aktif, index per chunk di offset index: (offset chunk
+# u64, CRC32 ciphertext chunk u32). Mode dibaca dari header (O(1)), jadi tidak
+# perlu menebak mode atau mencoba dekripsi; chunk bisa dibaca/diverifikasi
+# tanpa membaca seluruh file.
+
+MAGIC = b"MAES"
+VERSION = 1
+HEADER = struct.Struct(">4sBBBBHQIIQ")
+INDEX_ENTRY = struct.Struct(">QI")
+MODES = ("ECB", "CBC", "CTR")
+FLAG_INDEX = 0x01
+DEFAULT_CONTAINER_CHUNK = 64 * 1024  # bytes ciphertext per chunk (kelipatan 2)
+
+
+def is_container(data):
+    """True if `data` (bytes or a seekable binary file) starts with the container magic."""
+    if hasattr(data, 'read'):
+        position = data.tell()
+        head = data.read(len(MAGIC))
+        data.seek(position)
+        return head == MAGIC
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+def _check_chunk_size(chunk_size):
+    if chunk_size <= 0 or chunk_size % BLOCK_BYTES:
+        raise ValueError("Chunk size must be a positive multiple of 2 bytes")
+
+def _mode_id(mode):
+    mode = mode.upper()
+    if mode not in MODES:
+        raise ValueError(f"Unsupported block mode: {mode}")
+    return MODES.index(mode)
+
+def _pack_header(mode, iv_16bit, length, chunk_size, chunk_count, index_offset, flags):
+    return HEADER.pack(MAGIC, VERSION, _mode_id(mode), flags, HEADER.size, iv_16bit or 0,
+                       length, chunk_size, chunk_count, index_offset)
+
+def _available(data):
+    """Bytes from the current position of `data` to its end, or None for a non-seekable stream."""
+    if not hasattr(data, 'read'):
+        return len(data)
+    if not getattr(data, 'seekable', lambda: False)():
+        return None
+    position = data.tell()
+    end = data.seek(0, 2)
+    data.seek(position)
+    return end - position
+
+def parse_header(data):
+    """Read the container header from bytes or a binary file (positioned at the start).
+
+    Returns a dict with mode, iv, length, chunk_size, chunk_count, index_offset,
+    has_index, payload_offset and payload_size. Raises ValueError when the
+    header is inconsistent with itself or with the size of `data`.
+    """
+    size = _available(data)
+    head = data.read(HEADER.size) if hasattr(data, 'read') else bytes(data[:HEADER.size])
+    if len(head) < HEADER.size or head[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a Mini-AES container (magic bytes missing)")
+    _, version, mode_id, flags, header_size, iv_16bit, length, chunk_size, chunk_count, index_offset = HEADER.unpack(head)
+    if version != VERSION:
+        raise ValueError(f"Unsupported container version: {version}")
+    if mode_id >= len(MODES):
+        raise ValueError(f"Unknown block mode id in container: {mode_id}")
+    mode = MODES[mode_id]
+    if header_size < HEADER.size:
+        raise ValueError(f"Invalid container header size: {header_size}")
+    if chunk_size <= 0 or chunk_size % BLOCK_BYTES:
+        raise ValueError(f"Invalid container chunk size: {chunk_size}")
+    if index_offset < header_size or (size is not None and index_offset > size):
+        raise ValueError(f"Container index offset {index_offset} lies outside the file")
+    # Jumlah chunk harus cocok dengan payload (dan dengan panjang index, jika ada)
+    payload_size = index_offset - header_size
+    if chunk_count != -(-payload_size // chunk_size):
+        raise ValueError(f"Container chunk count {chunk_count} does not match a payload of {payload_size} bytes")
+    if flags & FLAG_INDEX and size is not None and index_offset + chunk_count * INDEX_ENTRY.size > size:
+        raise ValueError("Container index is truncated")
+    return {
+        "version": version,
+        "mode": mode,
+        "iv": iv_16bit if mode != "ECB" else None,
+        "length": length,
+        "chunk_size": chunk_size,
+        "chunk_count": chunk_count,
+        "has_index": bool(flags & FLAG_INDEX),
+        "index_offset": index_offset,
+        "payload_offset": header_size,
+        "payload_size": payload_size,
+    }
+
+def _chunk_index(payload, chunk_size):
+    return [(offset, zlib.crc32(payload[offset:offset + chunk_size]))
+            for offset in range(0, len(payload), chunk_size)]
+
+def _iv_bytes(header):
+    return header["iv"].to_bytes(2, 'big') if header["iv"] is not None else b''
+
+
+# === Bytes di memori ===
+
+def encrypt_container(data, key, mode="ECB", iv=None, chunk_size=DEFAULT_CONTAINER_CHUNK, index=True, executor=None):
+    """Encrypt bytes into a container (header + payload + optional per-chunk index)."""
+    _check_chunk_size(chunk_size)
+    mode = mode.upper()
+    _mode_id(mode)
+    iv_16bit = iv_to_16bit(iv) if mode != "ECB" else None
+    ciphertext = encrypt_bytes(data, key, mode, iv_16bit, executor)
+    payload = ciphertext[2:] if mode != "ECB" else ciphertext
+    entries = _chunk_index(payload, chunk_size)
+    index_offset = HEADER.size + len(payload)
+    header = _pack_header(mode, iv_16bit, len(data), chunk_size, len(entries), index_offset,
+                          FLAG_INDEX if index else 0)
+    index_bytes = b''.join(INDEX_ENTRY.pack(*entry) for entry in entries) if index else b''
+    return header + payload + index_bytes
+
+def decrypt_container(data, key, executor=None):
+    """Decrypt a container held in memory; the mode and IV come from the header."""
+    header = parse_header(data)
+    view = memoryview(data)
+    payload = view[header["payload_offset"]:header["index_offset"]]
+    plaintext = decrypt_bytes(_iv_bytes(header) + bytes(payload), key, header["mode"], executor)
+    if len(plaintext) != header["length"]:
+        raise ValueError("Decrypted length does not match the container header (wrong key or corrupted data?)")
+    return plaintext
+
+
+# === Akses per chunk (seek) ===
+
+def read_index(source, header):
+    """[(payload offset, crc32)] of every chunk; computed from the chunk size if the container has no index."""
+    if not header["has_index"]:
+        return [(offset, None) for offset in range(0, header["payload_size"], header["chunk_size"])]
+    size = header["chunk_count"] * INDEX_ENTRY.size
+    raw = _read_at(source, header["index_offset"], size)
+    if len(raw) != size:
+        raise ValueError("Container index is truncated")
+    return list(INDEX_ENTRY.iter_unpack(raw))
+
+def _read_at(source, offset, size):
+    if hasattr(source, 'seek'):
+        source.seek(offset)
+        return source.read(size)
+    return bytes(source[offset:offset + size])
+
+def _read_header(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return parse_header(source)
+
+def read_chunk(source, key, chunk, header=None, index=None):
+    """Decrypt chunk number `chunk` only (bytes or seekable file), checking its CRC32 when indexed.
+
+    Returns the plaintext bytes of that chunk (padding removed from the last one).
+    """
+    header = header or _read_header(source)
+    index = index if index is not None else read_index(source, header)
+    if not 0 <= chunk < len(index):
+        raise IndexError(f"Chunk {chunk} out of range (0..{len(index) - 1})")
+    offset, crc = index[chunk]
+    chunk_size = header["chunk_size"]
+    size = min(chunk_size, header["payload_size"] - offset)
+    mode, key_16bit = header["mode"], key_to_16bit(key)
+
+    # CBC butuh blok ciphertext sebelum chunk (atau IV untuk chunk pertama)
+    previous_size = BLOCK_BYTES if mode == "CBC" and offset else 0
+    raw = _read_at(source, header["payload_offset"] + offset - previous_size, size + previous_size)
+    body = raw[previous_size:]
+    if len(body) != size:
+        raise ValueError(f"Chunk {chunk} is truncated")
+    if crc is not None and zlib.crc32(body) != crc:
+        raise ValueError(f"Chunk {chunk} failed its CRC32 check (corrupted data)")
+
+    if mode == "CTR":
+        plain = ctr_xor_bytes(body, key_16bit, header["iv"], offset // BLOCK_BYTES)
+    else:
+        words = bytes_to_words(body)
+        if mode == "ECB":
+            plain = words_to_bytes(ecb_decrypt_array(words, key_16bit))
+        else:
+            previous = int.from_bytes(raw[:previous_size], 'big') if previous_size else header["iv"]
+            plain = words_to_bytes(cbc_decrypt_array(words, key_16bit, previous))
+    # Chunk terakhir: potong padding sesuai panjang asli di header
+    return plain[:max(header["length"] - offset, 0)]
+
+def decrypt_range(source, key, offset, length):
+    """Plaintext bytes [offset, offset + length) read through the chunks that cover them."""
+    if offset < 0 or length < 0:
+        raise ValueError("offset and length must be non-negative")
+    header = _read_header(source)
+    index = read_index(source, header)
+    end = min(offset + length, header["length"])
+    chunk_size = header["chunk_size"]
+    pieces = []
+    for chunk in range(offset // chunk_size, (end + chunk_size - 1) // chunk_size):
+        pieces.append(read_chunk(source, key, chunk, header, index))
+    first = (offset // chunk_size) * chunk_size
+    return b''.join(pieces)[offset - first:end - first]
+
+
+# === Streaming file (memori konstan) ===
+
+def encrypt_stream_container(source, destination, key, mode="ECB", iv=None,
+                             chunk_size=DEFAULT_CONTAINER_CHUNK, index=True):
+    """Encrypt a binary stream into a container; `destination` must be seekable (header is patched at the end)."""
+    from cipher_context import Encryptor
+
+    _check_chunk_size(chunk_size)
+    if not destination.seekable():
+        raise ValueError("Container output must be seekable")
+    mode = mode.upper()
+    context = Encryptor(key, mode, iv if mode != "ECB" else None)
+    start = destination.tell()
+    destination.write(bytes(HEADER.size))
+
+    entries, pending, written, length = [], b'', 0, 0
+    def flush(data, final=False):
+        nonlocal written
+        data = pending + data
+        cut = len(data) if final else len(data) - len(data) % chunk_size
+        for offset in range(0, cut, chunk_size):
+            piece = data[offset:offset + chunk_size]
+            entries.append((written, zlib.crc32(piece)))
+            destination.write(piece)
+            written += len(piece)
+        return data[cut:]
+
+    skip = 2 if mode != "ECB" else 0  # IV/nonce dari Encryptor masuk ke header, bukan payload
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        length += len(chunk)
+        out = context.update(chunk)
+        out, skip = out[skip:], max(skip - len(out), 0)
+        pending = flush(out)
+    out = context.finalize()
+    pending = flush(out[skip:], final=True)
+
+    index_offset = HEADER.size + written
+    if index:
+        destination.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in entries))
+    end = destination.tell()
+    destination.seek(start)
+    destination.write(_pack_header(mode, context.iv, length, chunk_size, len(entries), index_offset,
+                                   FLAG_INDEX if index else 0))
+    destination.seek(end)
+    return {"block_mode": mode, "bytes_read": length, "bytes_written": end - start, "chunks": len(entries)}
+
+def decrypt_stream_container(source, destination, key):
+    """Decrypt a container stream chunk by chunk into `destination`; the mode comes from the header."""
+    from cipher_context import Decryptor
+
+    header = parse_header(source)
+    context = Decryptor(key, header["mode"])
+    context.update(_iv_bytes(header))  # IV/nonce dari header, seperti 2 byte pertama stream biasa
+    written = 0
+    remaining = header["payload_size"]
+    while remaining > 0:
+        chunk = source.read(min(header["chunk_size"], remaining))
+        if not chunk:
+            raise ValueError("Container payload is truncated")
+        remaining -= len(chunk)
+        out = context.update(chunk)
+        destination.write(out)
+        written += len(out)
+    out = context.finalize()
+    destination.write(out)
+    written += len(out)
+    if written != header["length"]:
+        raise ValueError("Decrypted length does not match the container header (wrong key or corrupted data?)")
+    return {"block_mode": header["mode"], "bytes_read": header["index_offset"], "bytes_written": written}
+
+def encrypt_file_container(input_path, output_path, key, mode="ECB", iv=None,
+                           chunk_size=DEFAULT_CONTAINER_CHUNK, index=True):
+    """Encrypt a file on disk into a container file."""
+    with open(input_path, 'rb') as source, open(output_path, 'wb') as destination:
+        return encrypt_stream_container(source, destination, key, mode, iv, chunk_size, index)
+
+def decrypt_file_container(input_path, output_path, key):
+    """Decrypt a container file on disk."""
+    with open(input_path, 'rb') as source, open(output_path, 'wb') as destination:
+        return decrypt_stream_container(source, destination, key)
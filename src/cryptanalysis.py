@@ -0,0 +1,188 @@
+import hashlib
+import heapq
+import json
+import os
+
+import numpy as np
+
+from utils import s_box
+import packed_core
+
+# Tabel DDT/LAT untuk S-Box 4-bit dan pencarian karakteristik diferensial /
+# linear terbaik untuk 2 round Mini-AES dengan branch-and-bound.
+#
+# Round 1: SubNibbles -> ShiftRows -> MixColumns (-> AddRoundKey)
+# Round 2: SubNibbles -> ShiftRows (-> AddRoundKey)
+# AddRoundKey tidak mengubah selisih (XOR) maupun mask, jadi tidak ikut dihitung.
+
+DEFAULT_CACHE_DIR = ".mini_aes_cache"
+DIFFERENTIAL = "differential"
+LINEAR = "linear"
+ROUNDS = 2
+
+def _parity(value):
+    return bin(value).count('1') & 1
+
+def difference_distribution_table(sbox=s_box):
+    """DDT: entry [dx][dy] = #{x : S(x) ^ S(x ^ dx) = dy}."""
+    size = len(sbox)
+    table = np.zeros((size, size), dtype=np.int64)
+    for dx in range(size):
+        for x in range(size):
+            table[dx, sbox[x] ^ sbox[x ^ dx]] += 1
+    return table
+
+def linear_approximation_table(sbox=s_box):
+    """LAT: entry [a][b] = #{x : a.x = b.S(x)} - size/2 (signed bias count)."""
+    size = len(sbox)
+    table = np.zeros((size, size), dtype=np.int64)
+    for a in range(size):
+        for b in range(size):
+            matches = sum(1 for x in range(size) if _parity(a & x) == _parity(b & sbox[x]))
+            table[a, b] = matches - size // 2
+    return table
+
+
+# === Lapisan linear pada state packed 16-bit ===
+
+def _round_linear_layers():
+    """Linear layer applied after each S-layer: ShiftRows+MixColumns, then ShiftRows only."""
+    return [
+        lambda x: packed_core.mix_columns(packed_core.shift_rows(x)),
+        packed_core.shift_rows,
+    ]
+
+def _inverse_linear_layers():
+    return [
+        lambda x: packed_core.inv_shift_rows(packed_core.inv_mix_columns(x)),
+        packed_core.inv_shift_rows,
+    ]
+
+def _difference_table(layer):
+    """Differences pass through a linear layer unchanged in form: dy = L(dx)."""
+    return [layer(x) for x in range(1 << 16)]
+
+def _mask_table(inverse_layer):
+    """Masks propagate through a linear layer L as beta = (L^-1)^T alpha."""
+    # Kolom j dari L^-1 adalah L^-1(e_j); baris i dari L^-1 = bit i dari setiap kolom
+    columns = [inverse_layer(1 << j) for j in range(16)]
+    basis = [sum(((columns[j] >> i) & 1) << j for j in range(16)) for i in range(16)]
+    table = [0] * (1 << 16)
+    for alpha in range(1, 1 << 16):
+        low_bit = (alpha & -alpha).bit_length() - 1
+        table[alpha] = table[alpha & (alpha - 1)] ^ basis[low_bit]
+    return table
+
+
+def _sorted_rows(table, denominator):
+    """Per input nibble, the nonzero transitions as (factor, output) sorted by factor, best first."""
+    rows = []
+    for row in np.abs(table):
+        entries = [(int(count) / denominator, out) for out, count in enumerate(row) if count]
+        rows.append(sorted(entries, reverse=True))
+    return rows
+
+def _active_nibbles(value):
+    return [pos for pos in range(4) if (value >> (4 * pos)) & 0xF]
+
+def best_characteristics(kind=DIFFERENTIAL, top=10, sbox=s_box):
+    """Branch-and-bound search for the `top` best 2-round characteristics.
+
+    For "differential" the weight is the probability (product of DDT/16),
+    for "linear" it is the absolute correlation (product of |LAT|/8).
+    Each result lists the state value before and after every S-layer and
+    linear layer, from plaintext difference/mask to ciphertext.
+    """
+    if kind == DIFFERENTIAL:
+        rows = _sorted_rows(difference_distribution_table(sbox), len(sbox))
+        linear_tables = [_difference_table(layer) for layer in _round_linear_layers()]
+    elif kind == LINEAR:
+        rows = _sorted_rows(linear_approximation_table(sbox), len(sbox) // 2)
+        linear_tables = [_mask_table(inverse) for inverse in _inverse_linear_layers()]
+    else:
+        raise ValueError(f"Unknown analysis kind: {kind}")
+
+    best_factor = max(row[0][0] for row in rows[1:])
+    heap = []  # min-heap (weight, counter, path) berisi `top` karakteristik terbaik
+    counter = 0
+
+    def threshold():
+        return heap[0][0] if len(heap) >= top else 0.0
+
+    def search(round_idx, active, position, state_in, state_out, weight, path):
+        nonlocal counter
+        if position == len(active):
+            after_linear = linear_tables[round_idx][state_out]
+            new_path = path + [state_out, after_linear]
+            if round_idx + 1 == ROUNDS:
+                counter += 1
+                item = (weight, counter, new_path)
+                if len(heap) < top:
+                    heapq.heappush(heap, item)
+                elif weight > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+                return
+            next_active = _active_nibbles(after_linear)
+            search(round_idx + 1, next_active, 0, after_linear, 0, weight, new_path)
+            return
+
+        nibble = active[position]
+        remaining = len(active) - position - 1
+        # Setiap round berikutnya punya minimal 1 S-Box aktif (lapisan linear bijektif)
+        optimistic = best_factor ** (remaining + ROUNDS - round_idx - 1)
+        for factor, out in rows[(state_in >> (4 * nibble)) & 0xF]:
+            new_weight = weight * factor
+            if new_weight * optimistic <= threshold():
+                break  # baris terurut menurun: sisa kandidat juga tidak lolos
+            search(round_idx, active, position + 1, state_in, state_out | (out << (4 * nibble)), new_weight, path)
+
+    # Input dengan sedikit nibble aktif dulu, supaya batas bawah cepat naik
+    inputs = sorted(range(1, 1 << 16), key=lambda value: len(_active_nibbles(value)))
+    for value in inputs:
+        active = _active_nibbles(value)
+        if best_factor ** (len(active) + ROUNDS - 1) <= threshold():
+            continue
+        search(0, active, 0, value, 0, 1.0, [value])
+
+    results = []
+    for weight, _, path in sorted(heap, reverse=True):
+        results.append({
+            "kind": kind,
+            "input": path[0],
+            "output": path[-1],
+            "path": path,
+            "weight": weight,
+            "log2_weight": float(np.log2(weight)),
+            "active_sboxes": sum(len(_active_nibbles(v)) for v in path[0:-1:2]),
+        })
+    return results
+
+
+# === Cache hasil ke disk ===
+
+def _cache_path(name, sbox, cache_dir):
+    digest = hashlib.sha1(bytes(sbox)).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{name}_{digest}.json")
+
+def cached(name, compute, sbox=s_box, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the JSON-serializable result of compute(), loading it from disk if cached."""
+    path = _cache_path(name, sbox, cache_dir)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    result = compute()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(result, file)
+    return result
+
+def cached_tables(sbox=s_box, cache_dir=DEFAULT_CACHE_DIR):
+    """DDT and LAT as nested lists, cached on disk."""
+    return cached("tables", lambda: {
+        "ddt": difference_distribution_table(sbox).tolist(),
+        "lat": linear_approximation_table(sbox).tolist(),
+    }, sbox, cache_dir)
+
+def cached_characteristics(kind=DIFFERENTIAL, top=10, sbox=s_box, cache_dir=DEFAULT_CACHE_DIR):
+    """best_characteristics() results, cached on disk per kind and size."""
+    return cached(f"{kind}_top{top}", lambda: best_characteristics(kind, top, sbox), sbox, cache_dir)
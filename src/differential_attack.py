@@ -0,0 +1,137 @@
+import time
+
+import numpy as np
+
+from utils import chars_to_16bit, bit16_to_hex
+from main import encrypt
+from trace_log import TRACE_OFF
+from key_expansion import get_round_keys
+from packed_core import inv_sub_nibbles, inv_shift_rows, shift_rows
+from batch_engine import encrypt_array
+from cryptanalysis import DIFFERENTIAL, best_characteristics, difference_distribution_table
+
+# Chosen-plaintext differential attack pada round terakhir Mini-AES.
+#
+# C = ShiftRows(SubNibbles(X)) ^ K2, sehingga untuk tebakan u = InvShiftRows(K2)
+#   X = InvSubNibbles(InvShiftRows(C) ^ u)
+# Pasangan (P, P ^ dP) yang mengikuti karakteristik round 1 menghasilkan
+# selisih X ^ X' = target; tebakan u yang benar paling sering memenuhi ini.
+
+DEFAULT_PAIRS = 1 << 16
+DEFAULT_TOP = 10
+_CHUNK_CELLS = 1 << 22  # batas ukuran array (pasangan x tebakan) per langkah hitung
+
+_INV_SUB = np.array([inv_sub_nibbles(x) for x in range(1 << 16)], dtype=np.uint16)
+
+def _to_16bit(value):
+    return chars_to_16bit(value) if isinstance(value, str) else int(value)
+
+def _nibble_mask(value):
+    """Mask 0xF on every nonzero nibble of a packed state."""
+    return sum(0xF << shift for shift in range(0, 16, 4) if (value >> shift) & 0xF)
+
+def round_one_probability(characteristic, sbox_ddt=None):
+    """Probability that a pair follows the first S-layer of a characteristic."""
+    ddt = difference_distribution_table() if sbox_ddt is None else sbox_ddt
+    before, after = characteristic["path"][0], characteristic["path"][1]
+    probability = 1.0
+    for shift in range(0, 16, 4):
+        dx, dy = (before >> shift) & 0xF, (after >> shift) & 0xF
+        if dx:
+            probability *= ddt[dx, dy] / 16
+    return probability
+
+def default_characteristic():
+    """The best 2-round differential; its first round is used by the attack."""
+    return best_characteristics(DIFFERENTIAL, top=1)[0]
+
+def _checkpoints(n_pairs):
+    """Powers of two up to n_pairs, plus n_pairs itself."""
+    points = [1 << e for e in range(4, n_pairs.bit_length()) if (1 << e) < n_pairs]
+    return points + [n_pairs]
+
+def _count_matches(counts, left, right, guesses, target):
+    """Add, per guess, how many filtered pairs partially decrypt to the target difference."""
+    step = max(_CHUNK_CELLS // len(guesses), 1)
+    for start in range(0, len(left), step):
+        a = left[start:start + step, None] ^ guesses
+        b = right[start:start + step, None] ^ guesses
+        counts += ((_INV_SUB[a] ^ _INV_SUB[b]) == target).sum(axis=0, dtype=np.int64)
+
+def last_round_attack(key, n_pairs=DEFAULT_PAIRS, characteristic=None, top=DEFAULT_TOP, seed=None, checkpoints=None):
+    """Recover the last-round subkey nibbles covered by a differential characteristic.
+
+    `key` is the secret key of the encryption oracle (2-char string or 16-bit int).
+    `n_pairs` random plaintext pairs with the characteristic's input difference
+    are encrypted in bulk; pairs whose ciphertext difference is zero outside
+    the target nibbles are partially decrypted under every guess of those
+    nibbles of K2, and matches with the expected difference are counted.
+
+    Returns a dict with the ranked subkey candidates (K2 with only the
+    recovered nibbles set), the rank of the real subkey, and a data/time
+    tradeoff curve measured at `checkpoints` (default: powers of two).
+    """
+    key = _to_16bit(key) & 0xFFFF
+    characteristic = characteristic or default_characteristic()
+    input_difference = characteristic["path"][0]
+    target = characteristic["path"][2]
+    if not input_difference or not target:
+        raise ValueError("Karakteristik harus punya selisih input dan target tidak nol.")
+    target_mask = _nibble_mask(target)
+
+    everything = np.arange(1 << 16, dtype=np.uint16)
+    guesses = everything[(everything & ~np.uint16(target_mask)) == 0]
+    true_guess = inv_shift_rows(get_round_keys(key)[2]) & target_mask
+    true_index = int(np.searchsorted(guesses, true_guess))
+
+    # Pastikan mesin vektor sama dengan implementasi referensi
+    sample = np.arange(4, dtype=np.uint16) * 0x4321
+    if any(int(c) != encrypt(int(p), key, TRACE_OFF)[0] for p, c in zip(sample, encrypt_array(sample, key))):
+        raise ValueError("Batch engine tidak cocok dengan main.encrypt")
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(len(guesses), dtype=np.int64)
+    points = sorted(set(checkpoints)) if checkpoints else _checkpoints(int(n_pairs))
+    tradeoff = []
+    done = filtered = 0
+    started = time.perf_counter()
+
+    for point in points:
+        size = point - done
+        plaintexts = rng.integers(0, 1 << 16, size=size, dtype=np.uint16)
+        c1 = encrypt_array(plaintexts, key)
+        c2 = encrypt_array(plaintexts ^ np.uint16(input_difference), key)
+        v1, v2 = inv_shift_rows(c1), inv_shift_rows(c2)
+        keep = ((v1 ^ v2) & ~np.uint16(target_mask)) == 0
+        _count_matches(counts, v1[keep], v2[keep], guesses, np.uint16(target))
+        done, filtered = point, filtered + int(keep.sum())
+        tradeoff.append({
+            "pairs": point,
+            "filtered_pairs": filtered,
+            "elapsed_seconds": time.perf_counter() - started,
+            "true_rank": int((counts > counts[true_index]).sum()) + 1,
+            "top_subkey": shift_rows(int(guesses[np.argmax(counts)])),
+        })
+
+    order = np.argsort(-counts, kind="stable")
+    ranked = [{
+        "subkey": shift_rows(int(guesses[i])),
+        "subkey_hex": bit16_to_hex(shift_rows(int(guesses[i]))),
+        "count": int(counts[i]),
+    } for i in order[:top]]
+    return {
+        "characteristic": characteristic,
+        "input_difference": input_difference,
+        "target_difference": target,
+        "subkey_mask": shift_rows(target_mask),
+        "pair_probability": round_one_probability(characteristic),
+        "pairs": done,
+        "filtered_pairs": filtered,
+        "guesses": guesses,
+        "counts": counts,
+        "ranked": ranked,
+        "true_subkey": shift_rows(true_guess),
+        "true_rank": tradeoff[-1]["true_rank"],
+        "tradeoff": tradeoff,
+        "elapsed_seconds": time.perf_counter() - started,
+    }
@@ -1,97 +1,219 @@
 import os
+import io
 import json
 import csv
+import gzip
+import bz2
+import lzma
 from datetime import datetime
+from itertools import islice
 
-def save_to_txt(data, filename=None):
-    """Save encryption/decryption results to a text file."""
+from container import is_container, parse_header, decrypt_container
+
+# Field yang ditulis khusus (bukan di bagian "Additional Data")
+EXPORT_FIELDS = ['mode', 'input', 'key', 'output', 'iv', 'logs', 'trace', 'block_mode']
+
+# === Export streaming (TXT / CSV / JSON Lines, opsional terkompresi) ===
+# Log dan record trace dibaca dari iterator dan langsung ditulis per batch,
+# jadi memori tetap kecil walaupun trace berisi jutaan baris dan tidak ada
+# baris yang dibuang.
+
+EXPORT_FORMATS = ("txt", "csv", "jsonl")
+COMPRESSIONS = {None: "", "gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+EXPORT_BUFFER_SIZE = 1024 * 1024  # bytes
+EXPORT_BATCH = 10000              # baris per batch / per laporan progress
+GZIP_LEVEL = 6                    # level 9 (default gzip) +-3x lebih lambat untuk file yang hampir sama
+XZ_PRESET = 1                     # preset default (6) terlalu lambat untuk trace besar
+
+def _export_path(filename, fmt, compression):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression} (pilih gzip, bz2 atau xz)")
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"mini_aes_output_{timestamp}.txt"
-    
+        filename = f"mini_aes_output_{timestamp}.{fmt}"
+    suffix = COMPRESSIONS[compression]
+    if suffix and not filename.endswith(suffix):
+        filename += suffix
     # Make sure directory exists
     os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+    return filename
+
+def _open_export(filename, compression):
+    """Text stream for an export file; compressed streams get a large write buffer too."""
+    if compression is None:
+        return open(filename, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE)
+    if compression == "gzip":
+        raw = gzip.open(filename, 'wb', compresslevel=GZIP_LEVEL)
+    elif compression == "xz":
+        raw = lzma.open(filename, 'wb', preset=XZ_PRESET)
+    else:
+        raw = bz2.open(filename, 'wb')
+    return io.TextIOWrapper(io.BufferedWriter(raw, EXPORT_BUFFER_SIZE),
+                            encoding='utf-8', newline='')
+
+def _trace_chunks(trace):
+    """A RoundTrace, or an iterable of RoundTrace chunks (e.g. BlockTrace.iter_records())."""
+    if trace is None:
+        return ()
+    if hasattr(trace, "iter_lines"):
+        return (trace,)
+    return trace
+
+def _batches(items):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, EXPORT_BATCH))
+        if not batch:
+            return
+        yield batch
+
+class _Progress:
+    """Calls progress(done, total) after every batch; total is None when not known up front."""
+
+    def __init__(self, data, callback):
+        self.callback = callback
+        self.done = 0
+        self.total = None
+        logs, trace = data.get('logs', ()), data.get('trace')
+        if hasattr(logs, '__len__') and (trace is None or hasattr(trace, 'iter_lines')):
+            self.total = len(logs) + (len(trace) if trace is not None else 0)
+
+    def advance(self, count):
+        self.done += count
+        if self.callback is not None:
+            self.callback(self.done, self.total)
+
+def _metadata(data):
+    """(label, value) pairs of the result fields, in export order."""
+    fields = [("Mode", data.get('mode', 'Unknown'))]
+    if data.get('block_mode'):
+        fields.append(("Block Mode", data['block_mode']))
+    fields += [("Input", data.get('input', '')), ("Key", data.get('key', ''))]
+    if data.get('block_mode') in ('CBC', 'CTR') and data.get('iv'):
+        fields.append(("Nonce" if data['block_mode'] == 'CTR' else "IV", data['iv']))
+    return fields
+
+def _write_txt(file, data, progress):
+    file.write("=== Mini-AES Encryption/Decryption Results ===\n")
+    file.write(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
     
-    with open(filename, 'w', encoding='utf-8') as file:
-        file.write("=== Mini-AES Encryption/Decryption Results ===\n")
-        file.write(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        # Write input data
-        file.write(f"Mode: {data.get('mode', 'Unknown')}\n")
-        if data.get('block_mode'):
-            file.write(f"Block Mode: {data['block_mode']}\n")
-        file.write(f"Input: {data.get('input', '')}\n")
-        file.write(f"Key: {data.get('key', '')}\n")
-        if data.get('block_mode') == 'CBC' and data.get('iv'):
-            file.write(f"IV: {data['iv']}\n")
-        
-        # Write output data
-        file.write(f"\nOutput: {data.get('output', '')}\n")
-        
-        # Write additional data
-        file.write("\n=== Additional Data ===\n")
-        for key, value in data.items():
-            if key not in ['mode', 'input', 'key', 'output', 'iv', 'logs', 'block_mode']:
-                file.write(f"{key}: {value}\n")
-        
-        # Write logs
-        if 'logs' in data:
-            file.write("\n=== Detailed Process Logs ===\n")
-            for log in data['logs']:
-                file.write(f"{log}\n")
+    # Write input data
+    for label, value in _metadata(data):
+        file.write(f"{label}: {value}\n")
     
-    return os.path.abspath(filename)
-
-def save_to_csv(data, filename=None):
-    """Save encryption/decryption results to a CSV file."""
-    if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"mini_aes_output_{timestamp}.csv"
+    # Write output data
+    file.write(f"\nOutput: {data.get('output', '')}\n")
     
-    # Make sure directory exists
-    os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+    # Write additional data
+    file.write("\n=== Additional Data ===\n")
+    for key, value in data.items():
+        if key not in EXPORT_FIELDS:
+            file.write(f"{key}: {value}\n")
     
-    # Prepare data for CSV
-    csv_data = []
+    # Write logs
+    if 'logs' in data:
+        file.write("\n=== Detailed Process Logs ===\n")
+        for batch in _batches(data['logs']):
+            file.writelines(f"{log}\n" for log in batch)
+            progress.advance(len(batch))
     
-    # Add metadata
-    csv_data.append(["Mini-AES Encryption/Decryption Results", ""])
-    csv_data.append(["Time", datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-    csv_data.append(["", ""])  # Empty row for spacing
+    # Write structured round trace (trace_records.RoundTrace chunks)
+    if data.get('trace') is not None:
+        file.write("\n=== Round Trace ===\n")
+        for chunk in _trace_chunks(data['trace']):
+            file.writelines(f"{line}\n" for line in chunk.iter_lines())
+            progress.advance(len(chunk))
+
+def _write_csv(file, data, progress):
+    writer = csv.writer(file)
     
-    # Add input data
-    csv_data.append(["Mode", data.get('mode', 'Unknown')])
-    if data.get('block_mode'):
-        csv_data.append(["Block Mode", data['block_mode']])
-    csv_data.append(["Input", data.get('input', '')])
-    csv_data.append(["Key", data.get('key', '')])
-    if data.get('block_mode') == 'CBC' and data.get('iv'):
-        csv_data.append(["IV", data['iv']])
+    # Add metadata
+    writer.writerow(["Mini-AES Encryption/Decryption Results", ""])
+    writer.writerow(["Time", datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+    writer.writerow(["", ""])  # Empty row for spacing
     
-    # Add output data
-    csv_data.append(["Output", data.get('output', '')])
+    # Add input and output data
+    writer.writerows(_metadata(data))
+    writer.writerow(["Output", data.get('output', '')])
     
     # Add additional data
-    csv_data.append(["", ""])  # Empty row for spacing
-    csv_data.append(["Additional Data", ""])
+    writer.writerow(["", ""])  # Empty row for spacing
+    writer.writerow(["Additional Data", ""])
     for key, value in data.items():
-        if key not in ['mode', 'input', 'key', 'output', 'iv', 'logs', 'block_mode']:
-            csv_data.append([key, value])
+        if key not in EXPORT_FIELDS:
+            writer.writerow([key, value])
     
-    # Write logs (save limited number to avoid making CSV too large)
+    # Write all logs (streamed, no truncation)
     if 'logs' in data:
-        csv_data.append(["", ""])  # Empty row for spacing
-        csv_data.append(["Process Logs", ""])
-        for log in data['logs'][:100]:  # Limit to 100 log entries
-            csv_data.append(["Log", log])
+        writer.writerow(["", ""])  # Empty row for spacing
+        writer.writerow(["Process Logs", ""])
+        for batch in _batches(data['logs']):
+            writer.writerows(["Log", log] for log in batch)
+            progress.advance(len(batch))
     
-    # Write to CSV
-    with open(filename, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerows(csv_data)
+    # Structured round trace: one row per record
+    if data.get('trace') is not None:
+        writer.writerow(["", ""])
+        writer.writerow(["Round Trace", ""])
+        writer.writerow(["Block", "Stage ID", "Stage", "State", "State (hex)"])
+        for chunk in _trace_chunks(data['trace']):
+            chunk.write_csv(file, header=False)
+            progress.advance(len(chunk))
+
+def _write_jsonl(file, data, progress):
+    result = {"type": "result", "time": datetime.now().isoformat(timespec='seconds')}
+    result.update((key, value) for key, value in data.items() if key not in ('logs', 'trace'))
+    file.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+    
+    for batch in _batches(data.get('logs', ())):
+        file.writelines(json.dumps({"type": "log", "line": str(log)}, ensure_ascii=False) + "\n" for log in batch)
+        progress.advance(len(batch))
     
+    # Record trace: semua field angka / label ASCII, jadi cukup format string (jauh lebih cepat dari json.dumps)
+    for chunk in _trace_chunks(data.get('trace')):
+        file.writelines(
+            f'{{"type": "record", "block": {block}, "stage_id": {stage_id}, "stage": "{stage}", "state": {state}}}\n'
+            for block, stage_id, stage, state, _ in chunk.csv_rows()
+        )
+        progress.advance(len(chunk))
+
+_WRITERS = {"txt": _write_txt, "csv": _write_csv, "jsonl": _write_jsonl}
+
+def export_results(data, filename=None, fmt="txt", compression=None, progress=None):
+    """Stream an encryption/decryption result to a TXT, CSV or JSON Lines file.
+
+    `data['logs']` may be any iterable of log lines and `data['trace']` a
+    trace_records.RoundTrace or an iterable of RoundTrace chunks; both are
+    written batch by batch, so memory stays bounded. `compression` is None,
+    "gzip", "bz2" or "xz" (the suffix is added to the file name).
+    `progress(done, total)` is called after every batch of lines/records
+    (total is None when the iterables have no length). Returns the absolute path.
+    """
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (pilih {', '.join(EXPORT_FORMATS)})")
+    filename = _export_path(filename, fmt, compression)
+    counter = _Progress(data, progress)
+    with _open_export(filename, compression) as file:
+        _WRITERS[fmt](file, data, counter)
+    counter.advance(0)
     return os.path.abspath(filename)
 
+def save_to_txt(data, filename=None, compression=None, progress=None):
+    """Save encryption/decryption results to a text file.
+
+    `data['trace']` may hold a trace_records.RoundTrace, written as round-state lines.
+    """
+    return export_results(data, filename, "txt", compression, progress)
+
+def save_to_csv(data, filename=None, compression=None, progress=None):
+    """Save encryption/decryption results to a CSV file (every log line, one row per trace record)."""
+    return export_results(data, filename, "csv", compression, progress)
+
+def save_to_jsonl(data, filename=None, compression=None, progress=None):
+    """Save encryption/decryption results as JSON Lines: a result object, then logs and trace records."""
+    return export_results(data, filename, "jsonl", compression, progress)
+
 def load_from_file(filename):
     """Load plaintext or key from a text file."""
     with open(filename, 'r', encoding='utf-8') as file:
@@ -128,29 +250,42 @@ def parse_input_file(filename):
         # If all parsing fails, just return the raw content as input
         return {'input': load_from_file(filename), 'error': str(e)}
 
-def decrypt_file_content(file_content, key, block_mode="ECB"):
-    """Decrypt the content of a file using the specified key and block mode."""
-    from block_modes import ecb_decrypt, cbc_decrypt
-    
-    if not file_content or not key:
-        raise ValueError("Both file content and key are required for decryption")
-        
-    # Convert bytes to string if needed
+def decode_file_content(file_content):
+    """Uploaded file bytes as ciphertext text: UTF-8, or a hex string if not valid UTF-8."""
     if isinstance(file_content, bytes):
         try:
-            file_content = file_content.decode('utf-8')
+            return file_content.decode('utf-8')
         except UnicodeDecodeError:
             # If we can't decode as UTF-8, convert to hex string
-            file_content = ''.join(f'{b:02x}' for b in file_content)
+            return file_content.hex()
+    return file_content
+
+def decrypt_file_content(file_content, key, block_mode="ECB", trace="full"):
+    """Decrypt the content of a file using the specified key and block mode.
+
+    `trace` ("full", "summary" or "off") controls the round logs returned.
+    """
+    from block_modes import ecb_decrypt, cbc_decrypt, ctr_decrypt
+    
+    if not file_content or not key:
+        raise ValueError("Both file content and key are required for decryption")
+    
+    # Container biner: mode, IV dan panjang diambil dari header, tanpa decode teks
+    if isinstance(file_content, (bytes, bytearray, memoryview)) and is_container(file_content):
+        return decrypt_container_content(file_content, key)
+        
+    file_content = decode_file_content(file_content)
     
     # Trim key to 2 characters if longer
     key = key[:2]
     
     # Perform decryption based on block mode
     if block_mode.upper() == "ECB":
-        plaintext, logs = ecb_decrypt(file_content, key)
+        plaintext, logs = ecb_decrypt(file_content, key, trace=trace)
     elif block_mode.upper() == "CBC":
-        plaintext, logs = cbc_decrypt(file_content, key)
+        plaintext, logs = cbc_decrypt(file_content, key, trace=trace)
+    elif block_mode.upper() == "CTR":
+        plaintext, logs = ctr_decrypt(file_content, key, trace=trace)
     else:
         raise ValueError(f"Unsupported block mode: {block_mode}")
     
@@ -160,11 +295,106 @@ def decrypt_file_content(file_content, key, block_mode="ECB"):
         "block_mode": block_mode.upper()
     }
 
+def decrypt_container_content(file_content, key):
+    """Decrypt a binary container (container.py); block mode and IV come from its header.
+
+    Returns the same fields as decrypt_file_content plus the parsed header;
+    the plaintext is decoded as UTF-8 (invalid bytes replaced) and also
+    returned raw in "plaintext_bytes". No round logs are produced.
+    """
+    header = parse_header(file_content)
+    plaintext_bytes = decrypt_container(file_content, key[:2] if isinstance(key, str) else key)
+    return {
+        "plaintext": plaintext_bytes.decode('utf-8', errors='replace'),
+        "plaintext_bytes": plaintext_bytes,
+        "logs": (),
+        "block_mode": header["mode"],
+        "container": header,
+    }
+
 def detect_file_encryption_mode(file_content):
-    """Attempt to detect if the file content is encrypted with CBC (has IV) or ECB."""
-    # This is a simple heuristic - CBC mode in this implementation prepends the IV (2 chars)
-    # More sophisticated detection would be needed for real-world use
-    
-    # Check if the file seems to have a structured format that would indicate CBC
-    # For now, we'll just assume ECB as the default
-    return "ECB"
\ No newline at end of file
+    """Block mode of the file: read from the header of a binary container, else None.
+
+    Legacy text ciphertext carries no mode information (CBC/CTR only prepend
+    the 2-character IV/nonce), so it cannot be detected without trial decryption.
+    """
+    if hasattr(file_content, 'read'):
+        position = file_content.tell()
+        try:
+            return parse_header(file_content)["mode"] if is_container(file_content) else None
+        finally:
+            file_content.seek(position)
+    if isinstance(file_content, (bytes, bytearray, memoryview)) and is_container(file_content):
+        return parse_header(file_content)["mode"]
+    return None
+
+# === Streaming enkripsi/dekripsi file (memori konstan) ===
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # bytes
+
+def _check_chunk_size(chunk_size):
+    # read(0) langsung mengembalikan b'' (data hilang), read(-1) membaca seluruh input ke memori
+    if chunk_size <= 0:
+        raise ValueError(f"Chunk size must be a positive number of bytes (got {chunk_size})")
+
+def _read_chunks(source, chunk_size):
+    """Yield fixed-size byte chunks from a binary file-like object."""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def _counted(chunks, total):
+    """Pass chunks through while adding their sizes to total[0]."""
+    for chunk in chunks:
+        total[0] += len(chunk)
+        yield chunk
+
+def _crypt_chunks(chunks, context):
+    """Generator: run byte chunks through an Encryptor/Decryptor, yielding output as it is ready."""
+    for chunk in chunks:
+        piece = context.update(chunk)
+        if piece:
+            yield piece
+    piece = context.finalize()
+    if piece:
+        yield piece
+
+def encrypt_stream(source, destination, key, block_mode="ECB", iv=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encrypt a binary file-like object into another chunk by chunk; returns byte counts."""
+    from cipher_context import Encryptor
+
+    _check_chunk_size(chunk_size)
+    context = Encryptor(key, block_mode, iv)
+    written, read = 0, [0]
+    for piece in _crypt_chunks(_counted(_read_chunks(source, chunk_size), read), context):
+        destination.write(piece)
+        written += len(piece)
+    return {"block_mode": context.mode, "bytes_read": read[0], "bytes_written": written}
+
+def decrypt_stream(source, destination, key, block_mode="ECB", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Decrypt a binary file-like object into another chunk by chunk; returns byte counts."""
+    from cipher_context import Decryptor
+
+    _check_chunk_size(chunk_size)
+    context = Decryptor(key, block_mode)
+    written, read = 0, [0]
+    for piece in _crypt_chunks(_counted(_read_chunks(source, chunk_size), read), context):
+        destination.write(piece)
+        written += len(piece)
+    return {"block_mode": context.mode, "bytes_read": read[0], "bytes_written": written}
+
+def encrypt_file(input_path, output_path, key, block_mode="ECB", iv=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encrypt a file on disk to another path using constant memory."""
+    with open(input_path, 'rb') as source, open(output_path, 'wb') as destination:
+        result = encrypt_stream(source, destination, key, block_mode, iv, chunk_size)
+    result["output_path"] = os.path.abspath(output_path)
+    return result
+
+def decrypt_file(input_path, output_path, key, block_mode="ECB", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Decrypt a file on disk to another path using constant memory."""
+    with open(input_path, 'rb') as source, open(output_path, 'wb') as destination:
+        result = decrypt_stream(source, destination, key, block_mode, chunk_size)
+    result["output_path"] = os.path.abspath(output_path)
+    return result
@@ -0,0 +1,184 @@
+import itertools
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from block_modes import iter_text_chunks, DEFAULT_CHUNK_BLOCKS
+from file_handler import decode_file_content
+from profiler import profile_stages, active_profiler
+
+# Job runner untuk pekerjaan enkripsi/dekripsi yang panjang: dijalankan di
+# thread pool, progress dan ETA bisa dibaca kapan saja, bisa dibatalkan, dan
+# hasilnya ditulis bertahap ke file sementara (bukan string di memori).
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+FINISHED_STATES = (DONE, CANCELLED, FAILED)
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_JOBS = 32
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when cancel() was requested."""
+
+
+class Job:
+    """State of one background job: progress in units (blocks), timing, result file and errors."""
+
+    def __init__(self, job_id, description, total):
+        self.id = job_id
+        self.description = description
+        self.total = total
+        self.done = 0
+        self.status = PENDING
+        self.result_path = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    def advance(self, done):
+        """Set the progress to `done` units; raises JobCancelled if cancellation was requested."""
+        self.done = done
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def progress(self):
+        return min(self.done / self.total, 1.0) if self.total else (1.0 if self.status == DONE else 0.0)
+
+    @property
+    def rate(self):
+        """Units (blocks) processed per second so far."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left, or None before the first progress update."""
+        rate = self.rate
+        if self.finished:
+            return 0.0
+        return (self.total - self.done) / rate if rate > 0 else None
+
+    def remove_result(self):
+        if self.result_path and os.path.exists(self.result_path):
+            os.remove(self.result_path)
+        self.result_path = None
+
+
+class JobRunner:
+    """Thread pool that runs fn(job) in the background and keeps the last `max_jobs` jobs."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mini-aes-job")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, fn, total, description=""):
+        """Start fn(job) in the background and return the Job right away."""
+        job = Job(next(self._ids), description, total)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        # Profiler aktif pemanggil (mis. profiler per sesi) ikut ke thread job
+        self._pool.submit(self._run, fn, job, active_profiler())
+        return job
+
+    def _run(self, fn, job, profiler=None):
+        job.status = RUNNING
+        job.started_at = time.perf_counter()
+        try:
+            if profiler is not None:
+                with profile_stages(profiler):
+                    fn(job)
+            else:
+                fn(job)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+            job.remove_result()
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            job.remove_result()
+        finally:
+            job.finished_at = time.perf_counter()
+
+    def _prune(self):
+        # Job selesai yang paling lama dibuang beserta file hasilnya
+        finished = [job for job in self._jobs.values() if job.finished]
+        while len(self._jobs) > self.max_jobs and finished:
+            job = finished.pop(0)
+            job.remove_result()
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def remove(self, job_id):
+        """Cancel a job if still running and delete its result file."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel()
+            job.remove_result()
+
+    def shutdown(self):
+        for job in self.jobs():
+            job.cancel()
+        self._pool.shutdown(wait=True)
+
+
+def _text_job(text, key, mode, action, iv, chunk_blocks, suffix):
+    def run(job):
+        handle, job.result_path = tempfile.mkstemp(prefix="mini_aes_", suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8', errors='surrogatepass') as output:
+            for done, piece in iter_text_chunks(text, key, mode, action, iv, chunk_blocks):
+                output.write(piece)
+                job.advance(done)
+    return run
+
+def start_text_job(runner, text, key, mode="ECB", action="encrypt", iv=None,
+                   chunk_blocks=DEFAULT_CHUNK_BLOCKS, suffix=".txt"):
+    """Encrypt/decrypt text in chunks as a background job; the output goes to job.result_path (UTF-8)."""
+    body = len(text) - (2 if action == "decrypt" and mode.upper() != "ECB" else 0)
+    description = f"{mode.upper()} {action} ({len(text)} karakter)"
+    return runner.submit(_text_job(text, key, mode, action, iv, chunk_blocks, suffix),
+                         max((body + 1) // 2, 0), description)
+
+def start_file_decrypt_job(runner, file_content, key, block_mode="ECB", chunk_blocks=DEFAULT_CHUNK_BLOCKS):
+    """Background counterpart of file_handler.decrypt_file_content (without trace logs)."""
+    if not file_content or not key:
+        raise ValueError("Both file content and key are required for decryption")
+    return start_text_job(runner, decode_file_content(file_content), key[:2], block_mode, "decrypt",
+                          chunk_blocks=chunk_blocks)
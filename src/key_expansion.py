@@ -1,6 +1,9 @@
-from utils import s_box
+from collections import OrderedDict
+from threading import Lock
 
-def key_expansion(key):
+from utils import s_box, text_to_state
+
+def _expand_words(key):
     w = [0] * 6
     w[0] = (key >> 8) & 0xFF
     w[1] = key & 0xFF
@@ -14,6 +17,10 @@ def key_expansion(key):
     w[3] = w[2] ^ w[1]
     w[4] = w[2] ^ rcon2 ^ sub_word(w[3])
     w[5] = w[4] ^ w[3]
+    return w
+
+def key_expansion(key):
+    w = _expand_words(key)
 
     round_keys = [
         [[(w[0] >> 4) & 0xF, w[0] & 0xF], [(w[1] >> 4) & 0xF, w[1] & 0xF]],
@@ -21,3 +28,102 @@ def key_expansion(key):
         [[(w[4] >> 4) & 0xF, w[4] & 0xF], [(w[5] >> 4) & 0xF, w[5] & 0xF]],
     ]
     return round_keys
+
+def key_expansion_packed(key):
+    """Expand a key into 3 round keys packed as 16-bit ints (utils.state_to_text layout)."""
+    w = _expand_words(key)
+    # Word genap = baris atas (s00, s01), word ganjil = baris bawah (s10, s11)
+    return tuple(
+        ((w[i] >> 4) << 12) | ((w[i + 1] >> 4) << 8) | ((w[i] & 0xF) << 4) | (w[i + 1] & 0xF)
+        for i in (0, 2, 4)
+    )
+
+
+DEFAULT_KEY_CACHE_SIZE = 4096
+
+class KeyScheduleCache:
+    """Bounded LRU cache of packed key schedules with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=DEFAULT_KEY_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("Ukuran cache minimal 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._schedules = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        """Return the packed round keys (k0, k1, k2) for a 16-bit key."""
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is not None:
+                self.hits += 1
+                self._schedules.move_to_end(key)
+                return schedule
+
+            self.misses += 1
+            schedule = key_expansion_packed(key)
+            self._schedules[key] = schedule
+            if len(self._schedules) > self.maxsize:
+                self._schedules.popitem(last=False)
+                self.evictions += 1
+            return schedule
+
+    def get_nested(self, key):
+        """Return the round keys as nested lists, built on demand from the packed schedule."""
+        return [text_to_state(round_key) for round_key in self.get(key)]
+
+    def resize(self, maxsize):
+        """Change the capacity, evicting least recently used schedules if needed."""
+        if maxsize < 1:
+            raise ValueError("Ukuran cache minimal 1.")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._schedules) > maxsize:
+                self._schedules.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached schedules and reset the counters."""
+        with self._lock:
+            self._schedules.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return cache statistics as a dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._schedules),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._schedules)
+
+
+# Cache global yang dipakai main, block_modes, avalanche dan GUI
+key_schedule_cache = KeyScheduleCache()
+
+def get_round_keys(key):
+    """Packed round keys for `key` from the shared LRU cache."""
+    return key_schedule_cache.get(key)
+
+def get_round_keys_nested(key):
+    """Nested-list round keys for `key` from the shared LRU cache."""
+    return key_schedule_cache.get_nested(key)
+
+def key_cache_info():
+    return key_schedule_cache.info()
+
+def set_key_cache_size(maxsize):
+    key_schedule_cache.resize(maxsize)
+
+def clear_key_cache():
+    key_schedule_cache.clear()
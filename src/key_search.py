@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils import chars_to_16bit, bit16_to_chars
+from main import encrypt
+from trace_log import TRACE_OFF
+from batch_engine import expand_keys_array, encrypt_with_schedule
+
+# Known-plaintext exhaustive key search: Mini-AES hanya punya 2^16 key,
+# jadi seluruh keyspace bisa diuji dengan key schedule dan enkripsi vektor.
+
+KEYSPACE = 1 << 16
+DEFAULT_KEY_CHUNK = 8192
+
+def _to_16bit(value):
+    return chars_to_16bit(value) if isinstance(value, str) else int(value)
+
+def normalize_pairs(pairs):
+    """Convert (plaintext, ciphertext) pairs given as 2-char strings or 16-bit ints to int tuples."""
+    normalized = [(_to_16bit(plain), _to_16bit(cipher)) for plain, cipher in pairs]
+    if not normalized:
+        raise ValueError("Minimal satu pasangan (plaintext, ciphertext) diperlukan.")
+    return normalized
+
+def _search_chunk(task):
+    """Return the keys in [start, stop) that map every plaintext to its ciphertext."""
+    start, stop, pairs = task
+    keys = np.arange(start, stop, dtype=np.uint32).astype(np.uint16)
+    schedule = expand_keys_array(keys)
+    match = np.ones(len(keys), dtype=bool)
+    for plaintext, ciphertext in pairs:
+        match &= encrypt_with_schedule(np.uint16(plaintext), *schedule) == ciphertext
+    return keys[match].tolist()
+
+def exhaustive_key_search(pairs, processes=None, chunk_size=DEFAULT_KEY_CHUNK, stop_at_first=False, progress=None):
+    """Test every 16-bit key against known (plaintext, ciphertext) pairs.
+
+    The keyspace is split into chunks of `chunk_size` keys, optionally spread
+    over `processes` worker processes. With `stop_at_first` the search stops
+    as soon as one key matches. `progress(keys_tested, total)` is called per
+    finished chunk. Every candidate is re-checked with main.encrypt.
+    """
+    pairs = normalize_pairs(pairs)
+    tasks = [(start, min(start + chunk_size, KEYSPACE), pairs) for start in range(0, KEYSPACE, chunk_size)]
+    candidates = []
+    tested = 0
+    started = time.perf_counter()
+
+    def collect(task, found):
+        nonlocal tested
+        tested += task[1] - task[0]
+        candidates.extend(found)
+        if progress is not None:
+            progress(tested, KEYSPACE)
+        return stop_at_first and bool(found)
+
+    if processes and processes > 1:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        try:
+            futures = {pool.submit(_search_chunk, task): task for task in tasks}
+            for future in as_completed(futures):
+                if collect(futures[future], future.result()):
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        for task in tasks:
+            if collect(task, _search_chunk(task)):
+                break
+
+    elapsed = time.perf_counter() - started
+    # Verifikasi ulang kandidat dengan implementasi referensi
+    candidates = sorted(key for key in candidates
+                        if all(encrypt(plain, key, TRACE_OFF)[0] == cipher for plain, cipher in pairs))
+    return {
+        "candidates": candidates,
+        "candidate_keys": [bit16_to_chars(key) for key in candidates],
+        "pairs": pairs,
+        "keys_tested": tested,
+        "exhausted": tested == KEYSPACE,
+        "elapsed_seconds": elapsed,
+        "keys_per_second": tested / elapsed if elapsed > 0 else float("inf"),
+    }
+
+def benchmark_key_search(repeats=3, processes=None, reference_keys=2048):
+    """Measure keys/second of the vectorized search against a plain main.encrypt loop."""
+    plaintext, key = chars_to_16bit("hi"), chars_to_16bit("01")
+    pair = (plaintext, encrypt(plaintext, key, TRACE_OFF)[0])
+
+    best = min(exhaustive_key_search([pair], processes=processes)["elapsed_seconds"] for _ in range(repeats))
+
+    started = time.perf_counter()
+    for candidate in range(reference_keys):
+        encrypt(plaintext, candidate, TRACE_OFF)
+    reference_elapsed = time.perf_counter() - started
+
+    vectorized_rate = KEYSPACE / best
+    reference_rate = reference_keys / reference_elapsed
+    return {
+        "vectorized_keys_per_second": vectorized_rate,
+        "reference_keys_per_second": reference_rate,
+        "speedup": vectorized_rate / reference_rate,
+        "processes": processes or 1,
+    }
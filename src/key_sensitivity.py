@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_engine import expand_keys_array, encrypt_with_schedule
+from avalanche import popcount16
+
+# Analisis sensitivitas key (key avalanche) untuk banyak / seluruh 65.536 key.
+# Untuk setiap key k, bit key i dan plaintext p dihitung
+#   diff = E_k(p) ^ E_{k ^ (1 << i)}(p)
+# dengan key schedule yang di-expand secara vektor per batch key.
+
+KEYSPACE = 1 << 16
+DEFAULT_KEY_CHUNK = 4096
+DEFAULT_RESULT_PATH = "key_avalanche_results.npz"
+_BIT_SHIFTS = np.arange(16, dtype=np.uint16)
+
+def default_plaintexts():
+    """16 evenly spaced sample plaintexts used when none are given."""
+    return np.arange(0, KEYSPACE, KEYSPACE // 16, dtype=np.uint16)
+
+def _sweep_chunk(task):
+    """Analyse one batch of keys; returns partial counters (runs in a worker process)."""
+    keys, plaintexts = task
+    base_schedule = expand_keys_array(keys)
+    flipped_schedules = [expand_keys_array(keys ^ np.uint16(1 << bit)) for bit in range(16)]
+
+    flip_histogram = np.zeros((16, 17), dtype=np.int64)
+    output_bit_flips = np.zeros((16, 16), dtype=np.int64)
+    bits_changed_per_key = np.zeros(len(keys), dtype=np.int64)
+
+    for plaintext in plaintexts:
+        plaintext = np.uint16(plaintext)
+        base = encrypt_with_schedule(plaintext, *base_schedule)
+        for bit, schedule in enumerate(flipped_schedules):
+            diff = base ^ encrypt_with_schedule(plaintext, *schedule)
+            weights = popcount16(diff)
+            flip_histogram[bit] += np.bincount(weights, minlength=17)
+            output_bit_flips[bit] += ((diff[:, None] >> _BIT_SHIFTS) & 1).sum(axis=0, dtype=np.int64)
+            bits_changed_per_key += weights
+
+    return flip_histogram, output_bit_flips, bits_changed_per_key
+
+def key_avalanche_sweep(keys=None, plaintexts=None, processes=None, chunk_size=DEFAULT_KEY_CHUNK, progress=None):
+    """Key-sensitivity analysis over many (default: all 65,536) keys.
+
+    Keys are processed in batches of `chunk_size`, optionally across a
+    process pool of `processes` workers. `progress(done_keys, total_keys)`
+    is called after each batch. Returns a dict of NumPy arrays:
+    - "flip_histogram" (16x17): per key bit, counts of 0..16 ciphertext bits flipped
+    - "output_bit_flip_rate" (16x16): P(ciphertext bit j flips | key bit i flipped)
+    - "mean_bits_changed" (16,): average ciphertext bits flipped per key bit
+    - "per_key_mean_bits" (n_keys,): average over key bits and plaintexts, per key
+    """
+    keys = np.arange(KEYSPACE, dtype=np.uint16) if keys is None else np.asarray(keys, dtype=np.uint16)
+    plaintexts = default_plaintexts() if plaintexts is None else np.asarray(plaintexts, dtype=np.uint16)
+    tasks = [(keys[start:start + chunk_size], plaintexts) for start in range(0, len(keys), chunk_size)]
+
+    flip_histogram = np.zeros((16, 17), dtype=np.int64)
+    output_bit_flips = np.zeros((16, 16), dtype=np.int64)
+    per_key = []
+    done = 0
+    started = time.perf_counter()
+
+    def collect(task, partial):
+        nonlocal done, flip_histogram, output_bit_flips
+        flip_histogram += partial[0]
+        output_bit_flips += partial[1]
+        per_key.append(partial[2])
+        done += len(task[0])
+        if progress is not None:
+            progress(done, len(keys))
+
+    if processes and processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for task, partial in zip(tasks, pool.map(_sweep_chunk, tasks)):
+                collect(task, partial)
+    else:
+        for task in tasks:
+            collect(task, _sweep_chunk(task))
+
+    samples = len(keys) * len(plaintexts)
+    per_key_bits = np.concatenate(per_key) if per_key else np.empty(0, dtype=np.int64)
+    return {
+        "keys": keys,
+        "plaintexts": plaintexts,
+        "flip_histogram": flip_histogram,
+        "output_bit_flip_rate": output_bit_flips / max(samples, 1),
+        "mean_bits_changed": (flip_histogram * np.arange(17)).sum(axis=1) / max(samples, 1),
+        "per_key_mean_bits": (per_key_bits / max(16 * len(plaintexts), 1)).astype(np.float32),
+        "elapsed_seconds": time.perf_counter() - started,
+    }
+
+def save_key_avalanche(result, path=DEFAULT_RESULT_PATH):
+    """Write a sweep result to a compressed .npz file and return its path."""
+    np.savez_compressed(path, **{name: np.asarray(value) for name, value in result.items()})
+    return path
+
+def load_key_avalanche(path=DEFAULT_RESULT_PATH):
+    """Load a sweep result written by save_key_avalanche."""
+    with np.load(path) as data:
+        result = {name: data[name] for name in data.files}
+    result["elapsed_seconds"] = float(result["elapsed_seconds"])
+    return result
@@ -0,0 +1,216 @@
+import numpy as np
+
+from utils import chars_to_16bit, bit16_to_chars
+from main import encrypt, decrypt
+from key_expansion import get_round_keys
+from packed_core import encrypt_block as packed_encrypt_block
+from trace_log import TraceLog, TRACE_OFF, TRACE_FULL, check_trace_mode
+from batch_engine import text_to_blocks
+from trace_records import mode_trace
+from block_modes import (pad_text, _ctr_xor_block, DEFAULT_CHUNK_BLOCKS, BLOCK_HEADER, BLOCK_SUMMARY,
+                         IV_HEADER, CHAIN_XOR, NONCE_HEADER, COUNTER_LINE, KEYSTREAM_XOR, COUNTER_SUMMARY)
+
+# Log proses mode blok yang "virtual": log tidak disimpan untuk seluruh input,
+# tetapi dibuat ulang per blok saat dibutuhkan dengan menjalankan ulang satu
+# blok itu saja. Nilai berantai (ciphertext sebelumnya untuk CBC, counter
+# untuk CTR) diambil dari input/output, jadi biaya menampilkan satu halaman
+# hanya bergantung pada ukuran halaman, bukan panjang input.
+
+DEFAULT_PAGE_BLOCKS = 10
+DEFAULT_SEARCH_LIMIT = 100
+
+
+class BlockTrace:
+    """Per-block round logs of one ECB/CBC/CTR run, rebuilt on demand.
+
+    `text` is the input given to the mode function and `output` its result
+    (needed for CBC/CTR encryption, whose IV/nonce and chaining values come
+    from the output). The lines equal the logs the mode function returns with
+    the same `trace` ("full" or "summary").
+    """
+
+    def __init__(self, text, key, mode="ECB", action="encrypt", output=None, trace=TRACE_FULL):
+        mode = mode.upper()
+        if mode not in ("ECB", "CBC", "CTR"):
+            raise ValueError(f"Unsupported block mode: {mode}")
+        if action not in ("encrypt", "decrypt"):
+            raise ValueError(f"Unknown action: {action}")
+        trace = check_trace_mode(trace)
+        if trace == TRACE_OFF:
+            raise ValueError("BlockTrace needs trace 'full' or 'summary'")
+        self.mode = mode
+        self.action = action
+        self.trace = trace
+        self.key_16bit = chars_to_16bit(key[:2])
+        self.round_keys = get_round_keys(self.key_16bit)
+
+        encrypting = action == "encrypt"
+        self.header = None
+        self.input_body = text
+        self.output_body = output
+        if mode != "ECB":
+            source = output if encrypting else text
+            if source is None or len(source) < 2:
+                raise ValueError(f"{mode} {'output' if encrypting else 'ciphertext'} must include the IV/nonce")
+            self.header = source[:2]
+            if encrypting:
+                self.output_body = output[2:]
+            else:
+                self.input_body = text[2:]
+        if mode == "CBC" and encrypting and output is None:
+            raise ValueError("CBC encryption logs need the ciphertext")
+        if mode != "CTR":
+            self.input_body = pad_text(self.input_body)
+
+    @property
+    def block_count(self):
+        return (len(self.input_body) + 1) // 2
+
+    def __len__(self):
+        return self.block_count
+
+    def header_lines(self):
+        """Lines logged before the first block (the IV or nonce)."""
+        if self.header is None:
+            return []
+        template = NONCE_HEADER if self.mode == "CTR" else IV_HEADER
+        return [template.format(self.header, chars_to_16bit(self.header))]
+
+    def _block(self, body, index):
+        return body[2 * index:2 * index + 2]
+
+    def _previous(self, index):
+        # Blok CBC sebelumnya: IV untuk blok pertama, selain itu ciphertext blok index-1
+        if index == 0:
+            return chars_to_16bit(self.header)
+        body = self.output_body if self.action == "encrypt" else self.input_body
+        return chars_to_16bit(self._block(body, index - 1))
+
+    def block_lines(self, index):
+        """Log lines of block `index` (0-based), recomputed from that block alone."""
+        if not 0 <= index < self.block_count:
+            raise IndexError(f"Block {index + 1} out of range (1..{self.block_count})")
+        full = self.trace == TRACE_FULL
+        log = TraceLog()
+        number = index + 1
+        block = self._block(self.input_body, index)
+        if full:
+            log.add(BLOCK_HEADER, number, block)
+
+        if self.mode == "CTR":
+            counter = (chars_to_16bit(self.header) + index) & 0xFFFF
+            if full:
+                log.add(COUNTER_LINE, counter)
+                keystream = encrypt(counter, self.key_16bit, TRACE_FULL, log)[0]
+                log.add(KEYSTREAM_XOR, keystream, block, _ctr_xor_block(block, keystream))
+            else:
+                keystream = packed_encrypt_block(counter, *self.round_keys)
+                log.add(COUNTER_SUMMARY, number, counter, keystream)
+            return list(log)
+
+        block_16bit = chars_to_16bit(block)
+        if self.action == "encrypt":
+            value = block_16bit
+            if self.mode == "CBC":
+                previous = self._previous(index)
+                value = block_16bit ^ previous
+                if full:
+                    log.add(CHAIN_XOR, block_16bit, previous, value)
+            if full:
+                encrypt(value, self.key_16bit, TRACE_FULL, log)
+            else:
+                log.add(BLOCK_SUMMARY, number, block_16bit, packed_encrypt_block(value, *self.round_keys))
+        else:
+            if full:
+                result = decrypt(block_16bit, self.key_16bit, TRACE_FULL, log)[0]
+            else:
+                result = decrypt(block_16bit, self.key_16bit, TRACE_OFF)[0]
+            if self.mode == "CBC":
+                previous = self._previous(index)
+                if full:
+                    log.add(CHAIN_XOR, result, previous, result ^ previous)
+                result ^= previous
+            if not full:
+                log.add(BLOCK_SUMMARY, number, block_16bit, result)
+        return list(log)
+
+    def page(self, start, count=DEFAULT_PAGE_BLOCKS):
+        """[(block_index, lines)] for blocks start .. start+count-1 (clipped to the input)."""
+        start = max(start, 0)
+        return [(i, self.block_lines(i)) for i in range(start, min(start + count, self.block_count))]
+
+    def _words(self, body, start, stop):
+        piece = body[2 * start:2 * stop]
+        words = text_to_blocks(piece)
+        if words is None:
+            words = np.array([chars_to_16bit(piece[i:i + 2]) & 0xFFFF for i in range(0, len(piece), 2)],
+                             dtype=np.uint16)
+        return words
+
+    def records(self, start=0, count=None):
+        """Compact RoundTrace (trace_records) of blocks start .. start+count-1, computed in one batch."""
+        start = max(start, 0)
+        stop = self.block_count if count is None else min(start + count, self.block_count)
+        start = min(start, stop)
+        previous = None
+        if self.mode == "CTR":
+            words = (chars_to_16bit(self.header) + np.arange(start, stop)) & 0xFFFF
+        else:
+            words = self._words(self.input_body, start, stop)
+        if self.mode == "CBC":
+            chain = self.output_body if self.action == "encrypt" else self.input_body
+            previous = np.empty(stop - start, dtype=np.uint16)
+            if stop > start:
+                previous[0] = self._previous(start)
+                previous[1:] = self._words(chain, start, stop - 1)
+        return mode_trace(words, self.key_16bit, self.mode, self.action, previous, first_block=start)
+
+    def iter_records(self, chunk_blocks=DEFAULT_CHUNK_BLOCKS):
+        """Yield RoundTrace chunks of `chunk_blocks` blocks covering the whole input (bounded memory)."""
+        for start in range(0, self.block_count, chunk_blocks):
+            yield self.records(start, chunk_blocks)
+
+    def __iter__(self):
+        """Every log line in order; equal to the full log of the mode function."""
+        yield from self.header_lines()
+        for i in range(self.block_count):
+            yield from self.block_lines(i)
+
+    def find(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """Indices of blocks whose input or output text contains `query`.
+
+        A query such as "0x1A2B" also matches blocks whose 16-bit input or
+        output value is 0x1A2B. Only the texts are scanned, no trace is built.
+        """
+        if not query:
+            return []
+        hits = set()
+        value = None
+        if query[:2].lower() == "0x" and 3 <= len(query) <= 6:
+            try:
+                value = int(query[2:], 16)
+            except ValueError:
+                value = None
+        if value is not None:
+            target = bit16_to_chars(value)
+            for body in (self.input_body, self.output_body):
+                hits.update(self._find_text(body, target, limit, aligned=True))
+        for body in (self.input_body, self.output_body):
+            hits.update(self._find_text(body, query, limit))
+        return sorted(hits)[:limit]
+
+    @staticmethod
+    def _find_text(body, query, limit, aligned=False):
+        """Distinct block indices (ascending) where `query` starts, at most `limit`."""
+        found = []
+        if not body:
+            return found
+        position = body.find(query)
+        while position != -1 and len(found) < limit:
+            if aligned and position % 2:
+                position = body.find(query, position + 1)
+                continue
+            found.append(position // 2)
+            # Lompat ke awal blok berikutnya agar satu blok dihitung sekali
+            position = body.find(query, (position // 2 + 1) * 2)
+        return found
@@ -1,87 +1,143 @@
 from utils import text_to_state, state_to_text, chars_to_16bit, bit16_to_chars, bit16_to_hex
 from aes_core import sub_nibbles, shift_rows, mix_columns, add_round_key, inv_sub_nibbles, inv_shift_rows, inv_mix_columns
-from key_expansion import key_expansion
-
-def encrypt(plaintext_16bit, key_16bit):
-    state = text_to_state(plaintext_16bit)
-    round_keys = key_expansion(key_16bit)
-
-    logs = []
-    logs.append(f"Initial State: {state}")
+from key_expansion import get_round_keys, get_round_keys_nested
+from packed_core import encrypt_block as packed_encrypt_block, decrypt_block as packed_decrypt_block
+from trace_log import TraceLog, NO_LOGS, TRACE_OFF, TRACE_FULL, check_trace_mode
 
+def _encrypt_state(state, round_keys, log=None):
     # Round 0
     state = add_round_key(state, round_keys[0])
-    logs.append(f"After AddRoundKey (Round 0): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 0)", state_to_text(state))
 
     # Round 1
     state = sub_nibbles(state)
-    logs.append(f"After SubNibbles (Round 1): {state}")
+    if log is not None:
+        log.add_state("After SubNibbles (Round 1)", state_to_text(state))
 
     state = shift_rows(state)
-    logs.append(f"After ShiftRows (Round 1): {state}")
+    if log is not None:
+        log.add_state("After ShiftRows (Round 1)", state_to_text(state))
 
     state = mix_columns(state)
-    logs.append(f"After MixColumns (Round 1): {state}")
+    if log is not None:
+        log.add_state("After MixColumns (Round 1)", state_to_text(state))
 
     state = add_round_key(state, round_keys[1])
-    logs.append(f"After AddRoundKey (Round 1): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 1)", state_to_text(state))
 
     # Round 2 (Final Round)
     state = sub_nibbles(state)
-    logs.append(f"After SubNibbles (Round 2): {state}")
+    if log is not None:
+        log.add_state("After SubNibbles (Round 2)", state_to_text(state))
 
     state = shift_rows(state)
-    logs.append(f"After ShiftRows (Round 2): {state}")
+    if log is not None:
+        log.add_state("After ShiftRows (Round 2)", state_to_text(state))
 
     state = add_round_key(state, round_keys[2])
-    logs.append(f"After AddRoundKey (Round 2): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 2)", state_to_text(state))
 
-    ciphertext_16bit = state_to_text(state)
-    logs.append(f"Ciphertext (16-bit): {ciphertext_16bit} (0x{bit16_to_hex(ciphertext_16bit)})")
-
-    return ciphertext_16bit, logs
-
-def decrypt(ciphertext_16bit, key_16bit):
-    state = text_to_state(ciphertext_16bit)
-    round_keys = key_expansion(key_16bit)
-
-    logs = []
-    logs.append(f"Ciphertext Input: {state}")
+    return state_to_text(state)
 
+def _decrypt_state(state, round_keys, log=None):
     # Round 2
     state = add_round_key(state, round_keys[2])
-    logs.append(f"After AddRoundKey (Round 2): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 2)", state_to_text(state))
 
     state = inv_shift_rows(state)
-    logs.append(f"After InvShiftRows (Round 2): {state}")
+    if log is not None:
+        log.add_state("After InvShiftRows (Round 2)", state_to_text(state))
 
     state = inv_sub_nibbles(state)
-    logs.append(f"After InvSubNibbles (Round 2): {state}")
+    if log is not None:
+        log.add_state("After InvSubNibbles (Round 2)", state_to_text(state))
 
     # Round 1
     state = add_round_key(state, round_keys[1])
-    logs.append(f"After AddRoundKey (Round 1): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 1)", state_to_text(state))
 
     state = inv_mix_columns(state)
-    logs.append(f"After InvMixColumns (Round 1): {state}")
+    if log is not None:
+        log.add_state("After InvMixColumns (Round 1)", state_to_text(state))
 
     state = inv_shift_rows(state)
-    logs.append(f"After InvShiftRows (Round 1): {state}")
+    if log is not None:
+        log.add_state("After InvShiftRows (Round 1)", state_to_text(state))
 
     state = inv_sub_nibbles(state)
-    logs.append(f"After InvSubNibbles (Round 1): {state}")
+    if log is not None:
+        log.add_state("After InvSubNibbles (Round 1)", state_to_text(state))
 
     # Round 0
     state = add_round_key(state, round_keys[0])
-    logs.append(f"After AddRoundKey (Round 0): {state}")
+    if log is not None:
+        log.add_state("After AddRoundKey (Round 0)", state_to_text(state))
+
+    return state_to_text(state)
+
+def _plaintext_ascii_line(plaintext_16bit):
+    return f"Plaintext (ASCII): {bit16_to_chars(plaintext_16bit)}"
+
+def encrypt(plaintext_16bit, key_16bit, trace=TRACE_FULL, log=None):
+    """Encrypt one 16-bit block.
+
+    `trace` is "full" (every round state), "summary" (result only) or "off"
+    (no log object at all). Lines go into `log` (a TraceLog) when given and
+    are only formatted when read.
+    """
+    trace = check_trace_mode(trace)
+    if trace == TRACE_OFF:
+        # Jalur cepat: state packed 16-bit dengan T-table, tanpa list per round
+        return packed_encrypt_block(plaintext_16bit & 0xFFFF, *get_round_keys(key_16bit)), NO_LOGS
 
-    plaintext_16bit = state_to_text(state)
-    logs.append(f"Plaintext (16-bit): {plaintext_16bit} (0x{bit16_to_hex(plaintext_16bit)})")
-    logs.append(f"Plaintext (ASCII): {bit16_to_chars(plaintext_16bit)}")
+    state = text_to_state(plaintext_16bit)
+    round_keys = get_round_keys_nested(key_16bit)
+
+    full = trace == TRACE_FULL
+    if log is None:
+        log = TraceLog()
+
+    if full:
+        log.add_state("Initial State", plaintext_16bit)
+    ciphertext_16bit = _encrypt_state(state, round_keys, log if full else None)
+    log.add("Ciphertext (16-bit): {0} (0x{0:04X})", ciphertext_16bit)
 
-    return plaintext_16bit, logs
+    return ciphertext_16bit, log
+
+def decrypt(ciphertext_16bit, key_16bit, trace=TRACE_FULL, log=None):
+    """Decrypt one 16-bit block; `trace` and `log` work as in encrypt()."""
+    trace = check_trace_mode(trace)
+    if trace == TRACE_OFF:
+        return packed_decrypt_block(ciphertext_16bit & 0xFFFF, *get_round_keys(key_16bit)), NO_LOGS
+
+    state = text_to_state(ciphertext_16bit)
+    round_keys = get_round_keys_nested(key_16bit)
+
+    full = trace == TRACE_FULL
+    if log is None:
+        log = TraceLog()
+
+    if full:
+        log.add_state("Ciphertext Input", ciphertext_16bit)
+    plaintext_16bit = _decrypt_state(state, round_keys, log if full else None)
+    log.add("Plaintext (16-bit): {0} (0x{0:04X})", plaintext_16bit)
+    log.add(_plaintext_ascii_line, plaintext_16bit)
+
+    return plaintext_16bit, log
 
 if __name__ == "__main__":
+    import sys
+
+    # Dengan argumen: CLI non-interaktif (lihat cli.py), tanpa argumen: prompt interaktif
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     print("=== Mini-AES 16-bit CLI ===\n")
     input_mode = input("Pilih Mode (e = Encrypt, d = Decrypt): ").lower()
 
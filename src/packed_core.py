@@ -0,0 +1,90 @@
+from utils import s_box, inv_s_box, gf_mul, text_to_state, state_to_text
+
+# Core Mini-AES alternatif dengan state berupa satu integer 16-bit.
+#
+# Layout sama dengan utils.text_to_state: bit 15-12 = s00, 11-8 = s10,
+# 7-4 = s01, 3-0 = s11. Setiap kolom state adalah satu byte
+# (byte tinggi = kolom 0, byte rendah = kolom 1).
+
+def _byte_table(fn):
+    return tuple(fn(b >> 4, b & 0xF) for b in range(256))
+
+# Tabel per tahap (dipakai untuk tracing / analisis tahap demi tahap)
+SUB_BYTE = _byte_table(lambda hi, lo: (s_box[hi] << 4) | s_box[lo])
+INV_SUB_BYTE = _byte_table(lambda hi, lo: (inv_s_box[hi] << 4) | inv_s_box[lo])
+MIX_BYTE = _byte_table(lambda a, b: ((a ^ gf_mul(4, b)) << 4) | (gf_mul(4, a) ^ b))
+INV_MIX_BYTE = _byte_table(lambda a, b: ((gf_mul(9, a) ^ gf_mul(2, b)) << 4) | (gf_mul(2, a) ^ gf_mul(9, b)))
+
+# T-table round 1 enkripsi: SubNibbles + ShiftRows + MixColumns.
+# Input nibble n0..n3 = s00, s10, s01, s11. Setelah sub+shift kolom 0 berisi
+# (S(n0), S(n3)) dan kolom 1 berisi (S(n2), S(n1)). MixColumns linear, jadi
+# kontribusi byte tinggi dan byte rendah bisa di-XOR.
+T_HIGH = _byte_table(lambda n0, n1: (s_box[n0] << 12) | (gf_mul(4, s_box[n0]) << 8)
+                     | (gf_mul(4, s_box[n1]) << 4) | s_box[n1])
+T_LOW = _byte_table(lambda n2, n3: (gf_mul(4, s_box[n3]) << 12) | (s_box[n3] << 8)
+                    | (s_box[n2] << 4) | gf_mul(4, s_box[n2]))
+
+# Round 2 enkripsi (tanpa MixColumns): SubNibbles + ShiftRows
+F_HIGH = _byte_table(lambda n0, n1: (s_box[n0] << 12) | s_box[n1])
+F_LOW = _byte_table(lambda n2, n3: (s_box[n3] << 8) | (s_box[n2] << 4))
+
+# Round 2 dekripsi: InvShiftRows + InvSubNibbles
+INV_F_HIGH = _byte_table(lambda n0, n1: (inv_s_box[n0] << 12) | inv_s_box[n1])
+INV_F_LOW = _byte_table(lambda n2, n3: (inv_s_box[n3] << 8) | (inv_s_box[n2] << 4))
+
+# Round 1 dekripsi: InvMixColumns + InvShiftRows + InvSubNibbles.
+# Setiap nibble output hanya bergantung pada satu kolom (byte) input.
+INV_T_HIGH = _byte_table(lambda n0, n1: (inv_s_box[gf_mul(9, n0) ^ gf_mul(2, n1)] << 12)
+                         | inv_s_box[gf_mul(2, n0) ^ gf_mul(9, n1)])
+INV_T_LOW = _byte_table(lambda n2, n3: (inv_s_box[gf_mul(2, n2) ^ gf_mul(9, n3)] << 8)
+                        | (inv_s_box[gf_mul(9, n2) ^ gf_mul(2, n3)] << 4))
+
+
+def encrypt_block(block, k0, k1, k2):
+    """Encrypt a packed 16-bit block with packed round keys k0, k1, k2."""
+    x = block ^ k0
+    x = T_HIGH[x >> 8] ^ T_LOW[x & 0xFF] ^ k1
+    return F_HIGH[x >> 8] ^ F_LOW[x & 0xFF] ^ k2
+
+def decrypt_block(block, k0, k1, k2):
+    """Decrypt a packed 16-bit block with packed round keys k0, k1, k2."""
+    x = block ^ k2
+    x = INV_F_HIGH[x >> 8] ^ INV_F_LOW[x & 0xFF] ^ k1
+    return INV_T_HIGH[x >> 8] ^ INV_T_LOW[x & 0xFF] ^ k0
+
+
+# Operasi per tahap pada state packed
+def sub_nibbles(x):
+    return (SUB_BYTE[x >> 8] << 8) | SUB_BYTE[x & 0xFF]
+
+def inv_sub_nibbles(x):
+    return (INV_SUB_BYTE[x >> 8] << 8) | INV_SUB_BYTE[x & 0xFF]
+
+def shift_rows(x):
+    # Tukar s10 (bit 11-8) dengan s11 (bit 3-0)
+    return (x & 0xF0F0) | ((x >> 8) & 0xF) | ((x & 0xF) << 8)
+
+inv_shift_rows = shift_rows
+
+def mix_columns(x):
+    return (MIX_BYTE[x >> 8] << 8) | MIX_BYTE[x & 0xFF]
+
+def inv_mix_columns(x):
+    return (INV_MIX_BYTE[x >> 8] << 8) | INV_MIX_BYTE[x & 0xFF]
+
+def add_round_key(x, key):
+    return x ^ key
+
+
+# Adapter untuk API list-of-lists (aes_core / key_expansion)
+def pack_round_keys(round_keys):
+    """Convert nested-list round keys from key_expansion() to packed ints."""
+    return tuple(state_to_text(round_key) for round_key in round_keys)
+
+def encrypt_state(state, round_keys):
+    """List-of-lists adapter: encrypt a 2x2 state with nested-list round keys."""
+    return text_to_state(encrypt_block(state_to_text(state), *pack_round_keys(round_keys)))
+
+def decrypt_state(state, round_keys):
+    """List-of-lists adapter: decrypt a 2x2 state with nested-list round keys."""
+    return text_to_state(decrypt_block(state_to_text(state), *pack_round_keys(round_keys)))
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_engine import codebook_arrays
+
+# Ukuran shard default (jumlah blok 16-bit) per tugas worker
+DEFAULT_SHARD_BLOCKS = 1 << 18
+
+# State per proses worker: codebook dikirim sekali lewat initializer
+_worker_key = None
+_worker_forward = None
+_worker_inverse = None
+
+
+def _init_worker(key_16bit, forward_bytes, inverse_bytes):
+    global _worker_key, _worker_forward, _worker_inverse
+    _worker_key = key_16bit
+    _worker_forward = np.frombuffer(forward_bytes, dtype=np.uint16)
+    _worker_inverse = np.frombuffer(inverse_bytes, dtype=np.uint16)
+
+def _ecb_encrypt_shard(words):
+    return _worker_forward[words]
+
+def _ecb_decrypt_shard(words):
+    return _worker_inverse[words]
+
+def _cbc_decrypt_shard(shard):
+    words, previous_block = shard
+    previous = np.empty_like(words)
+    previous[0] = previous_block
+    previous[1:] = words[:-1]
+    return _worker_inverse[words] ^ previous
+
+
+class ShardedExecutor:
+    """Process pool bound to one key that runs ECB and CBC-decrypt work in block-aligned shards.
+
+    The key's codebooks are sent to each worker once, when the worker starts.
+    Shards are processed in parallel and reassembled in input order.
+    """
+
+    def __init__(self, key_16bit, workers=None, shard_blocks=DEFAULT_SHARD_BLOCKS):
+        if shard_blocks < 1:
+            raise ValueError("shard_blocks minimal 1.")
+        self.key = key_16bit
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_blocks = shard_blocks
+        forward, inverse = codebook_arrays(key_16bit)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(key_16bit, forward.tobytes(), inverse.tobytes()),
+        )
+
+    def _shards(self, words):
+        for start in range(0, len(words), self.shard_blocks):
+            yield words[start:start + self.shard_blocks]
+
+    def _gather(self, fn, tasks):
+        results = list(self._pool.map(fn, tasks))
+        if not results:
+            return np.empty(0, dtype=np.uint16)
+        return np.concatenate(results)
+
+    def check_key(self, key_16bit):
+        if key_16bit != self.key:
+            raise ValueError("Executor dibuat untuk key yang berbeda.")
+
+    def ecb_encrypt(self, words):
+        """ECB-encrypt a uint16 word array across the pool."""
+        return self._gather(_ecb_encrypt_shard, self._shards(np.asarray(words, dtype=np.uint16)))
+
+    def ecb_decrypt(self, words):
+        """ECB-decrypt a uint16 word array across the pool."""
+        return self._gather(_ecb_decrypt_shard, self._shards(np.asarray(words, dtype=np.uint16)))
+
+    def cbc_decrypt(self, words, iv_16bit):
+        """CBC-decrypt a uint16 word array (IV excluded); each shard gets the block before it."""
+        words = np.asarray(words, dtype=np.uint16)
+        tasks = []
+        previous = iv_16bit
+        for shard in self._shards(words):
+            tasks.append((shard, previous))
+            previous = int(shard[-1])
+        return self._gather(_cbc_decrypt_shard, tasks)
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
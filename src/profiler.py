@@ -0,0 +1,217 @@
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+
+import main
+import block_modes
+import key_expansion
+
+# Profiling per tahap (opt-in). Fungsi tahap yang dipanggil lewat global modul
+# main / block_modes / key_expansion dibungkus wrapper yang mencatat jumlah
+# panggilan dan total nanodetik. Wrapper hanya terpasang selama minimal satu
+# profiler aktif (reference count); saat profiler terakhir selesai, fungsi
+# asli dipulihkan sehingga tanpa profiling tidak ada overhead sama sekali.
+# Yang dicatat ditentukan per thread/konteks oleh ContextVar _active_profiler:
+# di satu proses (mis. banyak sesi Streamlit) hanya pemanggil di dalam
+# profile_stages() yang tercatat, ke profiler miliknya sendiri.
+#
+# Batasan: jalur trace="off" (packed T-table per blok, batch engine NumPy)
+# menggabungkan SubNibbles/ShiftRows/MixColumns dalam satu lookup tabel,
+# jadi hanya tercatat sebagai satu tahap "PackedRounds" / "BatchEngine".
+# Rincian AddRoundKey/SubNibbles/ShiftRows/MixColumns hanya ada untuk run
+# dengan trace "full" / "summary" (jalur per round).
+
+SINGLE_BLOCK = "Single block"
+TOTAL = "Total"
+
+# (modul, nama global, nama tahap)
+STAGE_HOOKS = [
+    (main, "add_round_key", "AddRoundKey"),
+    (main, "sub_nibbles", "SubNibbles"),
+    (main, "shift_rows", "ShiftRows"),
+    (main, "mix_columns", "MixColumns"),
+    (main, "inv_sub_nibbles", "InvSubNibbles"),
+    (main, "inv_shift_rows", "InvShiftRows"),
+    (main, "inv_mix_columns", "InvMixColumns"),
+    (main, "get_round_keys", "KeySchedule"),
+    (main, "get_round_keys_nested", "KeySchedule"),
+    (main, "packed_encrypt_block", "PackedRounds"),
+    (main, "packed_decrypt_block", "PackedRounds"),
+    (key_expansion, "key_expansion_packed", "KeyExpansion"),
+    (block_modes, "get_round_keys", "KeySchedule"),
+    (block_modes, "packed_encrypt_block", "PackedRounds"),
+    (block_modes, "packed_decrypt_block", "PackedRounds"),
+    (block_modes, "ecb_encrypt_array", "BatchEngine"),
+    (block_modes, "ecb_decrypt_array", "BatchEngine"),
+    (block_modes, "cbc_decrypt_array", "BatchEngine"),
+]
+
+# Helper block_modes yang menentukan mode; mode diambil dari nama fungsi pemanggil
+MODE_HOOKS = ["_encrypt_block", "_decrypt_block", "_ecb_words", "_cbc_decrypt_words",
+              "cbc_encrypt_words", "ctr_xor_bytes"]
+_MODE_PREFIXES = (("ecb", "ECB"), ("cbc", "CBC"), ("_ctr", "CTR"), ("ctr", "CTR"))
+
+def _mode_of(function_name):
+    for prefix, mode in _MODE_PREFIXES:
+        if function_name.startswith(prefix):
+            return mode
+    return SINGLE_BLOCK
+
+
+# Profiler aktif dan mode blok yang sedang berjalan, per thread/konteks
+_active_profiler = ContextVar("mini_aes_stage_profiler", default=None)
+_active_mode = ContextVar("mini_aes_stage_mode", default=None)
+_install_lock = threading.Lock()
+_active_count = 0
+_originals = []
+
+def _stage_wrapper(stage, fn):
+    def wrapper(*args, **kwargs):
+        profiler = _active_profiler.get()
+        if profiler is None:
+            return fn(*args, **kwargs)
+        caller = sys._getframe(1)
+        started = perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # Di luar helper mode (mis. get_round_keys di ecb_encrypt) mode diambil dari pemanggil
+            mode = _active_mode.get() or _mode_of(caller.f_code.co_name)
+            profiler.record(mode, stage, perf_counter_ns() - started)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+def _mode_wrapper(fn):
+    def wrapper(*args, **kwargs):
+        profiler = _active_profiler.get()
+        if profiler is None or _active_mode.get() is not None:
+            return fn(*args, **kwargs)  # tidak diprofile, atau sudah di dalam mode lain (CTR -> _ecb_words)
+        mode = _mode_of(sys._getframe(1).f_code.co_name)
+        token = _active_mode.set(mode)
+        started = perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _active_mode.reset(token)
+            profiler.record(mode, TOTAL, perf_counter_ns() - started)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+def _acquire_hooks():
+    """Install the wrappers when the first profiler becomes active."""
+    global _active_count
+    with _install_lock:
+        _active_count += 1
+        if _active_count > 1:
+            return
+        for module, name, stage in STAGE_HOOKS:
+            original = getattr(module, name)
+            _originals.append((module, name, original))
+            setattr(module, name, _stage_wrapper(stage, original))
+        for name in MODE_HOOKS:
+            original = getattr(block_modes, name)
+            _originals.append((block_modes, name, original))
+            setattr(block_modes, name, _mode_wrapper(original))
+
+def _release_hooks():
+    """Restore the original functions when the last active profiler stops."""
+    global _active_count
+    with _install_lock:
+        if _active_count == 0:
+            return
+        _active_count -= 1
+        if _active_count > 0:
+            return
+        for module, name, original in reversed(_originals):
+            setattr(module, name, original)
+        _originals.clear()
+
+def hooks_installed():
+    return _active_count > 0
+
+def active_profiler():
+    """The profiler recording the current thread/context, or None."""
+    return _active_profiler.get()
+
+
+class StageProfiler:
+    """Call counts and cumulative nanoseconds per (block mode, stage).
+
+    Untraced runs (trace="off") only report the combined "PackedRounds" or
+    "BatchEngine" stage; the per-operation breakdown needs trace "full"/"summary".
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """True if calls from the current thread/context are recorded here."""
+        return _active_profiler.get() is self
+
+    def record(self, mode, stage, elapsed_ns):
+        with self._lock:
+            entry = self._stats.setdefault((mode, stage), [0, 0])
+            entry[0] += 1
+            entry[1] += elapsed_ns
+
+    def enable(self):
+        """Record the current thread/context's calls here; returns the token for disable()."""
+        _acquire_hooks()
+        return _active_profiler.set(self)
+
+    def disable(self, token):
+        """Restore whatever profiler was active before the matching enable()."""
+        _active_profiler.reset(token)
+        _release_hooks()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """Stats as {mode: {stage: {"calls", "total_ns", "mean_ns"}}}.
+
+        KeySchedule includes the KeyExpansion done on cache misses, and the
+        Total of a block mode covers all of its stages.
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        result = {}
+        for (mode, stage), (calls, total_ns) in sorted(items):
+            result.setdefault(mode, {})[stage] = {
+                "calls": calls,
+                "total_ns": total_ns,
+                "mean_ns": total_ns / calls if calls else 0.0,
+            }
+        return result
+
+
+# Profiler default (GUI memakai satu StageProfiler per sesi)
+stage_profiler = StageProfiler()
+
+@contextmanager
+def profile_stages(profiler=None, reset=False):
+    """Enable per-stage profiling for the current thread/context inside the block and yield the profiler.
+
+        with profile_stages() as prof:
+            ecb_encrypt(text, key)
+        print(prof.snapshot())
+    """
+    profiler = profiler or stage_profiler
+    if reset:
+        profiler.reset()
+    token = profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable(token)
+
+def snapshot():
+    return stage_profiler.snapshot()
+
+def reset():
+    stage_profiler.reset()
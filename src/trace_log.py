@@ -0,0 +1,58 @@
+from collections.abc import Sequence
+
+from utils import text_to_state
+
+# Mode tracing untuk encrypt/decrypt dan mode operasi blok
+TRACE_OFF = "off"          # tanpa log sama sekali
+TRACE_SUMMARY = "summary"  # satu baris ringkasan per blok
+TRACE_FULL = "full"        # semua state tiap round
+TRACE_MODES = (TRACE_OFF, TRACE_SUMMARY, TRACE_FULL)
+
+# Shared empty log returned when tracing is off, so nothing is allocated per call
+NO_LOGS = ()
+
+
+def check_trace_mode(trace):
+    """Validate a tracing mode and return it in lowercase."""
+    mode = str(trace).lower()
+    if mode not in TRACE_MODES:
+        raise ValueError(f"Unsupported trace mode: {trace} (pilih {', '.join(TRACE_MODES)})")
+    return mode
+
+
+class TraceLog(Sequence):
+    """Round log that stores raw values and only formats a line when it is read."""
+
+    def __init__(self):
+        self._records = []
+
+    def add(self, template, *args):
+        """Record a line; `template` is a str.format template or a callable(*args) -> str."""
+        self._records.append((template, args))
+
+    def add_state(self, label, state_16bit):
+        """Record a state snapshot, rendered as '<label>: [[..], [..]]'."""
+        self._records.append((label, state_16bit))
+
+    def _render(self, record):
+        template, args = record
+        if isinstance(args, int):
+            return f"{template}: {text_to_state(args)}"
+        if callable(template):
+            return template(*args)
+        return template.format(*args)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._render(record) for record in self._records[index]]
+        return self._render(self._records[index])
+
+    def __iter__(self):
+        for record in self._records:
+            yield self._render(record)
+
+    def __repr__(self):
+        return f"TraceLog({len(self._records)} lines)"
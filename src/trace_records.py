@@ -0,0 +1,224 @@
+import csv
+import io
+from functools import lru_cache
+
+import numpy as np
+
+from utils import text_to_state
+from key_expansion import get_round_keys
+from packed_core import SUB_BYTE, INV_SUB_BYTE, MIX_BYTE, INV_MIX_BYTE
+
+# Trace terstruktur: satu record berukuran tetap per (blok, tahap) berisi id
+# tahap (1 byte) dan state packed 16-bit (2 byte), disimpan dalam satu array
+# NumPy. Semua tahap dihitung sekaligus untuk seluruh blok dengan tabel byte
+# packed_core, jadi trace lengkap input besar hanya +-3 byte per tahap.
+# Teks "[[..], [..]]" baru dibuat saat dirender (teks, CSV atau DataFrame).
+
+RECORD_DTYPE = np.dtype([("stage", np.uint8), ("state", np.uint16)])  # 3 byte, tanpa padding
+
+# Id tahap = indeks di STAGE_LABELS (label sama dengan baris log main.encrypt/decrypt)
+STAGE_LABELS = (
+    "Block Input",
+    "Previous Block",
+    "Counter",
+    "Initial State",
+    "Ciphertext Input",
+    "After AddRoundKey (Round 0)",
+    "After SubNibbles (Round 1)",
+    "After ShiftRows (Round 1)",
+    "After MixColumns (Round 1)",
+    "After AddRoundKey (Round 1)",
+    "After SubNibbles (Round 2)",
+    "After ShiftRows (Round 2)",
+    "After AddRoundKey (Round 2)",
+    "After InvShiftRows (Round 2)",
+    "After InvSubNibbles (Round 2)",
+    "After InvMixColumns (Round 1)",
+    "After InvShiftRows (Round 1)",
+    "After InvSubNibbles (Round 1)",
+    "Block Output",
+)
+STAGE_IDS = {label: stage for stage, label in enumerate(STAGE_LABELS)}
+
+ENCRYPT_STAGES = tuple(STAGE_IDS[label] for label in (
+    "Initial State", "After AddRoundKey (Round 0)", "After SubNibbles (Round 1)", "After ShiftRows (Round 1)",
+    "After MixColumns (Round 1)", "After AddRoundKey (Round 1)", "After SubNibbles (Round 2)",
+    "After ShiftRows (Round 2)", "After AddRoundKey (Round 2)"))
+DECRYPT_STAGES = tuple(STAGE_IDS[label] for label in (
+    "Ciphertext Input", "After AddRoundKey (Round 2)", "After InvShiftRows (Round 2)",
+    "After InvSubNibbles (Round 2)", "After AddRoundKey (Round 1)", "After InvMixColumns (Round 1)",
+    "After InvShiftRows (Round 1)", "After InvSubNibbles (Round 1)", "After AddRoundKey (Round 0)"))
+
+_SUB = np.array(SUB_BYTE, dtype=np.uint16)
+_INV_SUB = np.array(INV_SUB_BYTE, dtype=np.uint16)
+_MIX = np.array(MIX_BYTE, dtype=np.uint16)
+_INV_MIX = np.array(INV_MIX_BYTE, dtype=np.uint16)
+
+def _by_column(table, x):
+    # Tabel per byte: byte tinggi = kolom 0, byte rendah = kolom 1
+    return (table[x >> 8] << 8) | table[x & 0xFF]
+
+def _shift_rows(x):
+    return (x & 0xF0F0) | ((x >> 8) & 0xF) | ((x & 0xF) << 8)
+
+def encrypt_stage_states(blocks, key_16bit):
+    """State after every encryption stage for an array of blocks: uint16 array (blocks, 9)."""
+    k0, k1, k2 = (np.uint16(k) for k in get_round_keys(key_16bit))
+    x = np.asarray(blocks, dtype=np.uint16)
+    states = [x]
+    for step in (lambda v: v ^ k0, lambda v: _by_column(_SUB, v), _shift_rows, lambda v: _by_column(_MIX, v),
+                 lambda v: v ^ k1, lambda v: _by_column(_SUB, v), _shift_rows, lambda v: v ^ k2):
+        x = step(x)
+        states.append(x)
+    return np.stack(states, axis=1)
+
+def decrypt_stage_states(blocks, key_16bit):
+    """State after every decryption stage for an array of blocks: uint16 array (blocks, 9)."""
+    k0, k1, k2 = (np.uint16(k) for k in get_round_keys(key_16bit))
+    x = np.asarray(blocks, dtype=np.uint16)
+    states = [x]
+    for step in (lambda v: v ^ k2, _shift_rows, lambda v: _by_column(_INV_SUB, v), lambda v: v ^ k1,
+                 lambda v: _by_column(_INV_MIX, v), _shift_rows, lambda v: _by_column(_INV_SUB, v),
+                 lambda v: v ^ k0):
+        x = step(x)
+        states.append(x)
+    return np.stack(states, axis=1)
+
+
+@lru_cache(maxsize=1)
+def state_texts():
+    """Rendered "[[..], [..]]" text of every 16-bit state, built once on first use."""
+    return [str(text_to_state(value)) for value in range(1 << 16)]
+
+
+class RoundTrace:
+    """Compact round trace: RECORD_DTYPE records, `stages` per block in the same order.
+
+    Block numbers are implicit (record i belongs to block first_block + i // len(stages)),
+    so a record costs RECORD_DTYPE.itemsize (3) bytes.
+    """
+
+    def __init__(self, records, stages, first_block=0):
+        self.records = records
+        self.stages = tuple(stages)
+        self.first_block = first_block
+
+    @classmethod
+    def from_states(cls, states, stages, first_block=0):
+        """Build from a (blocks, len(stages)) uint16 array of states."""
+        states = np.asarray(states, dtype=np.uint16)
+        records = np.empty(states.size, dtype=RECORD_DTYPE)
+        records["stage"] = np.tile(np.array(stages, dtype=np.uint8), len(states))
+        records["state"] = states.reshape(-1)
+        return cls(records, stages, first_block)
+
+    @property
+    def block_count(self):
+        return len(self.records) // len(self.stages) if self.stages else 0
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes
+
+    def __len__(self):
+        return len(self.records)
+
+    def states(self):
+        """States as a (blocks, stages) uint16 array (a view, no copy)."""
+        return self.records["state"].reshape(self.block_count, len(self.stages))
+
+    def summary(self):
+        """Trace with only the first and last stage of every block (input -> output)."""
+        if len(self.stages) <= 2:
+            return self
+        states = self.states()[:, [0, -1]]
+        return RoundTrace.from_states(states, (self.stages[0], self.stages[-1]), self.first_block)
+
+    def block(self, index):
+        """[(stage label, state)] of block `index` (0-based within this trace)."""
+        row = self.states()[index]
+        return [(STAGE_LABELS[stage], int(state)) for stage, state in zip(self.stages, row)]
+
+    # === Renderer ===
+
+    def iter_lines(self):
+        """Text lines in the style of the round logs ("<stage>: [[..], [..]]"), one header per block."""
+        prefixes = [f"{STAGE_LABELS[stage]}: " for stage in self.stages]
+        texts = state_texts()
+        for offset, row in enumerate(self.states().tolist()):
+            yield f"\n=== Block {self.first_block + offset + 1} ==="
+            for prefix, state in zip(prefixes, row):
+                yield prefix + texts[state]
+
+    def to_text(self):
+        return "\n".join(self.iter_lines())
+
+    def csv_rows(self):
+        """Rows [block, stage id, stage, state, hex] (block numbers start at 1)."""
+        stages = self.stages
+        per_block = len(stages)
+        for i, state in enumerate(self.records["state"].tolist()):
+            stage = stages[i % per_block]
+            yield [self.first_block + i // per_block + 1, stage, STAGE_LABELS[stage], state, f"0x{state:04X}"]
+
+    def write_csv(self, file, header=True):
+        """Write the records as CSV to an open text file."""
+        writer = csv.writer(file)
+        if header:
+            writer.writerow(["Block", "Stage ID", "Stage", "State", "State (hex)"])
+        writer.writerows(self.csv_rows())
+
+    def to_csv(self, header=True):
+        """The records as CSV text (see write_csv)."""
+        buffer = io.StringIO()
+        self.write_csv(buffer, header)
+        return buffer.getvalue()
+
+    def to_dataframe(self):
+        """pandas DataFrame with columns block, stage_id, stage, state, hex."""
+        import pandas as pd
+        per_block = len(self.stages)
+        stage_ids = self.records["stage"]
+        states = self.records["state"]
+        return pd.DataFrame({
+            "block": np.arange(len(self.records)) // max(per_block, 1) + self.first_block + 1,
+            "stage_id": stage_ids,
+            "stage": pd.Categorical.from_codes(stage_ids.astype(np.int16), STAGE_LABELS),
+            "state": states,
+            "hex": [f"0x{state:04X}" for state in states.tolist()],
+        })
+
+
+def mode_trace(blocks, key_16bit, mode="ECB", action="encrypt", previous=None, first_block=0):
+    """RoundTrace of a block-mode run over uint16 `blocks`.
+
+    For ECB and CBC, `blocks` are the input blocks; for CTR they are the
+    counter values. `previous` holds the CBC chaining value of every block
+    (the IV or the previous ciphertext block).
+    """
+    mode = mode.upper()
+    blocks = np.asarray(blocks, dtype=np.uint16)
+    if mode == "CTR":
+        states = encrypt_stage_states(blocks, key_16bit)
+        stages = (STAGE_IDS["Counter"],) + ENCRYPT_STAGES[1:]
+    elif mode in ("ECB", "CBC"):
+        if mode == "CBC" and previous is None:
+            raise ValueError("CBC trace needs the previous ciphertext blocks")
+        if action == "encrypt":
+            if mode == "ECB":
+                states, stages = encrypt_stage_states(blocks, key_16bit), ENCRYPT_STAGES
+            else:
+                previous = np.asarray(previous, dtype=np.uint16)
+                states = np.column_stack([blocks, previous, encrypt_stage_states(blocks ^ previous, key_16bit)])
+                stages = (STAGE_IDS["Block Input"], STAGE_IDS["Previous Block"]) + ENCRYPT_STAGES
+        elif action == "decrypt":
+            states, stages = decrypt_stage_states(blocks, key_16bit), DECRYPT_STAGES
+            if mode == "CBC":
+                previous = np.asarray(previous, dtype=np.uint16)
+                states = np.column_stack([states, previous, states[:, -1] ^ previous])
+                stages += (STAGE_IDS["Previous Block"], STAGE_IDS["Block Output"])
+        else:
+            raise ValueError(f"Unknown action: {action}")
+    else:
+        raise ValueError(f"Unsupported block mode: {mode}")
+    return RoundTrace.from_states(states, stages, first_block)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul proyek berada di src/ dan diimpor secara flat (mis. `from utils import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
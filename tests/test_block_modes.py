@@ -0,0 +1,70 @@
+import io
+import os
+
+import pytest
+
+from block_modes import (BLOCK_BYTES, pad_bytes, unpad_bytes, encrypt_bytes, decrypt_bytes,
+                         ctr_encrypt_bytes, ctr_decrypt_range, iv_to_16bit)
+
+KEY = "Ab"
+MODES = ("ECB", "CBC", "CTR")
+
+
+@pytest.mark.parametrize("data, padded", [
+    (b"", b"\x02\x02"),
+    (b"a", b"a\x01"),
+    (b"ab", b"ab\x02\x02"),
+    (b"abc", b"abc\x01"),
+    (b"abcde", b"abcde\x01"),
+])
+def test_pad_bytes(data, padded):
+    assert pad_bytes(data) == padded
+    assert unpad_bytes(padded) == data
+
+
+@pytest.mark.parametrize("padded", [
+    b"",            # kosong
+    b"a",           # bukan kelipatan 2
+    b"abc",
+    b"ab\x00\x00",  # panjang pad 0
+    b"ab\x03\x03",  # panjang pad > 2
+    b"ab\x01\x02",  # byte pad tidak konsisten
+])
+def test_unpad_bytes_rejects_bad_padding(padded):
+    with pytest.raises(ValueError):
+        unpad_bytes(padded)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 255, 4096, 70001])
+def test_bytes_round_trip(mode, size):
+    data = os.urandom(size)
+    ciphertext = encrypt_bytes(data, KEY, mode, iv=0x1234 if mode != "ECB" else None)
+    if mode == "CTR":
+        assert len(ciphertext) == 2 + size
+    else:
+        assert len(ciphertext) % BLOCK_BYTES == 0
+    assert decrypt_bytes(ciphertext, KEY, mode) == data
+
+
+def test_iv_must_fit_16_bits():
+    assert iv_to_16bit("xy") == 0x7879
+    with pytest.raises(ValueError):
+        iv_to_16bit("€x")
+
+
+@pytest.mark.parametrize("offset, length", [
+    (0, 0), (0, 1), (1, 1), (1, 2), (2, 5), (999, 1), (1000, 0), (3, 997), (500, 10_000),
+])
+@pytest.mark.parametrize("as_file", [False, True])
+def test_ctr_decrypt_range(offset, length, as_file):
+    data = os.urandom(1000)
+    ciphertext = ctr_encrypt_bytes(data, KEY, nonce=0xBEEF)
+    source = io.BytesIO(ciphertext) if as_file else ciphertext
+    assert ctr_decrypt_range(source, KEY, offset, length) == data[offset:offset + length]
+
+
+def test_ctr_decrypt_range_rejects_negative_offsets():
+    ciphertext = ctr_encrypt_bytes(b"hello", KEY)
+    with pytest.raises(ValueError):
+        ctr_decrypt_range(ciphertext, KEY, -1, 2)
@@ -0,0 +1,54 @@
+import pytest
+
+from main import encrypt, decrypt
+from trace_log import TRACE_FULL, TRACE_SUMMARY, TRACE_OFF
+from utils import chars_to_16bit
+from block_modes import ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, ctr_encrypt, ctr_decrypt
+
+TRACES = (TRACE_FULL, TRACE_SUMMARY, TRACE_OFF)
+
+# Vektor known-answer yang sama dengan TEST_CASES di gui/streamlit_app.py
+KNOWN_ANSWERS = [
+    ("hi", "01", 0x82C4),
+    ("AB", "CD", 0xCA93),
+    ("Tz", "k9", 0x31A5),
+    ("!@", "#$", 0xF3AA),
+    ("ab", "xy", 0xD0AC),
+]
+
+
+@pytest.mark.parametrize("trace", TRACES)
+@pytest.mark.parametrize("plaintext, key, expected", KNOWN_ANSWERS)
+def test_known_answers(plaintext, key, expected, trace):
+    ciphertext, _ = encrypt(chars_to_16bit(plaintext), chars_to_16bit(key), trace)
+    assert ciphertext == expected
+    recovered, _ = decrypt(expected, chars_to_16bit(key), trace)
+    assert recovered == chars_to_16bit(plaintext)
+
+
+@pytest.mark.parametrize("key_16bit", [0x0000, 0x3031, 0xFFFF])
+def test_single_block_round_trip(key_16bit):
+    for block in range(0, 0x10000, 257):
+        ciphertext, _ = encrypt(block, key_16bit, TRACE_OFF)
+        assert decrypt(ciphertext, key_16bit, TRACE_OFF)[0] == block
+
+
+@pytest.mark.parametrize("trace", TRACES)
+@pytest.mark.parametrize("text", ["", "a", "hi", "Mini-AES", "odd length!", "x" * 4001])
+def test_text_modes_round_trip(text, trace):
+    padded = text if len(text) % 2 == 0 else text + " "
+    ciphertext, _ = ecb_encrypt(text, "Ab", trace=trace)
+    assert ecb_decrypt(ciphertext, "Ab", trace=trace)[0] == padded
+
+    ciphertext, _ = cbc_encrypt(text, "Ab", iv="iv", trace=trace)
+    assert ciphertext[:2] == "iv"
+    assert cbc_decrypt(ciphertext, "Ab", trace=trace)[0] == padded
+
+    ciphertext, _ = ctr_encrypt(text, "Ab", nonce="nc", trace=trace)
+    assert ctr_decrypt(ciphertext, "Ab", trace=trace)[0] == text
+
+
+def test_text_modes_agree_across_traces():
+    text = "The quick brown fox jumps over the lazy dog" * 50
+    outputs = {cbc_encrypt(text, "k9", iv="IV", trace=trace)[0] for trace in TRACES}
+    assert len(outputs) == 1
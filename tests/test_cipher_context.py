@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from block_modes import encrypt_bytes
+from cipher_context import Encryptor, Decryptor
+
+KEY = "k9"
+MODES = ("ECB", "CBC", "CTR")
+
+
+def _feed(context, data, sizes):
+    """Feed `data` to `context` in pieces of the given sizes (cycled), then finalize."""
+    out, position, i = [], 0, 0
+    while position < len(data):
+        size = sizes[i % len(sizes)]
+        out.append(context.update(data[position:position + size]))
+        position += size
+        i += 1
+    out.append(context.finalize())
+    return b"".join(out)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("sizes", [(1,), (2,), (3,), (1, 2, 5), (4096,)])
+def test_chunked_matches_one_shot(mode, sizes):
+    data = os.urandom(3001)
+    iv = 0x0F0F if mode != "ECB" else None
+    expected = encrypt_bytes(data, KEY, mode, iv)
+    assert _feed(Encryptor(KEY, mode, iv), data, sizes) == expected
+    assert _feed(Decryptor(KEY, mode), expected, sizes) == data
+
+
+def test_cbc_chains_across_update_boundaries():
+    # Blok plaintext identik harus menghasilkan ciphertext berbeda walau dipotong di tengah blok
+    data = b"AA" * 8
+    encryptor = Encryptor(KEY, "CBC", iv=0x1234)
+    ciphertext = encryptor.update(data[:3]) + encryptor.update(data[3:9]) + encryptor.update(data[9:])
+    ciphertext += encryptor.finalize()
+    assert ciphertext == encrypt_bytes(data, KEY, "CBC", 0x1234)
+    blocks = [ciphertext[i:i + 2] for i in range(2, len(ciphertext), 2)]
+    assert len(set(blocks)) == len(blocks)
+
+
+@pytest.mark.parametrize("mode", ["ECB", "CBC"])
+def test_decryptor_holds_back_last_block(mode):
+    ciphertext = encrypt_bytes(b"abcd", KEY, mode, 0x4242 if mode == "CBC" else None)
+    decryptor = Decryptor(KEY, mode)
+    # "abcd" + padding = 3 blok; blok terakhir ditahan sampai finalize()
+    assert decryptor.update(ciphertext) == b"abcd"
+    assert decryptor.finalize() == b""
+
+    decryptor = Decryptor(KEY, mode)
+    header = 2 if mode == "CBC" else 0
+    assert decryptor.update(ciphertext[:header + 2]) == b""
+    assert decryptor.update(ciphertext[header + 2:]) == b"abcd"
+    assert decryptor.finalize() == b""
+
+
+def test_encryptor_emits_iv_first():
+    encryptor = Encryptor(KEY, "CTR", iv=0xABCD)
+    assert encryptor.update(b"")[:2] == b"\xAB\xCD"
+
+
+def test_decryptor_rejects_truncated_ciphertext():
+    ciphertext = encrypt_bytes(b"hello", KEY, "CBC", 0x1111)
+    decryptor = Decryptor(KEY, "CBC")
+    decryptor.update(ciphertext[:-1])
+    with pytest.raises(ValueError):
+        decryptor.finalize()
+
+
+def test_finalized_context_is_closed():
+    encryptor = Encryptor(KEY, "ECB")
+    encryptor.finalize()
+    with pytest.raises(ValueError):
+        encryptor.update(b"more")
@@ -0,0 +1,98 @@
+import io
+import os
+
+import pytest
+
+from container import (HEADER, INDEX_ENTRY, MODES, encrypt_container, decrypt_container, parse_header,
+                       read_index, read_chunk, decrypt_range, encrypt_stream_container, decrypt_stream_container)
+
+KEY = "Ab"
+CHUNK = 256
+DATA = os.urandom(5001)
+
+
+def _container(mode, index=True):
+    return encrypt_container(DATA, KEY, mode, "iv", chunk_size=CHUNK, index=index)
+
+
+def _with_header(container, **fields):
+    """Copy of `container` with some header fields replaced."""
+    names = ("magic", "version", "mode", "flags", "header_size", "iv", "length",
+             "chunk_size", "chunk_count", "index_offset")
+    values = dict(zip(names, HEADER.unpack(container[:HEADER.size])))
+    values.update(fields)
+    return HEADER.pack(*(values[name] for name in names)) + container[HEADER.size:]
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("index", [True, False])
+def test_round_trip(mode, index):
+    container = _container(mode, index)
+    header = parse_header(container)
+    assert header["mode"] == mode
+    assert header["has_index"] is index
+    assert header["chunk_count"] == len(read_index(container, header))
+    assert decrypt_container(container, KEY) == DATA
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_stream_matches_in_memory(mode):
+    destination = io.BytesIO()
+    encrypt_stream_container(io.BytesIO(DATA), destination, KEY, mode, "iv", CHUNK)
+    assert destination.getvalue() == _container(mode)
+    destination.seek(0)
+    plaintext = io.BytesIO()
+    decrypt_stream_container(destination, plaintext, KEY)
+    assert plaintext.getvalue() == DATA
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("as_file", [False, True])
+def test_read_chunk_and_range(mode, as_file):
+    container = _container(mode)
+    source = io.BytesIO(container) if as_file else container
+    header = parse_header(container)
+    for chunk in range(header["chunk_count"]):
+        assert read_chunk(source, KEY, chunk) == DATA[chunk * CHUNK:(chunk + 1) * CHUNK]
+    for offset, length in ((0, 10), (250, 20), (1000, 2000), (4990, 100)):
+        assert decrypt_range(source, KEY, offset, length) == DATA[offset:offset + length]
+    with pytest.raises(IndexError):
+        read_chunk(source, KEY, header["chunk_count"])
+
+
+def test_index_holds_chunk_offsets():
+    container = _container("CBC")
+    offsets = [offset for offset, _ in read_index(container, parse_header(container))]
+    assert offsets == list(range(0, len(offsets) * CHUNK, CHUNK))
+
+
+def test_crc_detects_corrupted_chunk():
+    container = bytearray(_container("ECB"))
+    container[HEADER.size + 3 * CHUNK + 5] ^= 0xFF
+    container = bytes(container)
+    with pytest.raises(ValueError, match="CRC32"):
+        read_chunk(container, KEY, 3)
+    # Chunk lain tetap bisa dibaca
+    assert read_chunk(container, KEY, 2) == DATA[2 * CHUNK:3 * CHUNK]
+
+
+@pytest.mark.parametrize("fields", [
+    {"chunk_size": 0},
+    {"chunk_size": 3},
+    {"index_offset": 10},
+    {"index_offset": 10 ** 9},
+    {"chunk_count": 5},
+    {"version": 99},
+    {"mode": len(MODES)},
+])
+def test_parse_header_rejects_inconsistent_headers(fields):
+    with pytest.raises(ValueError):
+        parse_header(_with_header(_container("CBC"), **fields))
+
+
+def test_parse_header_rejects_truncated_index():
+    container = _container("CTR")
+    with pytest.raises(ValueError):
+        parse_header(container[:-INDEX_ENTRY.size])
+    with pytest.raises(ValueError):
+        parse_header(b"NOPE" + container[4:])